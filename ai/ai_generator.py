@@ -2,13 +2,291 @@
 Модуль для работы с AI API (OpenAI, Anthropic, Google, Ollama, Groq)
 Поддерживает как платные, так и бесплатные провайдеры
 """
+import asyncio
+import functools
 import json
 import logging
-from typing import Dict, Optional, List
+import os
+import random
+import re
+import threading
+import time
+from typing import Dict, Final, Optional, List
 from config import settings
 
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# orjson в разы быстрее stdlib json и выводит non-ASCII без ensure_ascii
+if orjson is not None:
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+    _json_loads = orjson.loads
+else:
+    def _json_dumps(obj) -> str:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+
+    _json_loads = json.loads
+
+# Общий пул HTTP-соединений для всех SDK провайдеров (keepalive вместо
+# повторных TCP+TLS рукопожатий на каждый вызов)
+_http_client = None
+_async_http_client = None
+
+
+def _get_http_clients():
+    """Возвращает общую пару (sync, async) httpx клиентов с настроенным пулом"""
+    global _http_client, _async_http_client
+    if httpx is None:
+        return None, None
+    if _http_client is None:
+        limits = httpx.Limits(
+            max_keepalive_connections=settings.http_pool_size,
+            max_connections=settings.http_pool_size * 2
+        )
+        timeout = httpx.Timeout(connect=10, read=60, write=60, pool=5)
+        _http_client = httpx.Client(limits=limits, timeout=timeout)
+        _async_http_client = httpx.AsyncClient(limits=limits, timeout=timeout)
+    return _http_client, _async_http_client
+
+# Общий для всех генераторов семантический кэш (лениво, один файл на приложение)
+_semantic_cache = None
+
+
+def _cache_disabled() -> bool:
+    """Переменная окружения для A/B замеров: отключает все кэши ответов"""
+    return bool(os.environ.get("DISABLE_AI_CACHE"))
+
+
+def _log_cached_tokens(provider: str, response) -> None:
+    """Логирует попадание в префикс-кэш провайдера (prompt caching)"""
+    usage = getattr(response, 'usage', None)
+    if usage is None:
+        return
+    if provider == 'openai':
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached = getattr(details, 'cached_tokens', 0) if details else 0
+    else:
+        cached = getattr(usage, 'cache_read_input_tokens', 0) or 0
+    if cached:
+        logger.debug("Префикс-кэш %s: переиспользовано %s входных токенов",
+                     provider, cached)
+
+
+def _get_semantic_cache():
+    """Возвращает общий экземпляр SemanticCache (если кэш включен в настройках)"""
+    global _semantic_cache
+    if not settings.sem_cache_enabled or _cache_disabled():
+        return None
+    if _semantic_cache is None:
+        from .semantic_cache import SemanticCache
+        _semantic_cache = SemanticCache(
+            db_path=settings.output_dir / "cache.db",
+            threshold=settings.sem_cache_threshold,
+            ttl=settings.sem_cache_ttl
+        )
+    return _semantic_cache
+
+
+# Точный кэш детерминированных вызовов (независим от семантического)
+_exact_cache = None
+
+
+def _get_exact_cache():
+    """Возвращает общий экземпляр ExactCache (если кэш включен в настройках)"""
+    global _exact_cache
+    if not settings.exact_cache_enabled or _cache_disabled():
+        return None
+    if _exact_cache is None:
+        from .exact_cache import ExactCache
+        _exact_cache = ExactCache(
+            db_path=settings.output_dir / "exact_cache.db",
+            ttl=settings.sem_cache_ttl
+        )
+    return _exact_cache
+
+
+# Стоп-слова, которые не годятся в fallback ключевые слова
+_STOPWORDS = frozenset({
+    "the", "and", "for", "with", "your", "from", "that", "this", "have",
+    "будет", "есть", "один", "наши", "ваши", "самый", "очень", "того", "этого"
+})
+
+# Базовые коммерческие ключевые слова (создаются один раз на модуль)
+_GENERIC_KEYWORDS = (
+    {"keyword": "buy", "match_type": "phrase", "search_volume": "high", "commercial_intent": "high", "category": "transactional"},
+    {"keyword": "price", "match_type": "phrase", "search_volume": "high", "commercial_intent": "high", "category": "transactional"},
+    {"keyword": "order", "match_type": "phrase", "search_volume": "medium", "commercial_intent": "high", "category": "transactional"},
+    {"keyword": "services", "match_type": "broad", "search_volume": "high", "commercial_intent": "medium", "category": "informational"},
+)
+
+
+def _make_fallback_keyword(word: str) -> Dict:
+    """Собирает словарь fallback ключевого слова"""
+    return {
+        "keyword": word,
+        "match_type": "broad",
+        "search_volume": "medium",
+        "commercial_intent": "high",
+        "category": "transactional"
+    }
+
+
+# Системные промпты — модульные константы: создаются один раз и остаются
+# байт-в-байт стабильными, чтобы срабатывал prompt caching провайдеров
+_KEYWORDS_SYSTEM_PROMPT: Final[str] = """
+You are an expert in SEO and Google Ads contextual advertising.
+Your task is to generate high-quality keywords for advertising campaigns.
+Consider commercial intent, relevance, and search volume.
+
+IMPORTANT: Generate keywords in the same language as the website content. If the website is in Ukrainian, generate Ukrainian keywords. If in English, generate English keywords. If in Russian, generate Russian keywords.
+
+Return result in JSON format:
+{
+    "keywords": [
+        {
+            "keyword": "keyword",
+            "match_type": "broad|phrase|exact|modified_broad",
+            "search_volume": "high|medium|low",
+            "commercial_intent": "high|medium|low",
+            "category": "informational|transactional|navigational"
+        }
+    ]
+}
+"""
+
+_ADS_SYSTEM_PROMPT: Final[str] = """
+You are an expert in creating Google Ads with over 10 years of experience.
+You know all technical limitations and best practices.
+Your ads always convert and attract target audience.
+You are a copywriting master and know buyer psychology.
+
+IMPORTANT: Generate ads in the same language as the website content. If the website is in Ukrainian, generate Ukrainian ads. If in English, generate English ads. If in Russian, generate Russian ads.
+
+Return result in JSON format.
+"""
+
+
+# Последний рубеж извлечения JSON: предкомпилированный шаблон вместо
+# повторной компиляции re.search в каждом неудачном парсе
+_JSON_RE: Final = re.compile(r'\{.*\}', re.DOTALL)
+
+
+# Маркеры временных ошибок, после которых вызов имеет смысл повторить
+_TRANSIENT_MARKERS = ('429', '500', '502', '503', '529', 'rate limit', 'quota',
+                      'timeout', 'timed out', 'overloaded', 'unavailable', 'connection')
+
+
+def _is_transient_error(error: Exception) -> bool:
+    """Определяет, является ли ошибка временной (429/5xx/сетевые сбои)"""
+    text = str(error).lower()
+    return any(marker in text for marker in _TRANSIENT_MARKERS)
+
+
+class _TokenBucket:
+    """Потокобезопасный token bucket для клиентского rate limiting"""
+
+    def __init__(self, rate_per_minute: int):
+        self.capacity = float(rate_per_minute)
+        self.fill_rate = rate_per_minute / 60.0
+        self.tokens = self.capacity
+        self.timestamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Блокирует, пока не появится свободный токен"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity,
+                                  self.tokens + (now - self.timestamp) * self.fill_rate)
+                self.timestamp = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.fill_rate
+            time.sleep(wait)
+
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def _get_rate_limiter(provider: str):
+    """Возвращает общий token bucket провайдера (None, если лимит выключен)"""
+    if settings.ai_requests_per_minute <= 0:
+        return None
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(provider)
+        if limiter is None:
+            limiter = _TokenBucket(settings.ai_requests_per_minute)
+            _rate_limiters[provider] = limiter
+        return limiter
+
+
+@functools.lru_cache(maxsize=None)
+def _get_clients(provider: str, api_key: str):
+    """
+    Импортирует SDK и создает пару (sync, async) клиентов.
+    Кэшируется по (провайдер, ключ): повторные AIGenerator() не платят
+    ни за импорт, ни за создание клиента.
+    """
+    # Общий пул соединений для SDK, которые принимают http_client
+    http_client, ahttp_client = _get_http_clients()
+    pool_kwargs = {"http_client": http_client} if http_client is not None else {}
+    apool_kwargs = {"http_client": ahttp_client} if ahttp_client is not None else {}
+
+    if provider == "openai":
+        try:
+            from openai import OpenAI, AsyncOpenAI
+            return (OpenAI(api_key=api_key, **pool_kwargs),
+                    AsyncOpenAI(api_key=api_key, **apool_kwargs))
+        except ImportError:
+            raise ImportError("Установите openai: pip install openai")
+
+    elif provider == "anthropic":
+        try:
+            from anthropic import Anthropic, AsyncAnthropic
+            return (Anthropic(api_key=api_key, **pool_kwargs),
+                    AsyncAnthropic(api_key=api_key, **apool_kwargs))
+        except ImportError:
+            raise ImportError("Установите anthropic: pip install anthropic")
+
+    elif provider == "google":
+        try:
+            import google.generativeai as genai
+            genai.configure(api_key=api_key)
+            return genai, genai
+        except ImportError:
+            raise ImportError("Установите google-generativeai: pip install google-generativeai")
+
+    elif provider == "ollama":
+        try:
+            import ollama
+            return ollama, ollama.AsyncClient()
+        except ImportError:
+            raise ImportError("Установите ollama: pip install ollama")
+
+    elif provider == "groq":
+        try:
+            from groq import Groq, AsyncGroq
+            return (Groq(api_key=api_key, **pool_kwargs),
+                    AsyncGroq(api_key=api_key, **apool_kwargs))
+        except ImportError:
+            raise ImportError("Установите groq: pip install groq")
+
+    raise ValueError(f"Неизвестный провайдер: {provider}")
+
 
 class AIGenerator:
     """Класс для генерации контента с помощью AI"""
@@ -23,47 +301,47 @@ class AIGenerator:
         """
         self.provider = provider or settings.ai_provider
         self.model = model or settings.ai_model
-        
-        # Инициализируем клиент
-        if self.provider == "openai":
-            try:
-                from openai import OpenAI
-                self.client = OpenAI(api_key=settings.openai_api_key)
-            except ImportError:
-                raise ImportError("Установите openai: pip install openai")
-        
-        elif self.provider == "anthropic":
-            try:
-                from anthropic import Anthropic
-                self.client = Anthropic(api_key=settings.anthropic_api_key)
-            except ImportError:
-                raise ImportError("Установите anthropic: pip install anthropic")
-        
-        elif self.provider == "google":
-            try:
-                import google.generativeai as genai
-                genai.configure(api_key=settings.google_api_key)
-                self.client = genai
-            except ImportError:
-                raise ImportError("Установите google-generativeai: pip install google-generativeai")
-        
-        elif self.provider == "ollama":
-            try:
-                import ollama
-                self.client = ollama
-                logger.info(f"Используется Ollama с моделью {self.model}")
-            except ImportError:
-                raise ImportError("Установите ollama: pip install ollama")
-        
-        elif self.provider == "groq":
-            try:
-                from groq import Groq
-                self.client = Groq(api_key=settings.groq_api_key)
-            except ImportError:
-                raise ImportError("Установите groq: pip install groq")
-        
-        else:
+
+        api_keys = {
+            "openai": settings.openai_api_key,
+            "anthropic": settings.anthropic_api_key,
+            "google": settings.google_api_key,
+            "ollama": "",
+            "groq": settings.groq_api_key,
+        }
+        if self.provider not in api_keys:
             raise ValueError(f"Неизвестный провайдер: {self.provider}")
+
+        # Клиенты создаются один раз на (провайдер, ключ) и переиспользуются
+        self.client, self.aclient = _get_clients(self.provider, api_keys[self.provider])
+
+        if self.provider == "google":
+            # Кэш моделей и базовый generation_config, чтобы не пересоздавать на каждый вызов
+            self._gemini_models = {}
+            self._gemini_gen_config = {
+                'temperature': 0.7,
+                'top_p': 0.95,
+                'top_k': 40,
+                'max_output_tokens': 8192,
+            }
+        elif self.provider == "ollama":
+            logger.info(f"Используется Ollama с моделью {self.model}")
+
+        # Таблицы диспетчеризации: один dict lookup вместо цепочки if/elif
+        self._dispatch_table = {
+            "openai": self._generate_openai,
+            "anthropic": self._generate_anthropic,
+            "google": self._generate_google,
+            "ollama": self._generate_ollama,
+            "groq": self._generate_groq,
+        }
+        self._adispatch_table = {
+            "openai": self._agenerate_openai,
+            "anthropic": self._agenerate_anthropic,
+            "google": self._agenerate_google,
+            "ollama": self._agenerate_ollama,
+            "groq": self._agenerate_groq,
+        }
     
     def generate(self, prompt: str, system_prompt: Optional[str] = None, 
                  temperature: float = 0.7, json_mode: bool = False) -> str:
@@ -79,17 +357,40 @@ class AIGenerator:
         Returns:
             Сгенерированный текст
         """
+        # Детерминированные вызовы (низкая температура) — сначала точный кэш
+        exact_cache = _get_exact_cache() if temperature <= 0.2 else None
+        exact_key = None
+        if exact_cache:
+            exact_key = exact_cache.make_key(
+                self.provider, self.model, system_prompt, prompt, temperature, json_mode)
+            cached = exact_cache.get(exact_key)
+            if cached is not None:
+                return cached
+
+        # Проверяем кэш: точный для детерминированных вызовов, семантический для остальных
+        cache = _get_semantic_cache()
+        cache_key = prompt_hash = embedding = None
+        if cache:
+            cache_key = cache.make_key(self.provider, self.model, temperature, json_mode)
+            prompt_hash = cache.hash_prompt(system_prompt, prompt)
+            if temperature <= 0.2:
+                cached = cache.lookup_exact(cache_key, prompt_hash)
+            else:
+                embedding = cache.embed(f"{system_prompt or ''}\n\n{prompt}")
+                cached = cache.lookup(embedding, cache_key)
+            if cached is not None:
+                return cached
+
         try:
-            if self.provider == "openai":
-                return self._generate_openai(prompt, system_prompt, temperature, json_mode)
-            elif self.provider == "anthropic":
-                return self._generate_anthropic(prompt, system_prompt, temperature, json_mode)
-            elif self.provider == "google":
-                return self._generate_google(prompt, system_prompt, temperature, json_mode)
-            elif self.provider == "ollama":
-                return self._generate_ollama(prompt, system_prompt, temperature, json_mode)
-            elif self.provider == "groq":
-                return self._generate_groq(prompt, system_prompt, temperature, json_mode)
+            response = self._dispatch_with_retry(prompt, system_prompt, temperature, json_mode)
+
+            # Сохраняем успешный ответ в кэш (fallback-ответы не кэшируем)
+            if exact_cache and response is not None:
+                exact_cache.put(exact_key, response)
+            if cache and response is not None:
+                cache.put(cache_key, prompt_hash, embedding, response)
+
+            return response
         except Exception as e:
             error_str = str(e)
             # Auto-fallback for Google Gemini rate limit errors
@@ -132,9 +433,42 @@ class AIGenerator:
             logger.error(f"Ошибка генерации: {e}")
             raise
     
+    def _dispatch(self, prompt: str, system_prompt: Optional[str],
+                  temperature: float, json_mode: bool) -> str:
+        """Выполняет один вызов текущего провайдера"""
+        # Поиск по таблице на каждый вызов: провайдер может смениться при fallback
+        generate_fn = self._dispatch_table.get(self.provider)
+        if generate_fn is None:
+            raise ValueError(f"Неизвестный провайдер: {self.provider}")
+        return generate_fn(prompt, system_prompt, temperature, json_mode)
+
+    def _dispatch_with_retry(self, prompt: str, system_prompt: Optional[str],
+                             temperature: float, json_mode: bool) -> str:
+        """
+        Вызов провайдера с повторами при временных ошибках.
+        Экспоненциальная задержка с джиттером + клиентский rate limiting.
+        """
+        limiter = _get_rate_limiter(self.provider)
+        attempts = max(1, settings.max_retries)
+
+        for attempt in range(attempts):
+            if limiter:
+                limiter.acquire()
+            try:
+                return self._dispatch(prompt, system_prompt, temperature, json_mode)
+            except Exception as e:
+                if attempt + 1 >= attempts or not _is_transient_error(e):
+                    raise
+                delay = min(30.0, 2 ** attempt + random.uniform(0, 1))
+                logger.warning(
+                    f"Временная ошибка {self.provider} ({e}), повтор через {delay:.1f} с")
+                time.sleep(delay)
+
     def _generate_openai(self, prompt: str, system_prompt: Optional[str], 
                          temperature: float, json_mode: bool) -> str:
         """Генерация через OpenAI"""
+        # Системный промпт всегда первым и без изменений между вызовами,
+        # чтобы срабатывал автоматический префикс-кэш провайдера
         messages = []
         
         if system_prompt:
@@ -152,9 +486,10 @@ class AIGenerator:
             kwargs["response_format"] = {"type": "json_object"}
         
         response = self.client.chat.completions.create(**kwargs)
+        _log_cached_tokens('openai', response)
         return response.choices[0].message.content
-    
-    def _generate_anthropic(self, prompt: str, system_prompt: Optional[str], 
+
+    def _generate_anthropic(self, prompt: str, system_prompt: Optional[str],
                            temperature: float, json_mode: bool) -> str:
         """Генерация через Anthropic"""
         kwargs = {
@@ -165,19 +500,32 @@ class AIGenerator:
         }
         
         if system_prompt:
-            kwargs["system"] = system_prompt
+            # cache_control позволяет Anthropic переиспользовать статичный
+            # системный префикс между вызовами (prompt caching)
+            kwargs["system"] = [{
+                "type": "text",
+                "text": system_prompt,
+                "cache_control": {"type": "ephemeral"}
+            }]
         
         response = self.client.messages.create(**kwargs)
+        _log_cached_tokens('anthropic', response)
         return response.content[0].text
-    
+
+    def _get_gemini_model(self, model_name: str):
+        """Возвращает закэшированный экземпляр GenerativeModel"""
+        model = self._gemini_models.get(model_name)
+        if model is None:
+            model = self.client.GenerativeModel(model_name)
+            self._gemini_models[model_name] = model
+        return model
+
     def _generate_google(self, prompt: str, system_prompt: Optional[str],
                         temperature: float, json_mode: bool) -> str:
         """Генерация через Google Gemini"""
         # Используем модель из настроек напрямую
-        model_name = self.model
+        model = self._get_gemini_model(self.model)
 
-        model = self.client.GenerativeModel(model_name)
-        
         # Объединяем system prompt и user prompt
         full_prompt = prompt
         if system_prompt:
@@ -191,12 +539,7 @@ class AIGenerator:
             
             response = model.generate_content(
                 full_prompt,
-                generation_config={
-                    'temperature': temperature,
-                    'top_p': 0.95,
-                    'top_k': 40,
-                    'max_output_tokens': 8192,
-                }
+                generation_config=dict(self._gemini_gen_config, temperature=temperature)
             )
             
             if response.text:
@@ -227,7 +570,7 @@ class AIGenerator:
             # Попробуем альтернативную модель
             try:
                 logger.info("Trying fallback model: gemini-1.5-pro")
-                model = self.client.GenerativeModel("gemini-1.5-pro")
+                model = self._get_gemini_model("gemini-1.5-pro")
                 response = model.generate_content(full_prompt)
                 return response.text if response.text else "No response generated"
             except Exception as e2:
@@ -275,7 +618,348 @@ class AIGenerator:
         
         response = self.client.chat.completions.create(**kwargs)
         return response.choices[0].message.content
-    
+
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None,
+                        temperature: float = 0.7, json_mode: bool = False) -> str:
+        """
+        Асинхронно генерирует ответ от AI
+
+        Позволяет запускать несколько генераций параллельно через asyncio.gather.
+
+        Args:
+            prompt: Пользовательский промпт
+            system_prompt: Системный промпт
+            temperature: Температура генерации (0-1)
+            json_mode: Если True, ответ будет в формате JSON
+
+        Returns:
+            Сгенерированный текст
+        """
+        # Кэш такой же, как в синхронном generate
+        exact_cache = _get_exact_cache() if temperature <= 0.2 else None
+        exact_key = None
+        if exact_cache:
+            exact_key = exact_cache.make_key(
+                self.provider, self.model, system_prompt, prompt, temperature, json_mode)
+            cached = exact_cache.get(exact_key)
+            if cached is not None:
+                return cached
+
+        cache = _get_semantic_cache()
+        cache_key = prompt_hash = embedding = None
+        if cache:
+            cache_key = cache.make_key(self.provider, self.model, temperature, json_mode)
+            prompt_hash = cache.hash_prompt(system_prompt, prompt)
+            if temperature <= 0.2:
+                cached = cache.lookup_exact(cache_key, prompt_hash)
+            else:
+                embedding = cache.embed(f"{system_prompt or ''}\n\n{prompt}")
+                cached = cache.lookup(embedding, cache_key)
+            if cached is not None:
+                return cached
+
+        try:
+            response = await self._adispatch_with_retry(prompt, system_prompt, temperature, json_mode)
+
+            if exact_cache and response is not None:
+                exact_cache.put(exact_key, response)
+            if cache and response is not None:
+                cache.put(cache_key, prompt_hash, embedding, response)
+
+            return response
+        except Exception as e:
+            logger.error(f"Ошибка асинхронной генерации: {e}")
+            raise
+
+    async def _adispatch(self, prompt: str, system_prompt: Optional[str],
+                         temperature: float, json_mode: bool) -> str:
+        """Выполняет один асинхронный вызов текущего провайдера"""
+        agenerate_fn = self._adispatch_table.get(self.provider)
+        if agenerate_fn is None:
+            raise ValueError(f"Неизвестный провайдер: {self.provider}")
+        return await agenerate_fn(prompt, system_prompt, temperature, json_mode)
+
+    async def _adispatch_with_retry(self, prompt: str, system_prompt: Optional[str],
+                                    temperature: float, json_mode: bool) -> str:
+        """Асинхронный вариант _dispatch_with_retry (задержка через asyncio.sleep)"""
+        attempts = max(1, settings.max_retries)
+
+        for attempt in range(attempts):
+            try:
+                return await self._adispatch(prompt, system_prompt, temperature, json_mode)
+            except Exception as e:
+                if attempt + 1 >= attempts or not _is_transient_error(e):
+                    raise
+                delay = min(30.0, 2 ** attempt + random.uniform(0, 1))
+                logger.warning(
+                    f"Временная ошибка {self.provider} ({e}), повтор через {delay:.1f} с")
+                await asyncio.sleep(delay)
+
+    async def _agenerate_openai(self, prompt: str, system_prompt: Optional[str],
+                                temperature: float, json_mode: bool) -> str:
+        """Асинхронная генерация через OpenAI"""
+        messages = []
+
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+
+        messages.append({"role": "user", "content": prompt})
+
+        kwargs = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+        }
+
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+
+        response = await self.aclient.chat.completions.create(**kwargs)
+        return response.choices[0].message.content
+
+    async def _agenerate_anthropic(self, prompt: str, system_prompt: Optional[str],
+                                   temperature: float, json_mode: bool) -> str:
+        """Асинхронная генерация через Anthropic"""
+        kwargs = {
+            "model": self.model,
+            "max_tokens": 4096,
+            "temperature": temperature,
+            "messages": [{"role": "user", "content": prompt}]
+        }
+
+        if system_prompt:
+            kwargs["system"] = [{
+                "type": "text",
+                "text": system_prompt,
+                "cache_control": {"type": "ephemeral"}
+            }]
+
+        response = await self.aclient.messages.create(**kwargs)
+        return response.content[0].text
+
+    async def _agenerate_google(self, prompt: str, system_prompt: Optional[str],
+                                temperature: float, json_mode: bool) -> str:
+        """Асинхронная генерация через Google Gemini"""
+        model = self._get_gemini_model(self.model)
+
+        full_prompt = prompt
+        if system_prompt:
+            full_prompt = f"{system_prompt}\n\n{prompt}"
+
+        if json_mode:
+            full_prompt += "\n\nВажно: Ответь ТОЛЬКО в формате JSON, без дополнительного текста."
+
+        response = await model.generate_content_async(
+            full_prompt,
+            generation_config=dict(self._gemini_gen_config, temperature=temperature)
+        )
+
+        return response.text if response.text else "No response generated"
+
+    async def _agenerate_ollama(self, prompt: str, system_prompt: Optional[str],
+                                temperature: float, json_mode: bool) -> str:
+        """Асинхронная генерация через Ollama"""
+        messages = []
+
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+
+        messages.append({"role": "user", "content": prompt})
+
+        response = await self.aclient.chat(
+            model=self.model,
+            messages=messages,
+            options={
+                'temperature': temperature,
+            }
+        )
+
+        return response['message']['content']
+
+    async def _agenerate_groq(self, prompt: str, system_prompt: Optional[str],
+                              temperature: float, json_mode: bool) -> str:
+        """Асинхронная генерация через Groq"""
+        messages = []
+
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+
+        messages.append({"role": "user", "content": prompt})
+
+        kwargs = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+        }
+
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+
+        response = await self.aclient.chat.completions.create(**kwargs)
+        return response.choices[0].message.content
+
+    def generate_stream(self, prompt: str, system_prompt: Optional[str] = None,
+                        temperature: float = 0.7):
+        """
+        Генерирует ответ потоково, отдавая текст по мере получения
+
+        Позволяет перекрыть сетевую задержку и обработку: вызывающий код
+        (например, UI) начинает работать с ответом до его завершения.
+
+        Args:
+            prompt: Пользовательский промпт
+            system_prompt: Системный промпт
+            temperature: Температура генерации
+
+        Yields:
+            Фрагменты сгенерированного текста
+        """
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+
+        if self.provider in ("openai", "groq"):
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                stream=True
+            )
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+
+        elif self.provider == "anthropic":
+            kwargs = {
+                "model": self.model,
+                "max_tokens": 4096,
+                "temperature": temperature,
+                "messages": [{"role": "user", "content": prompt}]
+            }
+            if system_prompt:
+                kwargs["system"] = system_prompt
+            with self.client.messages.stream(**kwargs) as stream:
+                for text in stream.text_stream:
+                    yield text
+
+        elif self.provider == "google":
+            model = self._get_gemini_model(self.model)
+            full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
+            response = model.generate_content(
+                full_prompt,
+                generation_config=dict(self._gemini_gen_config, temperature=temperature),
+                stream=True
+            )
+            for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+
+        elif self.provider == "ollama":
+            stream = self.client.chat(
+                model=self.model,
+                messages=messages,
+                options={'temperature': temperature},
+                stream=True
+            )
+            for part in stream:
+                content = part['message']['content']
+                if content:
+                    yield content
+
+        else:
+            raise ValueError(f"Неизвестный провайдер: {self.provider}")
+
+    async def abatch_generate(self, prompts: List[str], system_prompt: Optional[str] = None,
+                              temperature: float = 0.7, json_mode: bool = False,
+                              use_batch_api: bool = False) -> List[str]:
+        """
+        Генерирует ответы для списка промптов
+
+        По умолчанию выполняет параллельные agenerate через asyncio.gather.
+        Для Anthropic при use_batch_api=True отправляет все промпты одним
+        запросом в Message Batches API (дешевле и выше throughput, но ответ
+        приходит с задержкой — подходит только для офлайн-заданий).
+
+        Args:
+            prompts: Список промптов
+            system_prompt: Общий системный промпт
+            temperature: Температура генерации
+            json_mode: Если True, ответы в формате JSON
+            use_batch_api: Использовать Batch API провайдера, если доступен
+
+        Returns:
+            Список ответов в порядке промптов
+        """
+        if use_batch_api and self.provider == "anthropic":
+            return await self._abatch_anthropic(prompts, system_prompt, temperature, json_mode)
+
+        if use_batch_api:
+            # У остальных провайдеров batch-режим либо отсутствует, либо требует
+            # файловой загрузки (OpenAI) — используем параллельные вызовы
+            logger.info(f"Batch API недоступен для {self.provider}, выполняю параллельные вызовы")
+
+        tasks = [self.agenerate(prompt, system_prompt, temperature, json_mode)
+                 for prompt in prompts]
+        return await asyncio.gather(*tasks)
+
+    async def _abatch_anthropic(self, prompts: List[str], system_prompt: Optional[str],
+                                temperature: float, json_mode: bool,
+                                poll_interval: float = 5.0) -> List[str]:
+        """Отправляет промпты одним запросом в Anthropic Message Batches API"""
+        requests = []
+        for idx, prompt in enumerate(prompts):
+            params = {
+                "model": self.model,
+                "max_tokens": 4096,
+                "temperature": temperature,
+                "messages": [{"role": "user", "content": prompt}]
+            }
+            if system_prompt:
+                params["system"] = system_prompt
+            requests.append({"custom_id": str(idx), "params": params})
+
+        batch = await self.aclient.messages.batches.create(requests=requests)
+        logger.info(f"Anthropic batch {batch.id} отправлен ({len(prompts)} запросов)")
+
+        while batch.processing_status != "ended":
+            await asyncio.sleep(poll_interval)
+            batch = await self.aclient.messages.batches.retrieve(batch.id)
+
+        responses = [None] * len(prompts)
+        async for entry in await self.aclient.messages.batches.results(batch.id):
+            idx = int(entry.custom_id)
+            if entry.result.type == "succeeded":
+                responses[idx] = entry.result.message.content[0].text
+            else:
+                logger.error(f"Batch запрос {idx} завершился с ошибкой: {entry.result.type}")
+
+        return responses
+
+    async def agenerate_json(self, prompt: str, system_prompt: Optional[str] = None) -> Dict:
+        """
+        Асинхронно генерирует JSON ответ
+
+        Args:
+            prompt: Промпт
+            system_prompt: Системный промпт
+
+        Returns:
+            Словарь с данными
+        """
+        json_instruction = "\n\nВерни результат ТОЛЬКО в формате JSON, без дополнительного текста."
+        full_prompt = prompt + json_instruction
+
+        try:
+            response = await self.agenerate(full_prompt, system_prompt, temperature=0.7, json_mode=True)
+        except Exception as e:
+            logger.error(f"JSON mode failed, trying without: {e}")
+            # Fallback: try without json_mode
+            response = await self.agenerate(full_prompt, system_prompt, temperature=0.7, json_mode=False)
+
+        return self._parse_json_response(response)
+
     def generate_json(self, prompt: str, system_prompt: Optional[str] = None) -> Dict:
         """
         Генерирует JSON ответ
@@ -297,29 +981,66 @@ class AIGenerator:
             logger.error(f"JSON mode failed, trying without: {e}")
             # Fallback: try without json_mode
             response = self.generate(full_prompt, system_prompt, temperature=0.7, json_mode=False)
-        
-        # Парсим JSON
+
+        return self._parse_json_response(response)
+
+    @staticmethod
+    def _extract_json(text: str) -> Optional[str]:
+        """
+        Находит первый JSON объект в тексте за один проход.
+        Учитывает вложенность, строки и экранирование.
+        """
+        start = text.find('{')
+        if start == -1:
+            return None
+
+        depth = 0
+        in_string = False
+        escape = False
+        for i in range(start, len(text)):
+            ch = text[i]
+            if in_string:
+                if escape:
+                    escape = False
+                elif ch == '\\':
+                    escape = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch == '{':
+                depth += 1
+            elif ch == '}':
+                depth -= 1
+                if depth == 0:
+                    return text[start:i + 1]
+
+        return None
+
+    def _parse_json_response(self, response: str) -> Dict:
+        """Извлекает и парсит JSON из ответа модели"""
+        # Убираем кодовые ограждения
+        cleaned = response.strip()
+        cleaned = cleaned.removeprefix("```json").removeprefix("```").removesuffix("```").strip()
+
         try:
-            # Пытаемся найти JSON в ответе
-            response = response.strip()
-            if response.startswith("```json"):
-                response = response[7:]
-            if response.startswith("```"):
-                response = response[3:]
-            if response.endswith("```"):
-                response = response[:-3]
-            
-            return json.loads(response.strip())
+            return _json_loads(cleaned)
         except json.JSONDecodeError as e:
             logger.error(f"Ошибка парсинга JSON: {e}")
             logger.error(f"Ответ: {response}")
-            # Пытаемся извлечь JSON более агрессивно
-            import re
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
+            # Вырезаем JSON объект сканером вместо регулярного выражения
+            candidate = self._extract_json(cleaned)
+            if candidate:
+                try:
+                    return _json_loads(candidate)
+                except json.JSONDecodeError:
+                    pass
+            # Совсем сломанный ответ: последняя попытка через регулярное выражение
+            match = _JSON_RE.search(cleaned)
+            if match:
                 try:
-                    return json.loads(json_match.group())
-                except:
+                    return _json_loads(match.group())
+                except json.JSONDecodeError:
                     pass
             raise ValueError(f"Не удалось распарсить JSON из ответа: {response[:200]}")
     
@@ -358,29 +1079,8 @@ class AIGenerator:
         if additional_context:
             prompt += f"\n\n**Дополнительный контекст:**\n{additional_context}"
         
-        system_prompt = """
-You are an expert in SEO and Google Ads contextual advertising.
-Your task is to generate high-quality keywords for advertising campaigns.
-Consider commercial intent, relevance, and search volume.
-
-IMPORTANT: Generate keywords in the same language as the website content. If the website is in Ukrainian, generate Ukrainian keywords. If in English, generate English keywords. If in Russian, generate Russian keywords.
-
-Return result in JSON format:
-{
-    "keywords": [
-        {
-            "keyword": "keyword",
-            "match_type": "broad|phrase|exact|modified_broad",
-            "search_volume": "high|medium|low",
-            "commercial_intent": "high|medium|low",
-            "category": "informational|transactional|navigational"
-        }
-    ]
-}
-"""
-        
         try:
-            return self.generate_json(prompt, system_prompt)
+            return self.generate_json(prompt, _KEYWORDS_SYSTEM_PROMPT)
         except Exception as e:
             logger.error(f"Keyword generation failed: {e}")
             # Fallback: generate simple keywords
@@ -389,34 +1089,18 @@ Return result in JSON format:
     def _generate_fallback_keywords(self, fab_analysis: Dict) -> Dict:
         """Fallback keyword generation if AI fails"""
         product_name = fab_analysis.get('product_name', '')
-        target_audience = fab_analysis.get('target_audience', '')
-        
-        # Extract basic keywords from product name and audience
-        keywords = []
-        
-        if product_name:
-            # Split product name into words
-            words = product_name.lower().split()
-            for word in words:
-                if len(word) > 3:  # Only meaningful words
-                    keywords.append({
-                        "keyword": word,
-                        "match_type": "broad",
-                        "search_volume": "medium",
-                        "commercial_intent": "high",
-                        "category": "transactional"
-                    })
-        
-        # Add some generic keywords based on context
-        generic_keywords = [
-            {"keyword": "buy", "match_type": "phrase", "search_volume": "high", "commercial_intent": "high", "category": "transactional"},
-            {"keyword": "price", "match_type": "phrase", "search_volume": "high", "commercial_intent": "high", "category": "transactional"},
-            {"keyword": "order", "match_type": "phrase", "search_volume": "medium", "commercial_intent": "high", "category": "transactional"},
-            {"keyword": "services", "match_type": "broad", "search_volume": "high", "commercial_intent": "medium", "category": "informational"},
+
+        # dict.fromkeys дедуплицирует слова, сохраняя порядок;
+        # стоп-слова и короткие слова отфильтровываются за один проход
+        keywords = [
+            _make_fallback_keyword(word)
+            for word in dict.fromkeys(product_name.lower().split())
+            if len(word) > 3 and word not in _STOPWORDS
         ]
-        
-        keywords.extend(generic_keywords)
-        
+
+        # Добавляем базовые коммерческие ключевые слова
+        keywords.extend(dict(kw) for kw in _GENERIC_KEYWORDS)
+
         return {"keywords": keywords}
     
     def generate_google_ads(self, fab_analysis: Dict, keywords: List[str], 
@@ -432,6 +1116,12 @@ Return result in JSON format:
         Returns:
             Словарь с объявлениями
         """
+        # Читаем лимиты из настроек один раз (доступ к атрибутам pydantic заметно
+        # дороже локальных переменных)
+        headline_max = settings.headline_max_length
+        description_max = settings.description_max_length
+        path_max = settings.path_max_length
+
         prompt = f"""
 Create Google Ads based on FAB analysis and keywords.
 
@@ -441,15 +1131,15 @@ Target audience: {fab_analysis.get('target_audience', '')}
 Unique value proposition: {fab_analysis.get('unique_value_proposition', '')}
 
 **FAB statements:**
-{json.dumps(fab_analysis.get('fab_statements', []), ensure_ascii=False, indent=2)}
+{_json_dumps(fab_analysis.get('fab_statements', []))}
 
 **Keywords:**
 {', '.join(keywords[:10])}
 
 **Google Ads technical requirements:**
-- Headlines: max {settings.headline_max_length} characters each
-- Descriptions: max {settings.description_max_length} characters each
-- Paths: max {settings.path_max_length} characters each
+- Headlines: max {headline_max} characters each
+- Descriptions: max {description_max} characters each
+- Paths: max {path_max} characters each
 
 **Content requirements:**
 1. Use BAB method (Benefit-Advantage-Feature) - start with benefit
@@ -490,16 +1180,87 @@ Return result in JSON format:
 }}
 """
         
-        system_prompt = """
-You are an expert in creating Google Ads with over 10 years of experience.
-You know all technical limitations and best practices.
-Your ads always convert and attract target audience.
-You are a copywriting master and know buyer psychology.
+        return self.generate_json(prompt, _ADS_SYSTEM_PROMPT)
 
-IMPORTANT: Generate ads in the same language as the website content. If the website is in Ukrainian, generate Ukrainian ads. If in English, generate English ads. If in Russian, generate Russian ads.
+    def generate_full_pipeline(self, website_data: Dict,
+                               additional_context: Optional[str] = None) -> Dict:
+        """
+        Генерирует FAB анализ, ключевые слова и объявления одним запросом
+
+        Вместо трех последовательных обращений к AI (FAB -> keywords -> ads)
+        отправляет один объединенный промпт и получает один JSON с тремя
+        секциями. Экономит два полных round-trip и повторную передачу
+        системных промптов. При ошибке откатывается на трехшаговый путь.
 
+        Args:
+            website_data: Данные о сайте
+            additional_context: Дополнительный контекст
+
+        Returns:
+            Словарь {'fab_analysis': ..., 'keywords': ..., 'ads': ...}
+        """
+        from fab import FABMethodology
+
+        system_prompt = FABMethodology.get_fab_prompt() + """
+
+You are also an expert in SEO, Google Ads keywords and ad copywriting.
+Generate keywords and ads in the same language as the website content.
 Return result in JSON format.
 """
-        
-        return self.generate_json(prompt, system_prompt)
+
+        user_prompt = f"""
+{FABMethodology.create_fab_analysis_prompt(website_data)}
+
+**Additional tasks (use your own FAB analysis above as input):**
+
+2. Generate keywords for Google Ads: broad/phrase/exact/modified_broad match
+   types, informational and transactional queries, long-tail keywords.
+   For each keyword specify match_type, search_volume (high/medium/low),
+   commercial_intent (high/medium/low) and category.
+
+3. Create 5-7 Google Ads variations (emotional, rational, with offer,
+   social proof, problem-solving) using the BAB method. Technical limits:
+   headlines max {settings.headline_max_length} chars, descriptions max
+   {settings.description_max_length} chars, paths max {settings.path_max_length} chars.
+   For each ad: 3-5 headlines, 2-3 descriptions, 2 paths, suitable keywords.
+
+{f'**Additional context:** {additional_context}' if additional_context else ''}
+
+Return ONE JSON object with three top-level keys:
+{{
+    "fab_analysis": {{
+        "product_name": "...",
+        "target_audience": "...",
+        "fab_statements": [{{"feature": "...", "advantage": "...", "benefit": "...", "bab_format": "..."}}],
+        "unique_value_proposition": "..."
+    }},
+    "keywords": {{
+        "keywords": [{{"keyword": "...", "match_type": "...", "search_volume": "...", "commercial_intent": "...", "category": "..."}}]
+    }},
+    "ads": {{
+        "ads": [{{"type": "...", "headlines": [...], "descriptions": [...], "paths": [...], "keywords": [...], "notes": "..."}}]
+    }}
+}}
+"""
+
+        try:
+            result = self.generate_json(user_prompt, system_prompt)
+            if all(key in result for key in ('fab_analysis', 'keywords', 'ads')):
+                return result
+            logger.warning("Объединенный ответ неполный, переключаюсь на пошаговую генерацию")
+        except Exception as e:
+            logger.warning(f"Объединенная генерация не удалась ({e}), переключаюсь на пошаговую")
+
+        # Fallback: классический трехшаговый путь
+        fab_analysis = self.analyze_with_fab(website_data)
+        keywords_data = self.generate_keywords(fab_analysis, additional_context)
+        keywords_list = [kw.get('keyword', kw) if isinstance(kw, dict) else kw
+                         for kw in keywords_data.get('keywords', [])]
+        ads_data = self.generate_google_ads(fab_analysis, keywords_list[:20])
+
+        return {
+            'fab_analysis': fab_analysis,
+            'keywords': keywords_data,
+            'ads': ads_data
+        }
 
@@ -0,0 +1,98 @@
+"""
+Точный кэш ответов AI по SHA256 ключу
+Детерминированные вызовы (температура ≤ 0.2) с идентичными параметрами
+можно отдавать из кэша без эмбеддингов и сетевых запросов
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ExactCache:
+    """
+    Простой персистентный кэш: SHA256 от (provider, model, system_prompt,
+    prompt, temperature, json_mode) → ответ. SQLite бэкенд, TTL и
+    ограничение размера. Не требует никаких внешних зависимостей —
+    в отличие от семантического кэша работает всегда.
+    """
+
+    def __init__(self, db_path: Path, ttl: int = 0, max_entries: int = 10000):
+        """
+        Инициализация кэша
+
+        Args:
+            db_path: Путь к SQLite файлу кэша
+            ttl: Время жизни записи в секундах (0 = без ограничения)
+            max_entries: Максимум записей (при превышении удаляются старейшие)
+        """
+        self.db_path = Path(db_path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self.db_path.parent.mkdir(exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS exact_responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(provider: str, model: str, system_prompt: Optional[str],
+                 prompt: str, temperature: float, json_mode: bool) -> str:
+        """SHA256 от всех параметров вызова"""
+        payload = json.dumps({
+            "p": provider,
+            "m": model,
+            "s": system_prompt or "",
+            "u": prompt,
+            "t": round(temperature, 2),
+            "j": json_mode,
+        }, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Возвращает закэшированный ответ или None"""
+        row = self._conn.execute(
+            "SELECT response, created_at FROM exact_responses WHERE key = ?",
+            (key,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        response, created_at = row
+        if self.ttl > 0 and (time.time() - created_at) > self.ttl:
+            self._conn.execute("DELETE FROM exact_responses WHERE key = ?", (key,))
+            self._conn.commit()
+            return None
+
+        logger.info("Точный кэш: попадание")
+        return response
+
+    def put(self, key: str, response: str):
+        """Сохраняет ответ в кэш, вытесняя старейшие записи при переполнении"""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO exact_responses (key, response, created_at) "
+            "VALUES (?, ?, ?)",
+            (key, response, time.time())
+        )
+
+        count = self._conn.execute("SELECT COUNT(*) FROM exact_responses").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM exact_responses WHERE key IN ("
+                "SELECT key FROM exact_responses ORDER BY created_at ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+        self._conn.commit()
@@ -0,0 +1,252 @@
+"""
+Модуль семантического кэша для ответов AI
+Позволяет пропускать повторные LLM вызовы для идентичных и похожих промптов
+"""
+import hashlib
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+    SentenceTransformer = None
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+    faiss = None
+
+
+class SemanticCache:
+    """
+    Кэш ответов AI с двумя уровнями:
+
+    1. Точный кэш по SHA256 от (system_prompt, prompt) — для детерминированных
+       вызовов (низкая температура)
+    2. Семантический кэш: эмбеддинги промптов (sentence-transformers,
+       all-MiniLM-L6-v2) + косинусный поиск через FAISS IndexFlatIP
+       (или одно матричное умножение NumPy, если FAISS не установлен)
+
+    Данные персистятся в SQLite файле. Без sentence-transformers работает
+    только точный кэш.
+
+    Эмбеддинги хранятся квантованными до int8 (нормализованный float32
+    [-1, 1] умножается на 127): в 4 раза меньше памяти и трафика на запись
+    при незначительной потере точности косинусного поиска.
+    """
+
+    EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+    QUANT_SCALE = 127
+
+    def __init__(self, db_path: Path, threshold: float = 0.92, ttl: int = 0):
+        """
+        Инициализация кэша
+
+        Args:
+            db_path: Путь к SQLite файлу кэша
+            threshold: Порог косинусной близости для семантического попадания
+            ttl: Время жизни записи в секундах (0 = без ограничения)
+        """
+        self.db_path = Path(db_path)
+        self.threshold = threshold
+        self.ttl = ttl
+        self._model = None
+        self._index = None  # FAISS индекс (лениво, пересобирается при записи)
+        self._matrix = None  # Нормализованная матрица эмбеддингов (N, D), float32
+        self._index_rows = []  # (rowid, key) в порядке добавления в индекс
+
+        self.db_path.parent.mkdir(exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                cache_key TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                embedding BLOB,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_exact ON responses (cache_key, prompt_hash)"
+        )
+        # Миграция старых кэшей: исходно эмбеддинги хранились как float32
+        try:
+            self._conn.execute(
+                "ALTER TABLE responses ADD COLUMN embedding_dtype TEXT DEFAULT 'float32'"
+            )
+        except sqlite3.OperationalError:
+            pass  # Колонка уже есть
+        self._conn.commit()
+
+    @classmethod
+    def _quantize(cls, embedding):
+        """float32 [-1, 1] → int8 [-127, 127]"""
+        return np.clip(
+            np.round(np.asarray(embedding, dtype=np.float32) * cls.QUANT_SCALE),
+            -cls.QUANT_SCALE, cls.QUANT_SCALE
+        ).astype(np.int8)
+
+    @staticmethod
+    def make_key(provider: str, model: str, temperature: float, json_mode: bool) -> str:
+        """Строит ключ кэша по параметрам вызова (температура бакетируется до 0.1)"""
+        return f"{provider}:{model}:{round(temperature, 1)}:{int(json_mode)}"
+
+    @staticmethod
+    def hash_prompt(system_prompt: Optional[str], prompt: str) -> str:
+        """SHA256 от пары (system_prompt, prompt)"""
+        payload = f"{system_prompt or ''}\x00{prompt}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def embed(self, text: str):
+        """
+        Вычисляет нормализованный эмбеддинг текста.
+        Возвращает None, если sentence-transformers недоступен.
+        """
+        if not SENTENCE_TRANSFORMERS_AVAILABLE:
+            return None
+
+        if self._model is None:
+            logger.info(f"Загрузка модели эмбеддингов {self.EMBEDDING_MODEL}...")
+            self._model = SentenceTransformer(self.EMBEDDING_MODEL)
+
+        return self._model.encode([text], normalize_embeddings=True)[0]
+
+    def _is_expired(self, created_at: float) -> bool:
+        """Проверяет TTL записи"""
+        return self.ttl > 0 and (time.time() - created_at) > self.ttl
+
+    def lookup_exact(self, cache_key: str, prompt_hash: str) -> Optional[str]:
+        """Точный поиск по SHA256 хэшу промпта"""
+        row = self._conn.execute(
+            "SELECT response, created_at FROM responses "
+            "WHERE cache_key = ? AND prompt_hash = ? "
+            "ORDER BY created_at DESC LIMIT 1",
+            (cache_key, prompt_hash)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        response, created_at = row
+        if self._is_expired(created_at):
+            return None
+
+        logger.info("Кэш: точное попадание")
+        return response
+
+    def _rebuild_index(self):
+        """Пересобирает поисковую структуру из всех записей с эмбеддингами"""
+        rows = self._conn.execute(
+            "SELECT rowid, cache_key, embedding, embedding_dtype, created_at "
+            "FROM responses WHERE embedding IS NOT NULL"
+        ).fetchall()
+
+        vectors = []
+        self._index_rows = []
+        for rowid, key, blob, dtype, created_at in rows:
+            if self._is_expired(created_at):
+                continue
+            if dtype == 'int8':
+                vector = np.frombuffer(blob, dtype=np.int8)
+            else:
+                vector = self._quantize(np.frombuffer(blob, dtype=np.float32))
+            vectors.append(vector)
+            self._index_rows.append((rowid, key))
+
+        if not vectors:
+            self._index = None
+            self._matrix = None
+            return
+
+        # Одна непрерывная (N, D) int8 матрица: в 4 раза меньше float32,
+        # поиск — одно целочисленное матричное умножение
+        self._matrix = np.vstack(vectors)
+
+        if FAISS_AVAILABLE:
+            # FAISS IndexFlatIP работает с float32 — деквантуем при загрузке
+            matrix_f32 = self._matrix.astype(np.float32) / self.QUANT_SCALE
+            self._index = faiss.IndexFlatIP(matrix_f32.shape[1])
+            self._index.add(matrix_f32)
+
+    def lookup(self, embedding, cache_key: str, threshold: Optional[float] = None) -> Optional[str]:
+        """
+        Семантический поиск ближайшего промпта по косинусной близости.
+
+        Args:
+            embedding: Нормализованный эмбеддинг промпта
+            cache_key: Ключ кэша (provider/model/temperature/json_mode)
+            threshold: Порог близости (по умолчанию из настроек кэша)
+
+        Returns:
+            Закэшированный ответ или None
+        """
+        if embedding is None or not NUMPY_AVAILABLE:
+            return None
+
+        if self._matrix is None:
+            self._rebuild_index()
+        if self._matrix is None:
+            return None
+
+        threshold = threshold if threshold is not None else self.threshold
+        query = np.asarray(embedding, dtype=np.float32)
+        top_k = min(10, len(self._index_rows))
+
+        if FAISS_AVAILABLE and self._index is not None:
+            scores, indices = self._index.search(query.reshape(1, -1), top_k)
+            scores, indices = scores[0], indices[0]
+        else:
+            # Целочисленный скалярный продукт по всему корпусу за один вызов,
+            # с накоплением в int32 и обратным масштабированием к косинусу
+            query_q = self._quantize(query).astype(np.int32)
+            all_scores = (self._matrix.astype(np.int32) @ query_q) / (self.QUANT_SCALE ** 2)
+            indices = np.argsort(all_scores)[::-1][:top_k]
+            scores = all_scores[indices]
+
+        for score, idx in zip(scores, indices):
+            if idx < 0 or score < threshold:
+                continue
+            rowid, key = self._index_rows[idx]
+            if key != cache_key:
+                continue
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE rowid = ?", (rowid,)
+            ).fetchone()
+            if row:
+                logger.info(f"Кэш: семантическое попадание (близость {score:.3f})")
+                return row[0]
+
+        return None
+
+    def put(self, cache_key: str, prompt_hash: str, embedding, response: str):
+        """Сохраняет ответ в кэш (эмбеддинг — квантованный int8)"""
+        blob = None
+        if embedding is not None and np is not None:
+            blob = self._quantize(embedding).tobytes()
+
+        self._conn.execute(
+            "INSERT INTO responses "
+            "(cache_key, prompt_hash, embedding, embedding_dtype, response, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (cache_key, prompt_hash, blob, 'int8', response, time.time())
+        )
+        self._conn.commit()
+        # Индекс устарел — пересоберем при следующем lookup
+        self._index = None
+        self._matrix = None
@@ -2,6 +2,7 @@
 Конфигурация приложения для AI Marketing
 """
 import os
+from functools import lru_cache
 from pathlib import Path
 from pydantic_settings import BaseSettings
 from typing import Literal
@@ -27,6 +28,23 @@ class Settings(BaseSettings):
     # Параметры парсинга
     request_timeout: int = 30
     max_retries: int = 3
+
+    # HTTP пул соединений для AI провайдеров
+    http_pool_size: int = 16
+
+    # Клиентский rate limit на AI вызовы (запросов в минуту, 0 = выключен)
+    ai_requests_per_minute: int = 0
+
+    # Движок записи XLSX экспортов
+    xlsx_backend: Literal["openpyxl", "xlsxwriter"] = "openpyxl"
+
+    # Точный кэш детерминированных AI вызовов (температура <= 0.2)
+    exact_cache_enabled: bool = False  # Set to True to enable exact response caching
+
+    # Семантический кэш ответов AI
+    sem_cache_enabled: bool = False  # Set to True to enable response caching
+    sem_cache_threshold: float = 0.92
+    sem_cache_ttl: int = 86400  # Время жизни записи в секундах (0 = без ограничения)
     
     # Параметры Google Ads
     google_ads_developer_token: str = ""
@@ -53,13 +71,21 @@ class Settings(BaseSettings):
         env_file = ".env"
         env_file_encoding = "utf-8"
         case_sensitive = False
-    
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        # Создаем output директорию если её нет
-        self.output_dir.mkdir(exist_ok=True)
 
 
-# Глобальный экземпляр настроек
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Возвращает единственный экземпляр настроек.
+
+    Чтение .env, валидация и создание output директории выполняются один
+    раз на процесс, а не при каждом конструировании Settings.
+    """
+    settings = Settings()
+    settings.output_dir.mkdir(exist_ok=True, parents=True)
+    return settings
+
+
+# Глобальный экземпляр настроек (для обратной совместимости импортов)
+settings = get_settings()
 
@@ -3,7 +3,11 @@
 Example script demonstrating Google Ads MCP integration
 Shows how to combine Google Ads data with AI-generated content
 """
+import functools
 import logging
+import threading
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from google_ads import GoogleAdsMCPServer
 from ai import AIGenerator
@@ -15,25 +19,89 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def example_1_basic_queries():
+# Lazy singletons: AI client and Excel exporter are constructed at most once
+@functools.lru_cache(maxsize=1)
+def get_ai_generator() -> AIGenerator:
+    return AIGenerator()
+
+
+@functools.lru_cache(maxsize=1)
+def get_excel_exporter() -> ExcelExporter:
+    return ExcelExporter(settings.output_dir)
+
+
+# Fixed GAQL query for example_6 — built once at import, not per call
+CUSTOM_CAMPAIGN_QUERY = """
+    SELECT 
+        campaign.id,
+        campaign.name,
+        metrics.impressions,
+        metrics.clicks,
+        metrics.ctr,
+        metrics.cost_micros
+    FROM campaign
+    WHERE segments.date DURING LAST_30_DAYS
+    ORDER BY metrics.impressions DESC
+    LIMIT 5
+"""
+
+
+_BANNER = "=" * 60
+
+
+def _hdr(title: str):
+    """Print a section banner (the separator string is built once per module)"""
+    print(f"\n{_BANNER}\n{title}\n{_BANNER}\n")
+
+
+def _flatten_campaign_row(row):
+    """
+    Flatten one GAQL campaign row into a (name, impressions, clicks) tuple.
+
+    Binding the nested dicts once per row avoids re-allocating default {}
+    dicts in chained .get() calls inside the print loops.
+    """
+    campaign = row.get('campaign') or {}
+    metrics = row.get('metrics') or {}
+    return (campaign.get('name', 'N/A'),
+            metrics.get('impressions', 0),
+            metrics.get('clicks', 0))
+
+
+def run_concurrently(*calls):
+    """
+    Run independent MCP calls in parallel threads.
+
+    Each call is a zero-argument callable; results come back in the same
+    order. The Google Ads API calls are network-bound, so overlapping them
+    cuts wall time to roughly the slowest single round trip.
+    """
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        futures = [executor.submit(call) for call in calls]
+        return [future.result() for future in futures]
+
+
+def example_1_basic_queries(mcp: GoogleAdsMCPServer):
     """Example 1: Basic Google Ads queries"""
-    print("\n" + "="*60)
-    print("Example 1: Basic Google Ads Queries")
-    print("="*60 + "\n")
+    _hdr("Example 1: Basic Google Ads Queries")
     
-    # Initialize MCP server
-    mcp = GoogleAdsMCPServer()
+    # The three queries are independent — issue them concurrently
+    accounts, summary, campaigns = run_concurrently(
+        mcp.list_accounts,
+        lambda: mcp.get_account_summary("LAST_30_DAYS"),
+        lambda: mcp.get_campaigns("LAST_30_DAYS"),
+    )
     
-    # List accounts
+    # List accounts (rows are joined into one buffered write)
     print("📋 Your Google Ads accounts:")
-    accounts = mcp.list_accounts()
     if accounts['success']:
-        for acc in accounts['accounts'][:5]:
-            print(f"  - {acc['id']}: {acc['resource_name']}")
+        print("\n".join(
+            f"  - {acc['id']}: {acc['resource_name']}"
+            for acc in accounts['accounts'][:5]
+        ))
     
     # Get account summary
     print("\n📊 Account summary (Last 30 days):")
-    summary = mcp.get_account_summary("LAST_30_DAYS")
     if summary['success'] and summary['summary']:
         metrics = summary['summary'].get('metrics', {})
         print(f"  Impressions: {metrics.get('impressions', 0):,}")
@@ -43,28 +111,27 @@ def example_1_basic_queries():
     
     # Get campaigns
     print("\n🎯 Top campaigns:")
-    campaigns = mcp.get_campaigns("LAST_30_DAYS")
     if campaigns['success']:
-        for i, camp in enumerate(campaigns['campaigns'][:5], 1):
-            camp_data = camp.get('campaign', {})
-            metrics = camp.get('metrics', {})
-            print(f"  {i}. {camp_data.get('name', 'N/A')}")
-            print(f"     Impressions: {metrics.get('impressions', 0):,}, "
-                  f"Clicks: {metrics.get('clicks', 0):,}")
+        rows = list(map(_flatten_campaign_row, campaigns['campaigns'][:5]))
+        lines = []
+        for i, (name, impressions, clicks) in enumerate(rows, 1):
+            lines.append(f"  {i}. {name}")
+            lines.append(f"     Impressions: {impressions:,}, Clicks: {clicks:,}")
+        print("\n".join(lines))
 
 
-def example_2_diagnostics():
+def example_2_diagnostics(mcp: GoogleAdsMCPServer):
     """Example 2: Automated diagnostics"""
-    print("\n" + "="*60)
-    print("Example 2: Automated Diagnostics")
-    print("="*60 + "\n")
+    _hdr("Example 2: Automated Diagnostics")
     
-    mcp = GoogleAdsMCPServer()
+    # Both diagnostics are independent — run them in parallel
+    quality_issues, cost_issues = run_concurrently(
+        lambda: mcp.diagnose_low_quality_scores(min_impressions=100),
+        mcp.diagnose_high_cost_campaigns,
+    )
     
     # Find low quality keywords
     print("🔍 Checking for low quality score keywords...")
-    quality_issues = mcp.diagnose_low_quality_scores(min_impressions=100)
-    
     if quality_issues['success']:
         count = quality_issues['count']
         if count > 0:
@@ -80,8 +147,6 @@ def example_2_diagnostics():
     
     # Find expensive campaigns
     print("\n💰 Checking for high-cost low-conversion campaigns...")
-    cost_issues = mcp.diagnose_high_cost_campaigns()
-    
     if cost_issues['success']:
         count = cost_issues['count']
         if count > 0:
@@ -91,13 +156,9 @@ def example_2_diagnostics():
             print("✅ No cost issues found!")
 
 
-def example_3_natural_language():
+def example_3_natural_language(mcp: GoogleAdsMCPServer):
     """Example 3: Natural language queries"""
-    print("\n" + "="*60)
-    print("Example 3: Natural Language Queries")
-    print("="*60 + "\n")
-    
-    mcp = GoogleAdsMCPServer()
+    _hdr("Example 3: Natural Language Queries")
     
     # Example queries
     queries = [
@@ -107,10 +168,13 @@ def example_3_natural_language():
         "Show me keywords"
     ]
     
-    for query in queries:
+    # The queries are independent, so resolve them all at once
+    results = run_concurrently(
+        *[functools.partial(mcp.process_natural_language_request, q) for q in queries]
+    )
+    
+    for query, result in zip(queries, results):
         print(f"\n💬 Query: '{query}'")
-        result = mcp.process_natural_language_request(query)
-        
         if result['success']:
             count = result.get('count', 0)
             print(f"   ✓ Found {count} results")
@@ -118,32 +182,38 @@ def example_3_natural_language():
             print(f"   ✗ Error: {result.get('error', 'Unknown')}")
 
 
-def example_4_combine_with_content_generation():
+def example_4_combine_with_content_generation(mcp: GoogleAdsMCPServer):
     """Example 4: Combine Google Ads data with AI content generation"""
-    print("\n" + "="*60)
-    print("Example 4: Combine Google Ads Data with Content Generation")
-    print("="*60 + "\n")
+    _hdr("Example 4: Combine Google Ads Data with Content Generation")
     
     # Step 1: Get top performing keywords from Google Ads
     print("📊 Step 1: Getting top performing keywords from your account...")
-    mcp = GoogleAdsMCPServer()
     keywords_result = mcp.get_keywords(date_range="LAST_30_DAYS", min_impressions=100)
     
     if not keywords_result['success']:
         print(f"Error getting keywords: {keywords_result.get('error')}")
         return
     
-    # Extract high-performing keywords (those with conversions)
+    # Extract high-performing keywords (those with conversions) —
+    # vectorized columnar filter instead of per-row dict .get() chains
     all_keywords = keywords_result['keywords']
-    top_keywords = [
-        kw.get('keyword', '')
-        for kw in all_keywords[:20]
-        if kw.get('metrics', {}).get('conversions', 0) > 0
-    ]
-    
-    # Fallback to high-impression keywords if no conversions
-    if not top_keywords:
-        top_keywords = [kw.get('keyword', '') for kw in all_keywords[:20]]
+    df = pd.json_normalize(all_keywords)
+    top_keywords = []
+    if 'keyword' in df.columns:
+        # Dedupe first (the same keyword shows up once per ad group) —
+        # duplicates would be paid for twice in LLM prompt tokens
+        unique = df.drop_duplicates(subset='keyword')
+        if len(unique) < len(df):
+            logger.info("Dropped %d duplicate keywords before generation",
+                        len(df) - len(unique))
+        
+        if 'metrics.conversions' in unique.columns:
+            converting = unique['metrics.conversions'].fillna(0) > 0
+            top_keywords = unique.loc[converting, 'keyword'].fillna('').head(20).tolist()
+        
+        # Fallback to high-impression keywords if no conversions
+        if not top_keywords:
+            top_keywords = unique['keyword'].fillna('').head(20).tolist()
     
     print(f"✓ Found {len(top_keywords)} high-performing keywords:")
     for i, kw in enumerate(top_keywords[:5], 1):
@@ -168,7 +238,7 @@ def example_4_combine_with_content_generation():
     }
     
     try:
-        ai_gen = AIGenerator()
+        ai_gen = get_ai_generator()
         new_ads = ai_gen.generate_google_ads(fab_analysis, top_keywords[:10])
         
         print(f"✓ Generated {len(new_ads.get('ads', []))} new ad variations")
@@ -182,7 +252,7 @@ def example_4_combine_with_content_generation():
         
         # Export to Excel
         print("\n💾 Step 3: Exporting to Excel...")
-        exporter = ExcelExporter(settings.output_dir)
+        exporter = get_excel_exporter()
         
         # Prepare keywords data for export
         keywords_data = {
@@ -203,80 +273,69 @@ def example_4_combine_with_content_generation():
         logger.exception("Error in content generation")
 
 
-def example_5_search_terms_analysis():
+def example_5_search_terms_analysis(mcp: GoogleAdsMCPServer):
     """Example 5: Analyze actual search terms"""
-    print("\n" + "="*60)
-    print("Example 5: Search Terms Analysis")
-    print("="*60 + "\n")
-    
-    mcp = GoogleAdsMCPServer()
+    _hdr("Example 5: Search Terms Analysis")
     
     print("🔍 Getting search terms (what users actually searched for)...")
     result = mcp.get_search_terms(date_range="LAST_7_DAYS")
     
     if result['success']:
-        terms = result['search_terms']
+        cols = result['columns']
+        impressions = cols['impressions']
         print(f"✓ Found {result['count']} search terms\n")
         
+        # Top-10 by impressions over the SoA columns: O(N) argpartition
+        # instead of a full sort of dicts
+        count = len(impressions)
+        top_n = min(10, count)
+        if hasattr(impressions, 'argpartition') and count > top_n:
+            top_idx = impressions.argpartition(-top_n)[-top_n:]
+            top_idx = top_idx[impressions[top_idx].argsort()[::-1]]
+        else:
+            top_idx = sorted(range(count), key=impressions.__getitem__, reverse=True)[:top_n]
+        
         print("Top search terms by impressions:")
-        for i, term in enumerate(terms[:10], 1):
-            metrics = term.get('metrics', {})
-            print(f"  {i}. {term.get('search_term', 'N/A')}")
-            print(f"     Impressions: {metrics.get('impressions', 0):,}, "
-                  f"Clicks: {metrics.get('clicks', 0):,}, "
-                  f"Cost: ${metrics.get('cost_micros', 0) / 1_000_000:.2f}")
+        lines = []
+        for i, idx in enumerate(top_idx, 1):
+            lines.append(f"  {i}. {cols['search_term'][idx] or 'N/A'}")
+            lines.append(f"     Impressions: {impressions[idx]:,}, "
+                         f"Clicks: {cols['clicks'][idx]:,}, "
+                         f"Cost: ${cols['cost_micros'][idx] / 1_000_000:.2f}")
+        print("\n".join(lines))
     else:
         print(f"Error: {result.get('error')}")
 
 
-def example_6_custom_gaql_query():
+def example_6_custom_gaql_query(mcp: GoogleAdsMCPServer):
     """Example 6: Custom GAQL query"""
-    print("\n" + "="*60)
-    print("Example 6: Custom GAQL Query")
-    print("="*60 + "\n")
-    
-    mcp = GoogleAdsMCPServer()
+    _hdr("Example 6: Custom GAQL Query")
     
     # Custom query to get campaigns with specific metrics
-    query = """
-        SELECT 
-            campaign.id,
-            campaign.name,
-            metrics.impressions,
-            metrics.clicks,
-            metrics.ctr,
-            metrics.cost_micros
-        FROM campaign
-        WHERE segments.date DURING LAST_30_DAYS
-        ORDER BY metrics.impressions DESC
-        LIMIT 5
-    """
-    
     print("📊 Running custom GAQL query:")
-    print(query)
+    print(CUSTOM_CAMPAIGN_QUERY)
     
-    result = mcp.run_custom_query(query)
+    result = mcp.run_custom_query(CUSTOM_CAMPAIGN_QUERY)
     
     if result['success']:
         print(f"\n✓ Query returned {result['count']} results\n")
-        for i, row in enumerate(result['results'], 1):
-            camp = row.get('campaign', {})
-            metrics = row.get('metrics', {})
-            print(f"  {i}. {camp.get('name', 'N/A')}")
-            print(f"     Impressions: {metrics.get('impressions', 0):,}, "
-                  f"Clicks: {metrics.get('clicks', 0):,}")
+        rows = list(map(_flatten_campaign_row, result['results']))
+        lines = []
+        for i, (name, impressions, clicks) in enumerate(rows, 1):
+            lines.append(f"  {i}. {name}")
+            lines.append(f"     Impressions: {impressions:,}, Clicks: {clicks:,}")
+        print("\n".join(lines))
     else:
         print(f"Error: {result.get('error')}")
 
 
 def main():
     """Run all examples"""
-    print("\n" + "="*60)
-    print("Google Ads MCP Integration Examples")
-    print("="*60)
+    print(f"\n{_BANNER}\nGoogle Ads MCP Integration Examples\n{_BANNER}")
     
     try:
-        # Check if Google Ads is configured
+        # Check if Google Ads is configured; the same server instance is
+        # reused by every example below (one credential load, one API client)
         print("\n🔧 Checking Google Ads configuration...")
         mcp = GoogleAdsMCPServer()
         
@@ -289,22 +348,29 @@ def main():
         
         print("✅ Google Ads API is configured and working!\n")
         
+        # Ask up front in a background thread: the human answers while the
+        # network-bound examples below are already running
+        answer = []
+        prompt_thread = threading.Thread(
+            target=lambda: answer.append(
+                input("\nRun content generation example at the end? (y/n): ")),
+            daemon=True)
+        prompt_thread.start()
+        
         # Run examples
-        example_1_basic_queries()
-        example_2_diagnostics()
-        example_3_natural_language()
-        example_5_search_terms_analysis()
-        example_6_custom_gaql_query()
+        example_1_basic_queries(mcp)
+        example_2_diagnostics(mcp)
+        example_3_natural_language(mcp)
+        example_5_search_terms_analysis(mcp)
+        example_6_custom_gaql_query(mcp)
         
         # This one might take longer due to AI generation
-        print("\n" + "="*60)
-        run_generation = input("\nRun content generation example? (y/n): ").lower()
-        if run_generation == 'y':
-            example_4_combine_with_content_generation()
+        print("\n" + _BANNER)
+        prompt_thread.join()
+        if answer and answer[0].lower() == 'y':
+            example_4_combine_with_content_generation(mcp)
         
-        print("\n" + "="*60)
-        print("✅ All examples completed!")
-        print("="*60 + "\n")
+        _hdr("✅ All examples completed!")
         
     except FileNotFoundError as e:
         print(f"\n❌ Error: {e}")
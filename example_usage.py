@@ -3,6 +3,7 @@
 Пример программного использования AI Marketing
 (без CLI, через импорт модулей)
 """
+import functools
 from parsers import WebsiteParser
 from ai import AIGenerator
 from fab import FABMethodology
@@ -10,26 +11,44 @@ from exporters import ExcelExporter
 from config import settings
 
 
+# Ленивые синглтоны: тяжелые объекты (SDK клиенты, HTTP сессии)
+# создаются один раз и переиспользуются всеми примерами
+_BANNER = "=" * 60
+
+
+@functools.cache
+def _ai() -> AIGenerator:
+    return AIGenerator()
+
+
+@functools.cache
+def _exporter() -> ExcelExporter:
+    return ExcelExporter(settings.output_dir)
+
+
+@functools.cache
+def _parser() -> WebsiteParser:
+    return WebsiteParser()
+
+
 def example_full_analysis():
     """Пример полного анализа сайта"""
     
-    print("=" * 60)
-    print("AI Marketing - Пример использования")
-    print("=" * 60)
+    print(f"{_BANNER}\nAI Marketing - Пример использования\n{_BANNER}")
     
     # URL для анализа
     url = "https://www.example.com"
     
     # 1. Парсинг сайта
     print("\n1. Парсинг контента сайта...")
-    parser = WebsiteParser()
+    parser = _parser()
     website_data = parser.parse_url(url)
     print(f"   ✓ Заголовок: {website_data['title']}")
     print(f"   ✓ Домен: {website_data['domain']}")
     
     # 2. FAB анализ
     print("\n2. Анализ по методологии FAB...")
-    ai_generator = AIGenerator()
+    ai_generator = _ai()
     fab_analysis = ai_generator.analyze_with_fab(website_data)
     print(f"   ✓ Продукт: {fab_analysis.get('product_name', 'N/A')}")
     print(f"   ✓ Целевая аудитория: {fab_analysis.get('target_audience', 'N/A')}")
@@ -49,15 +68,13 @@ def example_full_analysis():
     
     # 5. Экспорт в Excel
     print("\n5. Экспорт в Excel...")
-    exporter = ExcelExporter(settings.output_dir)
+    exporter = _exporter()
     filepath = exporter.export_complete_report(
         website_data, fab_analysis, keywords_data, ads_data
     )
     print(f"   ✓ Файл сохранен: {filepath}")
     
-    print("\n" + "=" * 60)
-    print("✓ Анализ завершен успешно!")
-    print("=" * 60)
+    print(f"\n{_BANNER}\n✓ Анализ завершен успешно!\n{_BANNER}")
     
     return {
         'website_data': website_data,
@@ -92,9 +109,7 @@ def example_custom_fab():
 def example_keywords_only():
     """Пример генерации только ключевых слов"""
     
-    print("\n" + "=" * 60)
-    print("Генерация ключевых слов")
-    print("=" * 60)
+    print(f"\n{_BANNER}\nГенерация ключевых слов\n{_BANNER}")
     
     # Создаем упрощенный FAB анализ
     fab_analysis = {
@@ -110,11 +125,11 @@ def example_keywords_only():
         ]
     }
     
-    ai_generator = AIGenerator()
+    ai_generator = _ai()
     keywords_data = ai_generator.generate_keywords(fab_analysis)
     
     # Экспорт
-    exporter = ExcelExporter(settings.output_dir)
+    exporter = _exporter()
     filepath = exporter.export_keywords(keywords_data, 'keywords_example.xlsx')
     
     print(f"✓ Ключевые слова сохранены: {filepath}")
@@ -129,14 +144,16 @@ def example_multiple_sites():
         "https://www.example3.com"
     ]
     
-    parser = WebsiteParser()
+    parser = _parser()
     results = parser.parse_multiple_pages(urls)
     
     print(f"\n✓ Спарсено сайтов: {len(results)}")
     
-    for result in results:
-        print(f"\n- {result['domain']}")
-        print(f"  Заголовок: {result['title'][:50]}...")
+    # Одна буферизованная запись вместо print на каждую строку
+    print("\n".join(
+        f"\n- {result['domain']}\n  Заголовок: {result['title'][:50]}..."
+        for result in results
+    ))
 
 
 if __name__ == '__main__':
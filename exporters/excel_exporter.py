@@ -1,27 +1,310 @@
 """
 Модуль для экспорта данных в Excel и CSV
 """
-import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, NamedStyle
+from openpyxl.utils import get_column_letter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from itertools import product
+import csv
 import logging
+from config import settings
+
+try:
+    import xlsxwriter
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+    xlsxwriter = None
 
 logger = logging.getLogger(__name__)
 
+# Лимит Excel — 1 048 576 строк; при превышении лист делится на части
+MAX_ROWS_PER_SHEET = 1_000_000
+
+# Колонки листов — модульные константы (создаются один раз)
+AD_COLS = ('Ad Group', 'Type', 'Headline', 'Description', 'Path 1', 'Path 2', 'Keywords', 'Notes')
+AD_COLS_SHORT = ('Ad Group', 'Type', 'Headline', 'Description', 'Path 1', 'Keywords')
+HEADLINE_COLS = ('Ad Group', 'Type', 'Headline', 'Length', 'Status')
+DESCRIPTION_COLS = ('Ad Group', 'Type', 'Description', 'Length', 'Status')
+AD_KEYWORD_COLS = ('Ad Group', 'Type', 'Keyword')
+KEYWORD_COLS = ('Keyword', 'Match Type', 'Search Volume', 'Commercial Intent', 'Category')
+
+# Базовые ключевые слова, когда входные данные пусты (один общий кортеж,
+# не пересоздается при каждом вызове export_keywords)
+DEFAULT_KEYWORD_ROWS = (
+    ('buy', 'phrase', 'high', 'high', 'transactional'),
+    ('price', 'phrase', 'high', 'high', 'transactional'),
+    ('order', 'phrase', 'medium', 'high', 'transactional'),
+    ('services', 'broad', 'high', 'medium', 'informational'),
+)
+FAB_COLS = ('Feature', 'Advantage', 'Benefit', 'BAB Format')
+GENERAL_INFO_COLS = ('Product Name', 'Target Audience', 'Unique Value Proposition')
+SITE_INFO_COLS = ('URL', 'Title', 'Description', 'Domain')
+
+# Общий стиль для колонок с переносом текста (один объект на модуль);
+# в книге регистрируется как именованный стиль и присваивается по имени,
+# без повторного хэширования объекта стиля на каждую ячейку
+WRAP_ALIGNMENT = Alignment(wrap_text=True, vertical='top')
+WRAP_STYLE_NAME = 'wrap_text_body' 
+
 
 class ExcelExporter:
     """Класс для экспорта данных в Excel"""
     
-    def __init__(self, output_dir: Path):
+    def __init__(self, output_dir: Path, backend: Optional[str] = None):
         """
         Инициализация экспортера
         
         Args:
             output_dir: Директория для сохранения файлов
+            backend: Движок записи XLSX: "openpyxl" или "xlsxwriter"
+                     (по умолчанию из settings.xlsx_backend)
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        
+        self.backend = backend or settings.xlsx_backend
+        if self.backend == "xlsxwriter" and not XLSXWRITER_AVAILABLE:
+            logger.warning(
+                "xlsxwriter не установлен, используется openpyxl. "
+                "Установите xlsxwriter: pip install xlsxwriter")
+            self.backend = "openpyxl"
+    
+    @staticmethod
+    def _normalize_keyword_rows(keywords_data, str_category: str = 'transactional') -> List[Tuple]:
+        """
+        Нормализует ключевые слова в кортежи строк
+        (Keyword, Match Type, Search Volume, Commercial Intent, Category)
+        
+        Тип элементов определяется один раз по первому элементу — без
+        isinstance на каждую строку; смешанные списки обрабатываются
+        медленным путем с проверкой типов.
+        
+        Args:
+            keywords_data: Словарь с ключом 'keywords' или список строк/словарей
+            str_category: Категория по умолчанию для голых строк
+        """
+        if isinstance(keywords_data, dict):
+            items = keywords_data.get('keywords', [])
+        elif isinstance(keywords_data, list):
+            items = keywords_data
+        else:
+            return []
+        
+        if not items:
+            return []
+        
+        # Специализированные циклы по типу первого элемента
+        if isinstance(items[0], str) and all(isinstance(kw, str) for kw in items):
+            return [(kw, 'broad', 'medium', 'medium', str_category) for kw in items]
+        
+        if isinstance(items[0], dict) and all(isinstance(kw, dict) for kw in items):
+            return [
+                (kw.get('keyword', ''),
+                 kw.get('match_type', 'broad'),
+                 kw.get('search_volume', 'medium'),
+                 kw.get('commercial_intent', 'medium'),
+                 kw.get('category', 'transactional'))
+                for kw in items
+            ]
+        
+        # Смешанный список — общий путь с проверкой типов
+        rows = []
+        for kw in items:
+            if isinstance(kw, str):
+                rows.append((kw, 'broad', 'medium', 'medium', str_category))
+            elif isinstance(kw, dict):
+                rows.append((
+                    kw.get('keyword', ''),
+                    kw.get('match_type', 'broad'),
+                    kw.get('search_volume', 'medium'),
+                    kw.get('commercial_intent', 'medium'),
+                    kw.get('category', 'transactional')
+                ))
+        return rows
+    
+    def _default_path(self, prefix: str, filename: Optional[str]) -> Path:
+        """Путь к файлу экспорта: имя из аргумента или префикс с таймстемпом"""
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"{prefix}_{timestamp}.xlsx"
+        return self.output_dir / filename
+    
+    @staticmethod
+    def _compute_widths(header: Tuple, rows: List[Tuple], width_cap: int) -> List[int]:
+        """
+        Считает ширины колонок за один проход по данным
+        
+        Проход прерывается досрочно, как только все колонки уперлись
+        в потолок ширины — на больших листах с длинным текстом это
+        экономит почти весь скан.
+        """
+        cap_raw = width_cap - 2
+        widths = [len(str(value)) for value in header]
+        for row in rows:
+            if min(widths) >= cap_raw:
+                break
+            for i, value in enumerate(row):
+                length = len(str(value))
+                if length > widths[i]:
+                    widths[i] = length
+        return [min(width + 2, width_cap) for width in widths]
+    
+    def _save_workbook(self, filepath: Path, sheets: List[Tuple], width_cap: int = 50):
+        """
+        Потоково пишет книгу: sheets — список (название, шапка, строки)
+        или (название, шапка, строки, опции), где опции — словарь с ключами
+        'widths' (ширины колонок {номер: ширина}, 1-based) и 'wrap_cols'
+        (номера колонок с переносом текста).
+        
+        Строки не материализуются в объекты ячеек целиком — оба движка
+        (openpyxl write-only и xlsxwriter constant_memory) сериализуют их
+        потоково, память остается константной по числу строк. Ширины
+        колонок считаются за один проход по данным и выставляются до
+        записи строк. Листы длиннее MAX_ROWS_PER_SHEET автоматически
+        делятся на части.
+        """
+        if self.backend == "xlsxwriter":
+            self._save_with_xlsxwriter(filepath, sheets, width_cap)
+            return
+        
+        workbook = Workbook(write_only=True)
+        workbook.add_named_style(NamedStyle(name=WRAP_STYLE_NAME, alignment=WRAP_ALIGNMENT))
+        for title, header, rows, *rest in sheets:
+            options = rest[0] if rest else {}
+            widths = self._compute_widths(header, rows, width_cap)
+            for column, width in (options.get('widths') or {}).items():
+                widths[column - 1] = width
+            wrap_cols = frozenset(options.get('wrap_cols') or ())
+            
+            for start in range(0, max(len(rows), 1), MAX_ROWS_PER_SHEET):
+                part = start // MAX_ROWS_PER_SHEET + 1
+                worksheet = workbook.create_sheet(title if part == 1 else f"{title} ({part})")
+                for i, width in enumerate(widths, 1):
+                    worksheet.column_dimensions[get_column_letter(i)].width = width
+                worksheet.append(header)
+                for row in rows[start:start + MAX_ROWS_PER_SHEET]:
+                    if wrap_cols:
+                        row = tuple(
+                            self._wrap_cell(worksheet, value) if i in wrap_cols else value
+                            for i, value in enumerate(row, 1)
+                        )
+                    worksheet.append(row)
+        workbook.save(filepath)
+    
+    @staticmethod
+    def _wrap_cell(worksheet, value):
+        """Ячейка write-only листа с общим именованным стилем переноса текста"""
+        cell = WriteOnlyCell(worksheet, value=value)
+        cell.style = WRAP_STYLE_NAME
+        return cell
+    
+    @staticmethod
+    def _save_with_xlsxwriter(filepath: Path, sheets: List[Tuple], width_cap: int = 50):
+        """Запись через xlsxwriter в constant_memory режиме (строки сразу на диск)"""
+        workbook = xlsxwriter.Workbook(str(filepath), {'constant_memory': True})
+        wrap_format = workbook.add_format({'text_wrap': True, 'valign': 'top'})
+        try:
+            for title, header, rows, *rest in sheets:
+                options = rest[0] if rest else {}
+                widths = ExcelExporter._compute_widths(header, rows, width_cap)
+                for column, width in (options.get('widths') or {}).items():
+                    widths[column - 1] = width
+                wrap_cols = frozenset(options.get('wrap_cols') or ())
+                
+                for start in range(0, max(len(rows), 1), MAX_ROWS_PER_SHEET):
+                    part = start // MAX_ROWS_PER_SHEET + 1
+                    worksheet = workbook.add_worksheet(title if part == 1 else f"{title} ({part})")
+                    for i, width in enumerate(widths):
+                        cell_format = wrap_format if (i + 1) in wrap_cols else None
+                        worksheet.set_column(i, i, width, cell_format)
+                    worksheet.write_row(0, 0, header)
+                    for row_idx, row in enumerate(rows[start:start + MAX_ROWS_PER_SHEET], 1):
+                        worksheet.write_row(row_idx, 0, row)
+        finally:
+            workbook.close()
+    
+    @staticmethod
+    def _expand_ads(ads_list: List[Dict], keyword_limit: int = 5,
+                    include_extras: bool = True) -> List[Tuple]:
+        """
+        Разворачивает объявления в строки кросс-произведения
+        заголовков × описаний (одна реализация для обоих экспортов)
+        
+        Args:
+            ads_list: Список объявлений
+            keyword_limit: Сколько ключевых слов включать в превью-колонку
+            include_extras: Добавлять ли колонки Path 2 и Notes
+        """
+        rows = []
+        for idx, ad in enumerate(ads_list, 1):
+            ad_group = f"Ad Group {idx}"
+            ad_type = ad.get('type', '')
+            paths = ad.get('paths', [])
+            path_1 = paths[0] if paths else ''
+            keywords_joined = ', '.join(ad.get('keywords', [])[:keyword_limit])
+            pairs = product(ad.get('headlines', []), ad.get('descriptions', []))
+            
+            if include_extras:
+                path_2 = paths[1] if len(paths) > 1 else ''
+                notes = ad.get('notes', '')
+                rows.extend(
+                    (ad_group, ad_type, headline, description,
+                     path_1, path_2, keywords_joined, notes)
+                    for headline, description in pairs
+                )
+            else:
+                rows.extend(
+                    (ad_group, ad_type, headline, description, path_1, keywords_joined)
+                    for headline, description in pairs
+                )
+        return rows
+    
+    def _google_ads_sheets(self, ads_data: Dict) -> List[Tuple]:
+        """Строит листы экспорта объявлений (для единичной и батчевой записи)"""
+        ads_list = ads_data.get('ads', [])
+        headline_max = settings.headline_max_length
+        description_max = settings.description_max_length
+        
+        # Строки всех листов как кортежи (без промежуточных DataFrame);
+        # кросс-произведение заголовков × описаний — в общем _expand_ads
+        all_ads = self._expand_ads(ads_list, keyword_limit=5, include_extras=True)
+        headlines_rows = []
+        descriptions_rows = []
+        keywords_rows = []
+        for idx, ad in enumerate(ads_list, 1):
+            ad_group = f"Ad Group {idx}"
+            ad_type = ad.get('type', '')
+            
+            headlines_rows.extend(
+                (ad_group, ad_type, headline, length,
+                 'OK' if length <= headline_max else 'TOO LONG')
+                for headline in ad.get('headlines', [])
+                for length in (len(headline),)
+            )
+            
+            descriptions_rows.extend(
+                (ad_group, ad_type, description, length,
+                 'OK' if length <= description_max else 'TOO LONG')
+                for description in ad.get('descriptions', [])
+                for length in (len(description),)
+            )
+            
+            keywords_rows.extend(
+                (ad_group, ad_type, keyword) for keyword in ad.get('keywords', []))
+        
+        return [
+            ('All Ads', AD_COLS, all_ads),
+            ('Headlines', HEADLINE_COLS, headlines_rows),
+            ('Descriptions', DESCRIPTION_COLS, descriptions_rows),
+            ('Keywords', AD_KEYWORD_COLS, keywords_rows),
+        ]
     
     def export_google_ads(self, ads_data: Dict, filename: Optional[str] = None) -> str:
         """
@@ -34,164 +317,81 @@ class ExcelExporter:
         Returns:
             Путь к сохраненному файлу
         """
-        if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"google_ads_{timestamp}.xlsx"
-        
-        filepath = self.output_dir / filename
+        filepath = self._default_path('google_ads', filename)
         
-        # Создаем DataFrame для каждого листа
-        ads_list = ads_data.get('ads', [])
-        
-        # Лист 1: Все объявления
-        all_ads = []
-        for idx, ad in enumerate(ads_list, 1):
-            for headline in ad.get('headlines', []):
-                for description in ad.get('descriptions', []):
-                    all_ads.append({
-                        'Ad Group': f"Ad Group {idx}",
-                        'Type': ad.get('type', ''),
-                        'Headline': headline,
-                        'Description': description,
-                        'Path 1': ad.get('paths', [''])[0] if ad.get('paths') else '',
-                        'Path 2': ad.get('paths', ['', ''])[1] if len(ad.get('paths', [])) > 1 else '',
-                        'Keywords': ', '.join(ad.get('keywords', [])[:5]),
-                        'Notes': ad.get('notes', '')
-                    })
-        
-        df_ads = pd.DataFrame(all_ads)
-        
-        # Лист 2: Только заголовки
-        headlines_data = []
-        for idx, ad in enumerate(ads_list, 1):
-            for headline in ad.get('headlines', []):
-                headlines_data.append({
-                    'Ad Group': f"Ad Group {idx}",
-                    'Type': ad.get('type', ''),
-                    'Headline': headline,
-                    'Length': len(headline),
-                    'Status': 'OK' if len(headline) <= 30 else 'TOO LONG'
-                })
-        
-        df_headlines = pd.DataFrame(headlines_data)
-        
-        # Лист 3: Только описания
-        descriptions_data = []
-        for idx, ad in enumerate(ads_list, 1):
-            for description in ad.get('descriptions', []):
-                descriptions_data.append({
-                    'Ad Group': f"Ad Group {idx}",
-                    'Type': ad.get('type', ''),
-                    'Description': description,
-                    'Length': len(description),
-                    'Status': 'OK' if len(description) <= 90 else 'TOO LONG'
-                })
-        
-        df_descriptions = pd.DataFrame(descriptions_data)
-        
-        # Лист 4: Ключевые слова
-        keywords_data = []
-        for idx, ad in enumerate(ads_list, 1):
-            for keyword in ad.get('keywords', []):
-                keywords_data.append({
-                    'Ad Group': f"Ad Group {idx}",
-                    'Type': ad.get('type', ''),
-                    'Keyword': keyword
-                })
-        
-        df_keywords = pd.DataFrame(keywords_data)
-        
-        # Сохраняем в Excel с несколькими листами
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-            df_ads.to_excel(writer, sheet_name='All Ads', index=False)
-            df_headlines.to_excel(writer, sheet_name='Headlines', index=False)
-            df_descriptions.to_excel(writer, sheet_name='Descriptions', index=False)
-            df_keywords.to_excel(writer, sheet_name='Keywords', index=False)
-            
-            # Форматирование
-            for sheet_name in writer.sheets:
-                worksheet = writer.sheets[sheet_name]
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 50)
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
+        # Потоковая запись: книга не держит ячейки в памяти
+        self._save_workbook(filepath, self._google_ads_sheets(ads_data))
         
         logger.info(f"Объявления экспортированы в: {filepath}")
         return str(filepath)
     
-    def export_keywords(self, keywords_data: Dict, filename: Optional[str] = None) -> str:
+    def export_keywords(self, keywords_data: Dict, filename: Optional[str] = None,
+                        fmt: str = 'xlsx') -> str:
         """
-        Экспортирует ключевые слова в Excel
+        Экспортирует ключевые слова в Excel или CSV
         
         Args:
             keywords_data: Данные ключевых слов
             filename: Имя файла (опционально)
+            fmt: Формат файла: 'xlsx' (по умолчанию) или 'csv'.
+                CSV пишется на порядок быстрее и подходит, когда нужна
+                только плоская таблица без стилей
             
         Returns:
             Путь к сохраненному файлу
         """
-        if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"keywords_{timestamp}.xlsx"
-        
-        filepath = self.output_dir / filename
-        
-        # Подготавливаем данные
-        keywords_list = []
-        
-        # Если keywords_data содержит различные типы соответствия
-        if isinstance(keywords_data, dict) and 'keywords' in keywords_data:
-            for kw_item in keywords_data['keywords']:
-                keywords_list.append({
-                    'Keyword': kw_item.get('keyword', ''),
-                    'Match Type': kw_item.get('match_type', 'broad'),
-                    'Search Volume': kw_item.get('search_volume', 'medium'),
-                    'Commercial Intent': kw_item.get('commercial_intent', 'medium'),
-                        'Category': kw_item.get('category', 'transactional')
-                })
-        elif isinstance(keywords_data, list):
-            for kw in keywords_data:
-                if isinstance(kw, str):
-                    keywords_list.append({
-                        'Keyword': kw,
-                        'Match Type': 'broad',
-                        'Search Volume': 'medium',
-                        'Commercial Intent': 'medium',
-                        'Category': 'транзакционный'
-                    })
-                elif isinstance(kw, dict):
-                    keywords_list.append({
-                        'Keyword': kw.get('keyword', ''),
-                        'Match Type': kw.get('match_type', 'broad'),
-                        'Search Volume': kw.get('search_volume', 'medium'),
-                        'Commercial Intent': kw.get('commercial_intent', 'medium'),
-                        'Category': kw.get('category', 'transactional')
-                    })
-        
-        # Если нет ключевых слов, создаем базовые
-        if not keywords_list:
-            keywords_list = [
-                {'Keyword': 'buy', 'Match Type': 'phrase', 'Search Volume': 'high', 'Commercial Intent': 'high', 'Category': 'transactional'},
-                {'Keyword': 'price', 'Match Type': 'phrase', 'Search Volume': 'high', 'Commercial Intent': 'high', 'Category': 'transactional'},
-                {'Keyword': 'order', 'Match Type': 'phrase', 'Search Volume': 'medium', 'Commercial Intent': 'high', 'Category': 'transactional'},
-                {'Keyword': 'services', 'Match Type': 'broad', 'Search Volume': 'high', 'Commercial Intent': 'medium', 'Category': 'informational'},
-            ]
+        filepath = self._default_path('keywords', filename)
         
-        df = pd.DataFrame(keywords_list)
+        (_, _, rows), = self._keyword_sheets(keywords_data)
         
-        # Сохраняем
-        df.to_excel(filepath, index=False, engine='openpyxl')
+        if fmt == 'csv':
+            filepath = filepath.with_suffix('.csv')
+            with open(filepath, 'w', newline='', encoding='utf-8-sig') as f:
+                writer = csv.writer(f)
+                writer.writerow(KEYWORD_COLS)
+                writer.writerows(rows)
+        else:
+            # Потоковая запись построчно (ключевых слов может быть очень много)
+            self._save_workbook(filepath, [('Keywords', KEYWORD_COLS, rows)])
         
         logger.info(f"Ключевые слова экспортированы в: {filepath}")
         return str(filepath)
     
+    def _keyword_sheets(self, keywords_data: Dict) -> List[Tuple]:
+        """Строит лист ключевых слов (для единичной и батчевой записи)"""
+        # Нормализуем данные сразу в кортежи строк (тип определяется
+        # один раз, без isinstance на каждый элемент)
+        rows = self._normalize_keyword_rows(keywords_data, str_category='транзакционный')
+        
+        # Если нет ключевых слов, используем базовые
+        if not rows:
+            rows = list(DEFAULT_KEYWORD_ROWS)
+        
+        return [('Keywords', KEYWORD_COLS, rows)]
+    
+    def _fab_sheets(self, fab_data: Dict) -> List[Tuple]:
+        """Строит листы FAB анализа (для единичной и батчевой записи)"""
+        # Лист 1: Общая информация
+        general_info = [(
+            fab_data.get('product_name', ''),
+            fab_data.get('target_audience', ''),
+            fab_data.get('unique_value_proposition', '')
+        )]
+        
+        # Лист 2: FAB утверждения
+        fab_statements = [
+            (statement.get('feature', ''),
+             statement.get('advantage', ''),
+             statement.get('benefit', ''),
+             statement.get('bab_format', ''))
+            for statement in fab_data.get('fab_statements', [])
+        ]
+        
+        return [
+            ('General Info', GENERAL_INFO_COLS, general_info),
+            ('FAB Statements', FAB_COLS, fab_statements),
+        ]
+    
     def export_fab_analysis(self, fab_data: Dict, filename: Optional[str] = None) -> str:
         """
         Экспортирует FAB анализ в Excel
@@ -203,54 +403,35 @@ class ExcelExporter:
         Returns:
             Путь к сохраненному файлу
         """
-        if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"fab_analysis_{timestamp}.xlsx"
+        filepath = self._default_path('fab_analysis', filename)
         
-        filepath = self.output_dir / filename
-        
-        # Лист 1: Общая информация
-        general_info = pd.DataFrame([{
-            'Product Name': fab_data.get('product_name', ''),
-            'Target Audience': fab_data.get('target_audience', ''),
-            'Unique Value Proposition': fab_data.get('unique_value_proposition', '')
-        }])
-        
-        # Лист 2: FAB утверждения
-        fab_statements = []
-        for statement in fab_data.get('fab_statements', []):
-            fab_statements.append({
-                'Feature': statement.get('feature', ''),
-                'Advantage': statement.get('advantage', ''),
-                'Benefit': statement.get('benefit', ''),
-                'BAB Format': statement.get('bab_format', '')
-            })
-        
-        df_fab = pd.DataFrame(fab_statements)
-        
-        # Сохраняем
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-            general_info.to_excel(writer, sheet_name='General Info', index=False)
-            df_fab.to_excel(writer, sheet_name='FAB Statements', index=False)
-            
-            # Форматирование
-            for sheet_name in writer.sheets:
-                worksheet = writer.sheets[sheet_name]
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 120)
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
+        self._save_workbook(filepath, self._fab_sheets(fab_data), width_cap=120)
         
         logger.info(f"FAB анализ экспортирован в: {filepath}")
         return str(filepath)
     
+    @contextmanager
+    def batch(self, filename: Optional[str] = None, width_cap: int = 50):
+        """
+        Контекстный менеджер батчевого экспорта: несколько наборов данных
+        пишутся в одну книгу, инициализация книги и регистрация стилей
+        оплачиваются один раз на весь батч.
+        
+        Пример:
+            with exporter.batch('report.xlsx') as b:
+                b.add_google_ads(ads_1)
+                b.add_google_ads(ads_2)
+                b.add_keywords(keywords)
+        
+        Книга сохраняется при выходе из контекста (если не было исключения);
+        путь к файлу доступен как b.filepath.
+        """
+        filepath = self._default_path('batch', filename)
+        batch = _BatchExport(self, str(filepath))
+        yield batch
+        self._save_workbook(filepath, batch._sheets, width_cap=width_cap)
+        logger.info(f"Батчевый экспорт сохранен в: {filepath}")
+    
     def export_complete_report(self, website_data: Dict, fab_data: Dict, 
                               keywords_data: Dict, ads_data: Dict,
                               filename: Optional[str] = None) -> str:
@@ -267,112 +448,82 @@ class ExcelExporter:
         Returns:
             Путь к сохраненному файлу
         """
-        if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"complete_report_{timestamp}.xlsx"
-        
-        filepath = self.output_dir / filename
-        
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-            # Лист 1: Информация о сайте
-            site_info = pd.DataFrame([{
-                'URL': website_data.get('url', ''),
-                'Title': website_data.get('title', ''),
-                'Description': website_data.get('description', ''),
-                'Domain': website_data.get('domain', '')
-            }])
-            site_info.to_excel(writer, sheet_name='Website Info', index=False)
-            
-            # Get the worksheet to format it properly
-            worksheet = writer.sheets['Website Info']
-            
-            # Set specific column widths for better readability (openpyxl method)
-            worksheet.column_dimensions['A'].width = 20  # URL
-            worksheet.column_dimensions['B'].width = 50  # Title
-            worksheet.column_dimensions['C'].width = 100  # Description (much wider)
-            worksheet.column_dimensions['D'].width = 20  # Domain
-            
-            # Enable text wrapping for description column
-            from openpyxl.styles import Alignment
-            for row in range(2, worksheet.max_row + 1):  # Skip header row
-                worksheet.cell(row=row, column=3).alignment = Alignment(wrap_text=True, vertical='top')
-            
-            # Лист 2: FAB анализ
-            fab_statements = []
-            for statement in fab_data.get('fab_statements', []):
-                fab_statements.append({
-                    'Feature': statement.get('feature', ''),
-                    'Advantage': statement.get('advantage', ''),
-                    'Benefit': statement.get('benefit', ''),
-                    'BAB Format': statement.get('bab_format', '')
-                })
-            df_fab = pd.DataFrame(fab_statements)
-            df_fab.to_excel(writer, sheet_name='FAB Analysis', index=False)
-            
-            # Лист 3: Объявления
-            all_ads = []
-            for idx, ad in enumerate(ads_data.get('ads', []), 1):
-                for headline in ad.get('headlines', []):
-                    for description in ad.get('descriptions', []):
-                        all_ads.append({
-                            'Ad Group': f"Ad Group {idx}",
-                            'Type': ad.get('type', ''),
-                            'Headline': headline,
-                            'Description': description,
-                            'Path 1': ad.get('paths', [''])[0] if ad.get('paths') else '',
-                            'Keywords': ', '.join(ad.get('keywords', [])[:3])
-                        })
-            df_ads = pd.DataFrame(all_ads)
-            df_ads.to_excel(writer, sheet_name='Google Ads', index=False)
-            
-            # Лист 4: Ключевые слова
-            keywords_list = []
-            if isinstance(keywords_data, dict) and 'keywords' in keywords_data:
-                for kw_item in keywords_data['keywords']:
-                    keywords_list.append({
-                        'Keyword': kw_item.get('keyword', ''),
-                        'Match Type': kw_item.get('match_type', 'broad'),
-                        'Search Volume': kw_item.get('search_volume', 'medium'),
-                        'Commercial Intent': kw_item.get('commercial_intent', 'medium'),
-                        'Category': kw_item.get('category', 'transactional')
-                    })
-            elif isinstance(keywords_data, list):
-                for kw in keywords_data:
-                    if isinstance(kw, str):
-                        keywords_list.append({
-                            'Keyword': kw,
-                            'Match Type': 'broad',
-                            'Search Volume': 'medium',
-                            'Commercial Intent': 'medium',
-                            'Category': 'transactional'
-                        })
-                    elif isinstance(kw, dict):
-                        keywords_list.append({
-                            'Keyword': kw.get('keyword', ''),
-                            'Match Type': kw.get('match_type', 'broad'),
-                            'Search Volume': kw.get('search_volume', 'medium'),
-                            'Commercial Intent': kw.get('commercial_intent', 'medium'),
-                            'Category': kw.get('category', 'transactional')
-                        })
-            
-            df_keywords = pd.DataFrame(keywords_list)
-            df_keywords.to_excel(writer, sheet_name='Keywords', index=False)
-            
-            # Автоматическое форматирование (openpyxl method)
-            for sheet_name in writer.sheets:
-                worksheet = writer.sheets[sheet_name]
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 120)
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
+        filepath = self._default_path('complete_report', filename)
+        
+        def build_site_info():
+            return [(
+                website_data.get('url', ''),
+                website_data.get('title', ''),
+                website_data.get('description', ''),
+                website_data.get('domain', '')
+            )]
+        
+        def build_fab_statements():
+            return [
+                (statement.get('feature', ''),
+                 statement.get('advantage', ''),
+                 statement.get('benefit', ''),
+                 statement.get('bab_format', ''))
+                for statement in fab_data.get('fab_statements', [])
+            ]
+        
+        def build_ads():
+            return self._expand_ads(ads_data.get('ads', []),
+                                    keyword_limit=3, include_extras=False)
+        
+        def build_keywords():
+            return self._normalize_keyword_rows(keywords_data)
+        
+        # Строки четырех листов независимы — готовим их параллельно,
+        # сама запись XML остается последовательной (writer не потокобезопасен)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            site_info, fab_statements, all_ads, keywords_list = executor.map(
+                lambda build: build(),
+                (build_site_info, build_fab_statements, build_ads, build_keywords))
+        
+        self._save_workbook(filepath, [
+            ('Website Info', SITE_INFO_COLS, site_info,
+             {'widths': {1: 20, 2: 50, 3: 100, 4: 20}, 'wrap_cols': (3,)}),
+            ('FAB Analysis', FAB_COLS, fab_statements),
+            ('Google Ads', AD_COLS_SHORT, all_ads),
+            ('Keywords', KEYWORD_COLS, keywords_list),
+        ], width_cap=120)
         
         logger.info(f"Полный отчет экспортирован в: {filepath}")
         return str(filepath)
 
+
+class _BatchExport:
+    """
+    Копит листы нескольких экспортов для записи в одну книгу.
+    Создается через ExcelExporter.batch(); повторяющиеся имена листов
+    получают числовой суффикс.
+    """
+    
+    def __init__(self, exporter: ExcelExporter, filepath: str):
+        self._exporter = exporter
+        self._sheets: List[Tuple] = []
+        self._titles = set()
+        self.filepath = filepath
+    
+    def _add(self, sheets: List[Tuple]):
+        for title, header, rows, *rest in sheets:
+            unique = title
+            suffix = 2
+            while unique in self._titles:
+                unique = f"{title} {suffix}"
+                suffix += 1
+            self._titles.add(unique)
+            self._sheets.append((unique, header, rows, *rest))
+    
+    def add_google_ads(self, ads_data: Dict):
+        """Добавляет листы экспорта объявлений"""
+        self._add(self._exporter._google_ads_sheets(ads_data))
+    
+    def add_keywords(self, keywords_data: Dict):
+        """Добавляет лист ключевых слов"""
+        self._add(self._exporter._keyword_sheets(keywords_data))
+    
+    def add_fab_analysis(self, fab_data: Dict):
+        """Добавляет листы FAB анализа"""
+        self._add(self._exporter._fab_sheets(fab_data))
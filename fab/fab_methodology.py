@@ -1,7 +1,8 @@
 """
 Модуль для работы с методологией FAB (Features, Advantages, Benefits)
 """
-from typing import Dict, List
+from string import Template
+from typing import Dict, Final, List
 from pydantic import BaseModel
 
 
@@ -16,7 +17,7 @@ class FABStatement(BaseModel):
         Преобразует в BAF (Benefit-Advantage-Feature) формат
         для эмоционального воздействия
         """
-        return f"{self.benefit}. {self.advantage}. {self.feature}."
+        return '. '.join((self.benefit, self.advantage, self.feature)) + '.'
     
     def to_dict(self) -> Dict[str, str]:
         """Преобразует в словарь"""
@@ -27,15 +28,10 @@ class FABStatement(BaseModel):
         }
 
 
-class FABMethodology:
-    """Класс для работы с FAB методологией"""
-    
-    @staticmethod
-    def get_fab_prompt() -> str:
-        """
-        Возвращает полное описание FAB методологии для промпта AI
-        """
-        return """
+# Промпты — модульные константы: большая статика аллоцируется один раз
+# при импорте, а динамические промпты собираются из прекомпилированных
+# Template без повторного разбора длинного литерала на каждый вызов
+FAB_PROMPT: Final[str] = """
 The FAB method (Features, Advantages, Benefits) is a key sales and marketing tool.
 
 **Important principles:**
@@ -75,28 +71,20 @@ Example: "Don't miss any moment of your life when there's no light (Benefit). Le
 - Focus on unique value
 - Consider target audience needs
 """
-    
-    @staticmethod
-    def create_fab_analysis_prompt(content: Dict[str, any]) -> str:
-        """
-        Создает промпт для анализа контента сайта по методологии FAB
-        
-        Args:
-            content: Словарь с данными о сайте
-        """
-        return f"""
+
+_FAB_ANALYSIS_TEMPLATE: Final[Template] = Template("""
 Analyze the following website content and apply the FAB methodology.
 
 **Website data:**
-Title: {content.get('title', 'Not specified')}
-Description: {content.get('description', 'Not specified')}
-Domain: {content.get('domain', 'Not specified')}
+Title: $title
+Description: $description
+Domain: $domain
 
 **Headings:**
-{content.get('headings', {})}
+$headings
 
 **Main content:**
-{content.get('main_content', '')[:2000]}  
+$main_content  
 
 **Task:**
 1. Identify the main product or service being offered
@@ -111,36 +99,31 @@ Domain: {content.get('domain', 'Not specified')}
 IMPORTANT: Keep the original language of the website content. If the website is in Ukrainian, respond in Ukrainian. If in English, respond in English. If in Russian, respond in Russian. Only the analysis structure should be consistent.
 
 Return result in JSON format:
-{{
+{
     "product_name": "product/service name",
     "target_audience": "target audience description",
     "fab_statements": [
-        {{
+        {
             "feature": "feature",
             "advantage": "advantage",
             "benefit": "benefit",
             "bab_format": "benefit. advantage. feature."
-        }}
+        }
     ],
     "unique_value_proposition": "brief unique value proposition"
-}}
-"""
-    
-    @staticmethod
-    def create_keyword_generation_prompt(fab_analysis: Dict[str, any]) -> str:
-        """
-        Создает промпт для генерации ключевых слов на основе FAB анализа
-        """
-        return f"""
+}
+""")
+
+_KEYWORD_GENERATION_TEMPLATE: Final[Template] = Template("""
 Based on the FAB analysis of the product/service, generate keywords for Google Ads.
 
 **Product data:**
-Name: {fab_analysis.get('product_name', '')}
-Target audience: {fab_analysis.get('target_audience', '')}
-Unique value proposition: {fab_analysis.get('unique_value_proposition', '')}
+Name: $product_name
+Target audience: $target_audience
+Unique value proposition: $unique_value_proposition
 
 **FAB statements:**
-{fab_analysis.get('fab_statements', [])}
+$fab_statements
 
 **Requirements:**
 1. Create keywords for 4 match types:
@@ -164,18 +147,57 @@ Unique value proposition: {fab_analysis.get('unique_value_proposition', '')}
 IMPORTANT: Generate keywords in the same language as the website content. If the website is in Ukrainian, generate Ukrainian keywords. If in English, generate English keywords. If in Russian, generate Russian keywords.
 
 Return result in JSON format:
-{{
+{
     "keywords": [
-        {{
+        {
             "keyword": "keyword",
             "match_type": "broad|phrase|exact|modified_broad",
             "search_volume": "high|medium|low",
             "commercial_intent": "high|medium|low",
             "category": "informational|transactional|navigational"
-        }}
+        }
     ]
-}}
-"""
+}
+""")
+
+
+class FABMethodology:
+    """Класс для работы с FAB методологией"""
+    
+    @staticmethod
+    def get_fab_prompt() -> str:
+        """
+        Возвращает полное описание FAB методологии для промпта AI
+        """
+        return FAB_PROMPT
+    
+    @staticmethod
+    def create_fab_analysis_prompt(content: Dict[str, any]) -> str:
+        """
+        Создает промпт для анализа контента сайта по методологии FAB
+        
+        Args:
+            content: Словарь с данными о сайте
+        """
+        return _FAB_ANALYSIS_TEMPLATE.substitute(
+            title=content.get('title', 'Not specified'),
+            description=content.get('description', 'Not specified'),
+            domain=content.get('domain', 'Not specified'),
+            headings=content.get('headings', {}),
+            main_content=content.get('main_content', '')[:2000]
+        )
+    
+    @staticmethod
+    def create_keyword_generation_prompt(fab_analysis: Dict[str, any]) -> str:
+        """
+        Создает промпт для генерации ключевых слов на основе FAB анализа
+        """
+        return _KEYWORD_GENERATION_TEMPLATE.substitute(
+            product_name=fab_analysis.get('product_name', ''),
+            target_audience=fab_analysis.get('target_audience', ''),
+            unique_value_proposition=fab_analysis.get('unique_value_proposition', ''),
+            fab_statements=fab_analysis.get('fab_statements', [])
+        )
 
 
 class FABTemplate:
@@ -3,8 +3,9 @@ Google Ads MCP Integration
 Provides Model Context Protocol server capabilities for Google Ads API
 """
 from .mcp_server import GoogleAdsMCPServer
-from .ads_client import GoogleAdsClient
+from .ads_client import GoogleAdsClient, get_default_client
 from .ads_queries import GoogleAdsQueries
 
-__all__ = ['GoogleAdsMCPServer', 'GoogleAdsClient', 'GoogleAdsQueries']
+__all__ = ['GoogleAdsMCPServer', 'GoogleAdsClient', 'GoogleAdsQueries',
+           'get_default_client']
 
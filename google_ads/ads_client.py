@@ -2,7 +2,15 @@
 Google Ads API Client
 Handles authentication and API interactions with Google Ads
 """
+import enum
 import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
+from operator import attrgetter
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 import yaml
@@ -16,14 +24,156 @@ except ImportError:
     GadsClient = None
     GoogleAdsException = Exception
 
+try:
+    from google.api_core.exceptions import (
+        DeadlineExceeded,
+        ResourceExhausted,
+        ServiceUnavailable,
+    )
+    from google.api_core.retry import Retry, if_exception_type
+    API_CORE_AVAILABLE = True
+except ImportError:
+    API_CORE_AVAILABLE = False
+    Retry = None
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pa = None
+    pq = None
+
 logger = logging.getLogger(__name__)
 
+_SELECT_FIELDS_RE = re.compile(r"SELECT\s+(.*?)\s+FROM", re.S | re.I)
+
+
+@lru_cache(maxsize=64)
+def _compile_row_extractor(query: str):
+    """
+    Build a row -> flat dict converter specialized to the query's SELECT list
+    
+    The field paths are parsed once per distinct query; each row is then
+    converted with a tight loop of prebuilt attrgetters instead of generic
+    per-field probing. Enum values come back as their names.
+    """
+    match = _SELECT_FIELDS_RE.search(query)
+    if not match:
+        return None
+    
+    fields = tuple(field.strip() for field in match.group(1).split(',') if field.strip())
+    getters = tuple((field, attrgetter(field)) for field in fields)
+    
+    def extract(row) -> Dict[str, Any]:
+        result = {}
+        for field, getter in getters:
+            value = getter(row)
+            result[field] = value.name if isinstance(value, enum.IntEnum) else value
+        return result
+    
+    return extract
+
+
+# libyaml C loader when available (~10x faster than the pure-Python parser)
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+@lru_cache(maxsize=8)
+def _load_ads_yaml(path: str, mtime: float) -> Dict[str, Any]:
+    """
+    Parse google-ads.yaml once per (path, mtime)
+    
+    The config never changes at runtime, so repeated client constructions
+    and get_customer_id calls reuse the parsed dict; mtime in the cache key
+    invalidates the entry if the file is edited between runs.
+    """
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=_YAML_LOADER) or {}
+
+
+class _TokenBucket:
+    """
+    Thread-safe token bucket for client-side QPS limiting
+    
+    Smooths the bursts that concurrent fan-outs (search_many, run_batch,
+    parallel diagnostics) would otherwise fire at the API, avoiding
+    RESOURCE_EXHAUSTED responses that each cost a full retry round trip.
+    """
+    
+    def __init__(self, rate_per_second: float):
+        self.rate = rate_per_second
+        self.capacity = max(1.0, rate_per_second)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity,
+                                  self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class BatchQuery:
+    """
+    One node of a dependent-query batch for GoogleAdsClient.run_batch
+    
+    query_template may contain a {prev} placeholder, filled with the
+    comma-joined IDs extracted from the results of the query at index
+    input_from (e.g. for an IN (...) clause). input_from=-1 marks an
+    independent root query.
+    """
+    
+    def __init__(self, query_template: str, input_from: int = -1,
+                 id_field: str = 'campaign.id'):
+        self.query_template = query_template
+        self.input_from = input_from
+        self.id_field = id_field
+
 
 class GoogleAdsClient:
     """
     Wrapper for Google Ads API client with MCP support
     """
     
+    # TTLs of the GAQL result cache: reports over closed date ranges change
+    # slowly (5 min), anything touching TODAY is much more volatile (30 s)
+    SEARCH_CACHE_TTL = 300
+    SEARCH_CACHE_TTL_TODAY = 30
+    SEARCH_CACHE_MAX_ENTRIES = 256
+    
+    # Retry policy for transient RPC failures: parallel SearchStream fan-outs
+    # regularly hit UNAVAILABLE/RESOURCE_EXHAUSTED under load, and exponential
+    # backoff turns those into delays instead of blanket report failures
+    if API_CORE_AVAILABLE:
+        _TRANSIENT_RETRY = Retry(
+            predicate=if_exception_type(
+                ServiceUnavailable, DeadlineExceeded, ResourceExhausted),
+            initial=1.0,
+            multiplier=2.0,
+            maximum=30.0,
+            timeout=300.0,
+        )
+    else:
+        _TRANSIENT_RETRY = None
+    
     def __init__(self, config_path: Optional[str] = None):
         """
         Initialize Google Ads client
@@ -38,9 +188,34 @@ class GoogleAdsClient:
             )
         
         self.config_path = config_path or self._get_default_config_path()
+        self._config_dict = _load_ads_yaml(
+            self.config_path, os.path.getmtime(self.config_path))
         self.client = None
+        self._search_cache: Dict[tuple, tuple] = {}  # (cid, query) -> (expires_at, rows)
+        
+        # Client-side QPS cap (GOOGLE_ADS_MAX_QPS, 0 disables); keep this
+        # consistent with the web worker count so fan-outs stay under the
+        # per-developer-token rate limits
+        max_qps = float(os.environ.get('GOOGLE_ADS_MAX_QPS', '0'))
+        self._rate_limiter = _TokenBucket(max_qps) if max_qps > 0 else None
+        
         self._initialize_client()
     
+    def _throttle(self):
+        """Take a rate-limiter token before an RPC (no-op when disabled)"""
+        if self._rate_limiter is not None:
+            self._rate_limiter.acquire()
+    
+    @cached_property
+    def ga_service(self):
+        """GoogleAdsService stub, resolved once per instance"""
+        return self.client.get_service("GoogleAdsService")
+    
+    @cached_property
+    def customer_service(self):
+        """CustomerService stub, resolved once per instance"""
+        return self.client.get_service("CustomerService")
+    
     def _get_default_config_path(self) -> str:
         """Get default config path from home directory"""
         home = Path.home()
@@ -61,20 +236,14 @@ class GoogleAdsClient:
         """Initialize the Google Ads API client"""
         try:
             self.client = GadsClient.load_from_storage(self.config_path)
-            logger.info(f"Google Ads client initialized from {self.config_path}")
+            logger.info("Google Ads client initialized from %s", self.config_path)
         except Exception as e:
-            logger.error(f"Failed to initialize Google Ads client: {e}")
+            logger.error("Failed to initialize Google Ads client: %s", e)
             raise
     
     def get_customer_id(self) -> Optional[str]:
         """Get the login customer ID from config"""
-        try:
-            with open(self.config_path, 'r') as f:
-                config = yaml.safe_load(f)
-                return config.get('login_customer_id')
-        except Exception as e:
-            logger.error(f"Error reading customer ID: {e}")
-            return None
+        return self._config_dict.get('login_customer_id')
     
     def list_accessible_customers(self) -> List[Dict[str, str]]:
         """
@@ -84,25 +253,24 @@ class GoogleAdsClient:
             List of customer dictionaries with id and descriptive_name
         """
         try:
-            customer_service = self.client.get_service("CustomerService")
+            customer_service = self.customer_service
             accessible_customers = customer_service.list_accessible_customers()
             
-            customers = []
-            for resource_name in accessible_customers.resource_names:
-                customer_id = resource_name.split('/')[-1]
-                customers.append({
-                    'id': customer_id,
-                    'resource_name': resource_name
-                })
+            # rpartition avoids the throwaway list that split('/') builds
+            customers = [
+                {'id': resource_name.rpartition('/')[2],
+                 'resource_name': resource_name}
+                for resource_name in accessible_customers.resource_names
+            ]
             
-            logger.info(f"Found {len(customers)} accessible customers")
+            logger.info("Found %s accessible customers", len(customers))
             return customers
             
         except GoogleAdsException as ex:
-            logger.error(f"Google Ads API error: {ex}")
+            logger.error("Google Ads API error: %s", ex)
             raise
         except Exception as e:
-            logger.error(f"Error listing customers: {e}")
+            logger.error("Error listing customers: %s", e)
             raise
     
     def get_customer_info(self, customer_id: str) -> Dict[str, Any]:
@@ -116,7 +284,7 @@ class GoogleAdsClient:
             Dictionary with customer information
         """
         try:
-            ga_service = self.client.get_service("GoogleAdsService")
+            ga_service = self.ga_service
             
             query = """
                 SELECT
@@ -130,86 +298,563 @@ class GoogleAdsClient:
                 WHERE customer.id = {customer_id}
             """.format(customer_id=customer_id)
             
-            response = ga_service.search(customer_id=customer_id, query=query)
+            self._throttle()
+            stream = ga_service.search_stream(customer_id=customer_id, query=query)
             
-            for row in response:
-                customer = row.customer
-                return {
-                    'id': customer.id,
-                    'name': customer.descriptive_name,
-                    'currency': customer.currency_code,
-                    'time_zone': customer.time_zone,
-                    'is_manager': customer.manager,
-                    'is_test': customer.test_account
-                }
+            for batch in stream:
+                for row in batch.results:
+                    customer = row.customer
+                    return {
+                        'id': customer.id,
+                        'name': customer.descriptive_name,
+                        'currency': customer.currency_code,
+                        'time_zone': customer.time_zone,
+                        'is_manager': customer.manager,
+                        'is_test': customer.test_account
+                    }
             
             return {}
             
         except GoogleAdsException as ex:
-            logger.error(f"Google Ads API error: {ex}")
+            logger.error("Google Ads API error: %s", ex)
             raise
         except Exception as e:
-            logger.error(f"Error getting customer info: {e}")
+            logger.error("Error getting customer info: %s", e)
             raise
     
-    def search(self, customer_id: str, query: str) -> List[Dict[str, Any]]:
+    def get_all_customer_info(self, max_workers: int = 16) -> List[Dict[str, Any]]:
+        """
+        Fetch detailed info for every accessible customer account concurrently
+        
+        The common dashboard pattern — list_accessible_customers followed by
+        one get_customer_info per account — runs the per-account RPCs through
+        a thread pool (the gRPC stub is thread-safe), so wall time is roughly
+        one round trip instead of one per account.
+        
+        Args:
+            max_workers: Maximum number of in-flight info requests
+        
+        Returns:
+            List of customer info dictionaries in listing order; accounts
+            that failed are logged and returned as empty dictionaries
+        """
+        customer_ids = [customer['id'] for customer in self.list_accessible_customers()]
+        if not customer_ids:
+            return []
+        
+        def safe_info(customer_id: str) -> Dict[str, Any]:
+            try:
+                return self.get_customer_info(customer_id)
+            except Exception as e:
+                logger.error("Failed to get info for customer %s: %s", customer_id, e)
+                return {}
+        
+        workers = max(1, min(max_workers, len(customer_ids)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(safe_info, customer_ids))
+    
+    def search(self, customer_id: str, query: str,
+               cache: bool = True) -> List[Dict[str, Any]]:
         """
         Execute a Google Ads Query Language (GAQL) query
         
+        Results are cached in-process with a short TTL (see SEARCH_CACHE_TTL),
+        so dashboards refetching the same report skip the round trip entirely.
+        
         Args:
             customer_id: The customer ID
             query: GAQL query string
+            cache: Set to False to bypass the result cache
         
         Returns:
             List of result rows as dictionaries
         """
+        cache_key = (customer_id, query)
+        if cache:
+            entry = self._search_cache.get(cache_key)
+            if entry is not None:
+                expires_at, rows = entry
+                if time.time() < expires_at:
+                    logger.info("Returning cached results for customer %s", customer_id)
+                    return list(rows)
+                del self._search_cache[cache_key]
+        
         try:
-            ga_service = self.client.get_service("GoogleAdsService")
-            response = ga_service.search(customer_id=customer_id, query=query)
+            ga_service = self.ga_service
+            row_to_dict = self._row_to_dict
+            
+            def fetch() -> List[Dict[str, Any]]:
+                # search_stream returns the whole result set as one streamed
+                # response, avoiding the per-page round trips of paged search;
+                # the stream is consumed inside so retries restart cleanly
+                self._throttle()
+                stream = ga_service.search_stream(customer_id=customer_id, query=query)
+                rows = []
+                for batch in stream:
+                    rows.extend(row_to_dict(row) for row in batch.results)
+                return rows
+            
+            if self._TRANSIENT_RETRY is not None:
+                results = self._TRANSIENT_RETRY(fetch)()
+            else:
+                results = fetch()
+            
+            logger.info("Query returned %s results", len(results))
+            if cache:
+                self._cache_results(cache_key, query, results)
+            return results
+            
+        except GoogleAdsException as ex:
+            logger.error("Google Ads API error: %s", ex)
+            self._handle_google_ads_exception(ex)
+            raise
+        except Exception as e:
+            logger.error("Error executing query: %s", e)
+            raise
+    
+    def iter_search(self, customer_id: str, query: str):
+        """
+        Execute a GAQL query and yield row dictionaries incrementally
+        
+        Unlike search, nothing beyond the current stream batch is held in
+        memory and the first rows are available before the report finishes,
+        so callers can serialize or process huge reports with O(batch)
+        memory. Results are not cached.
+        
+        Args:
+            customer_id: The customer ID
+            query: GAQL query string
+        
+        Yields:
+            Result rows as dictionaries
+        """
+        try:
+            ga_service = self.ga_service
+            row_to_dict = self._row_to_dict
+            self._throttle()
+            stream = ga_service.search_stream(customer_id=customer_id, query=query)
+            for batch in stream:
+                for row in batch.results:
+                    yield row_to_dict(row)
+        except GoogleAdsException as ex:
+            logger.error("Google Ads API error: %s", ex)
+            self._handle_google_ads_exception(ex)
+            raise
+        except Exception as e:
+            logger.error("Error executing query: %s", e)
+            raise
+    
+    def search_selected(self, customer_id: str, query: str) -> List[Dict[str, Any]]:
+        """
+        Execute a GAQL query returning exactly the SELECTed fields per row
+        
+        Unlike search, which always emits the fixed campaign/ad_group/metrics
+        nesting, this path compiles an extractor from the query's SELECT list
+        (cached per query string) and returns flat dictionaries keyed by
+        field path, e.g. {'campaign.id': ..., 'metrics.clicks': ...}. Rows
+        are converted with prebuilt attrgetters — no per-row field probing.
+        
+        Args:
+            customer_id: The customer ID
+            query: GAQL query string
+        
+        Returns:
+            List of flat result dictionaries
+        """
+        extractor = _compile_row_extractor(query)
+        if extractor is None:
+            raise ValueError("Could not parse SELECT fields from query")
+        
+        try:
+            ga_service = self.ga_service
+            self._throttle()
+            stream = ga_service.search_stream(customer_id=customer_id, query=query)
             
             results = []
-            for row in response:
-                results.append(self._row_to_dict(row))
+            for batch in stream:
+                results.extend(extractor(row) for row in batch.results)
             
-            logger.info(f"Query returned {len(results)} results")
+            logger.info("Query returned %s results", len(results))
             return results
             
         except GoogleAdsException as ex:
-            logger.error(f"Google Ads API error: {ex}")
+            logger.error("Google Ads API error: %s", ex)
+            self._handle_google_ads_exception(ex)
+            raise
+        except Exception as e:
+            logger.error("Error executing query: %s", e)
+            raise
+    
+    def search_columnar(self, customer_id: str, query: str) -> Dict[str, Any]:
+        """
+        Execute a GAQL query and return results as columns (SoA layout)
+        
+        Instead of one dict per row, each field comes back as a single
+        sequence — numpy arrays for the integer metrics when numpy is
+        installed, plain lists otherwise. For large reports this avoids
+        building hundreds of thousands of per-row dicts and lets downstream
+        aggregation run as vectorized array operations.
+        
+        Args:
+            customer_id: The customer ID
+            query: GAQL query string
+        
+        Returns:
+            Dictionary mapping column names to sequences of equal length
+        """
+        try:
+            ga_service = self.ga_service
+            self._throttle()
+            stream = ga_service.search_stream(customer_id=customer_id, query=query)
+            
+            columns = {
+                'campaign_id': [], 'campaign_name': [], 'campaign_status': [],
+                'ad_group_id': [], 'ad_group_name': [],
+                'impressions': [], 'clicks': [], 'cost_micros': [], 'conversions': [],
+            }
+            for batch in stream:
+                for row in batch.results:
+                    campaign = row.campaign
+                    ad_group = row.ad_group
+                    metrics = row.metrics
+                    columns['campaign_id'].append(campaign.id)
+                    columns['campaign_name'].append(campaign.name)
+                    columns['campaign_status'].append(campaign.status.name)
+                    columns['ad_group_id'].append(ad_group.id)
+                    columns['ad_group_name'].append(ad_group.name)
+                    columns['impressions'].append(metrics.impressions)
+                    columns['clicks'].append(metrics.clicks)
+                    columns['cost_micros'].append(metrics.cost_micros)
+                    columns['conversions'].append(metrics.conversions)
+            
+            if NUMPY_AVAILABLE:
+                for name in ('campaign_id', 'ad_group_id', 'impressions',
+                             'clicks', 'cost_micros'):
+                    columns[name] = np.array(columns[name], dtype=np.int64)
+                columns['conversions'] = np.array(columns['conversions'], dtype=np.float64)
+            
+            logger.info("Query returned %s results (columnar)", len(columns['campaign_id']))
+            return columns
+            
+        except GoogleAdsException as ex:
+            logger.error("Google Ads API error: %s", ex)
             self._handle_google_ads_exception(ex)
             raise
         except Exception as e:
-            logger.error(f"Error executing query: {e}")
+            logger.error("Error executing query: %s", e)
             raise
     
+    def search_to_parquet(self, customer_id: str, query: str, path: str) -> str:
+        """
+        Execute a GAQL query and stream the results straight into a Parquet file
+        
+        Each streamed batch is converted to an Arrow RecordBatch and written
+        immediately, so peak memory stays at one batch (~10k rows) regardless
+        of report size and no per-row Python dicts are materialized. Requires
+        pyarrow.
+        
+        Args:
+            customer_id: The customer ID
+            query: GAQL query string
+            path: Destination .parquet file path
+        
+        Returns:
+            The path written
+        """
+        if not PYARROW_AVAILABLE:
+            raise ImportError(
+                "pyarrow is required for Parquet export. "
+                "Install with: pip install pyarrow"
+            )
+        
+        schema = pa.schema([
+            ('campaign_id', pa.int64()),
+            ('campaign_name', pa.string()),
+            ('campaign_status', pa.string()),
+            ('ad_group_id', pa.int64()),
+            ('ad_group_name', pa.string()),
+            ('impressions', pa.int64()),
+            ('clicks', pa.int64()),
+            ('cost_micros', pa.int64()),
+            ('conversions', pa.float64()),
+        ])
+        
+        try:
+            ga_service = self.ga_service
+            self._throttle()
+            stream = ga_service.search_stream(customer_id=customer_id, query=query)
+            
+            total_rows = 0
+            with pq.ParquetWriter(path, schema) as writer:
+                for batch in stream:
+                    columns = [[] for _ in schema]
+                    for row in batch.results:
+                        campaign = row.campaign
+                        ad_group = row.ad_group
+                        metrics = row.metrics
+                        columns[0].append(campaign.id)
+                        columns[1].append(campaign.name)
+                        columns[2].append(campaign.status.name)
+                        columns[3].append(ad_group.id)
+                        columns[4].append(ad_group.name)
+                        columns[5].append(metrics.impressions)
+                        columns[6].append(metrics.clicks)
+                        columns[7].append(metrics.cost_micros)
+                        columns[8].append(metrics.conversions)
+                    
+                    if columns[0]:
+                        arrays = [pa.array(col, type=field.type)
+                                  for col, field in zip(columns, schema)]
+                        writer.write_batch(
+                            pa.RecordBatch.from_arrays(arrays, schema=schema))
+                        total_rows += len(columns[0])
+            
+            logger.info("Query wrote %s rows to %s", total_rows, path)
+            return path
+            
+        except GoogleAdsException as ex:
+            logger.error("Google Ads API error: %s", ex)
+            self._handle_google_ads_exception(ex)
+            raise
+        except Exception as e:
+            logger.error("Error writing parquet: %s", e)
+            raise
+    
+    def run_batch(self, customer_id: str, batch: List[BatchQuery],
+                  concurrency: int = 8) -> List[List[Dict[str, Any]]]:
+        """
+        Execute a batch of possibly dependent GAQL queries layer by layer
+        
+        Queries are grouped by dependency depth: every layer's queries run
+        concurrently through a thread pool, and a dependent query only waits
+        for its direct predecessor, whose result IDs are substituted into
+        its {prev} placeholder. Wall time is depth x RTT rather than
+        len(batch) x RTT.
+        
+        Args:
+            customer_id: The customer ID
+            batch: BatchQuery nodes; input_from must reference an earlier index
+            concurrency: Maximum in-flight queries per layer
+        
+        Returns:
+            One result list per batch entry, in input order (flat rows as
+            returned by search_selected); a dependent query whose
+            predecessor produced no IDs yields an empty list
+        """
+        depths = []
+        for index, node in enumerate(batch):
+            if node.input_from < 0:
+                depths.append(0)
+            elif node.input_from >= index:
+                raise ValueError(
+                    f"Query {index}: input_from must reference an earlier query")
+            else:
+                depths.append(depths[node.input_from] + 1)
+        
+        results: List[Optional[List[Dict[str, Any]]]] = [None] * len(batch)
+        
+        for depth in range(max(depths, default=-1) + 1):
+            layer = []  # (index, resolved query or None when starved)
+            for index, node in enumerate(batch):
+                if depths[index] != depth:
+                    continue
+                if node.input_from < 0:
+                    layer.append((index, node.query_template))
+                    continue
+                ids = sorted({row.get(node.id_field)
+                              for row in results[node.input_from]
+                              if row.get(node.id_field) is not None})
+                if not ids:
+                    layer.append((index, None))
+                    continue
+                prev = ', '.join(str(value) for value in ids)
+                layer.append((index, node.query_template.format(prev=prev)))
+            
+            def run_one(prepared) -> List[Dict[str, Any]]:
+                index, query = prepared
+                if query is None:
+                    return []
+                return self.search_selected(customer_id, query)
+            
+            workers = max(1, min(concurrency, len(layer)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for (index, _), rows in zip(layer, executor.map(run_one, layer)):
+                    results[index] = rows
+        
+        return results
+    
+    def _cache_results(self, cache_key: tuple, query: str, results: List[Dict[str, Any]]):
+        """Store query results with a TTL matching the volatility of the data"""
+        ttl = self.SEARCH_CACHE_TTL_TODAY if 'TODAY' in query else self.SEARCH_CACHE_TTL
+        
+        if len(self._search_cache) >= self.SEARCH_CACHE_MAX_ENTRIES:
+            now = time.time()
+            expired = [key for key, (expires_at, _) in self._search_cache.items()
+                       if expires_at <= now]
+            for key in expired:
+                del self._search_cache[key]
+            if len(self._search_cache) >= self.SEARCH_CACHE_MAX_ENTRIES:
+                self._search_cache.clear()
+        
+        self._search_cache[cache_key] = (time.time() + ttl, results)
+    
+    def clear_search_cache(self):
+        """Drop all cached GAQL results"""
+        self._search_cache.clear()
+    
+    def search_many(self, customer_ids: List[str], query: str,
+                    concurrency: int = 8) -> tuple:
+        """
+        Run the same GAQL query against many customer accounts concurrently
+        
+        Each query is network-bound (typically 1-2 s of RTT), so overlapping
+        them with a thread pool cuts multi-account reporting from a serial
+        sum to roughly the slowest single call. The underlying gRPC client
+        is thread-safe for searches, and each query retries transient
+        failures with exponential backoff (see _TRANSIENT_RETRY).
+        
+        Args:
+            customer_ids: Customer IDs to query
+            query: GAQL query string (same for every account)
+            concurrency: Maximum number of in-flight queries
+        
+        Returns:
+            Tuple (results, failed): results maps customer_id to its rows
+            for the accounts that succeeded, failed lists the customer IDs
+            whose query still errored after retries
+        """
+        failed: List[str] = []
+        
+        def safe_search(customer_id: str) -> Optional[List[Dict[str, Any]]]:
+            try:
+                return self.search(customer_id, query)
+            except Exception as e:
+                logger.error("Query failed for customer %s: %s", customer_id, e)
+                failed.append(customer_id)
+                return None
+        
+        workers = max(1, min(concurrency, len(customer_ids)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            rows_per_cid = executor.map(safe_search, customer_ids)
+            results = {cid: rows for cid, rows in zip(customer_ids, rows_per_cid)
+                       if rows is not None}
+        
+        if failed:
+            logger.warning("%s of %s accounts failed", len(failed), len(customer_ids))
+        return results, failed
+    
     def _row_to_dict(self, row) -> Dict[str, Any]:
         """Convert a search result row to dictionary"""
-        result = {}
+        # GoogleAdsRow always carries its declared sub-messages (missing ones
+        # are default instances), so direct attribute access is safe and much
+        # cheaper than per-field hasattr probes on proto-plus wrappers
+        campaign = row.campaign
+        ad_group = row.ad_group
+        metrics = row.metrics
         
-        # Extract common fields
-        if hasattr(row, 'campaign'):
-            result['campaign'] = {
-                'id': row.campaign.id,
-                'name': row.campaign.name,
-                'status': row.campaign.status.name if hasattr(row.campaign, 'status') else None
+        return {
+            'campaign': {
+                'id': campaign.id,
+                'name': campaign.name,
+                'status': campaign.status.name
+            },
+            'ad_group': {
+                'id': ad_group.id,
+                'name': ad_group.name,
+                'status': ad_group.status.name
+            },
+            'metrics': {
+                'impressions': metrics.impressions,
+                'clicks': metrics.clicks,
+                'cost_micros': metrics.cost_micros,
+                'conversions': metrics.conversions
             }
+        }
+    
+    def batch_mutate(self, customer_id: str, operations: List[Any]) -> List[str]:
+        """
+        Apply many mutate operations in a single API round trip
         
-        if hasattr(row, 'ad_group'):
-            result['ad_group'] = {
-                'id': row.ad_group.id,
-                'name': row.ad_group.name,
-                'status': row.ad_group.status.name if hasattr(row.ad_group, 'status') else None
-            }
+        Collapses the sequential create-await-create pattern into one
+        GoogleAdsService.mutate call; operations may reference each other
+        through temporary resource names (negative IDs, e.g.
+        customers/{cid}/campaignBudgets/-1), so dependent resources like a
+        campaign and its budget are created atomically in one RPC.
         
-        if hasattr(row, 'metrics'):
-            result['metrics'] = {
-                'impressions': row.metrics.impressions,
-                'clicks': row.metrics.clicks,
-                'cost_micros': row.metrics.cost_micros,
-                'conversions': row.metrics.conversions if hasattr(row.metrics, 'conversions') else 0
-            }
+        Args:
+            customer_id: The customer ID
+            operations: List of MutateOperation messages
         
-        return result
+        Returns:
+            Resource names of the created/updated resources (empty string
+            for operations that failed when partial failures occur)
+        """
+        try:
+            ga_service = self.ga_service
+            self._throttle()
+            response = ga_service.mutate(
+                customer_id=customer_id,
+                mutate_operations=operations,
+                partial_failure=True
+            )
+            
+            if response.partial_failure_error.code:
+                logger.error(
+                    f"Partial failure in batch mutate: "
+                    f"{response.partial_failure_error.message}"
+                )
+            
+            resource_names = []
+            for op_response in response.mutate_operation_responses:
+                response_field = op_response._pb.WhichOneof('response')
+                if response_field:
+                    result = getattr(op_response, response_field)
+                    resource_names.append(result.resource_name)
+                else:
+                    resource_names.append('')
+            logger.info("Batch mutate applied %s operations", len(operations))
+            return resource_names
+            
+        except GoogleAdsException as ex:
+            logger.error("Google Ads API error: %s", ex)
+            self._handle_google_ads_exception(ex)
+            raise
+        except Exception as e:
+            logger.error("Error in batch mutate: %s", e)
+            raise
+    
+    def build_campaign_with_budget_ops(self, customer_id: str, name: str,
+                                       budget_micros: int) -> List[Any]:
+        """
+        Build the MutateOperation pair for a campaign plus its budget
+        
+        The budget uses the temporary resource name campaignBudgets/-1 and
+        the campaign references it, so both land in one batch_mutate call
+        instead of two dependent round trips.
+        
+        Args:
+            customer_id: The customer ID
+            name: Campaign (and budget) name
+            budget_micros: Daily budget in micros
+        
+        Returns:
+            List of two MutateOperation messages for batch_mutate
+        """
+        budget_op = self.client.get_type("MutateOperation")
+        budget = budget_op.campaign_budget_operation.create
+        budget.resource_name = f"customers/{customer_id}/campaignBudgets/-1"
+        budget.name = f"{name} Budget"
+        budget.amount_micros = budget_micros
+        budget.delivery_method = self.client.enums.BudgetDeliveryMethodEnum.STANDARD
+        
+        campaign_op = self.client.get_type("MutateOperation")
+        campaign = campaign_op.campaign_operation.create
+        campaign.name = name
+        campaign.status = self.client.enums.CampaignStatusEnum.PAUSED
+        campaign.advertising_channel_type = self.client.enums.AdvertisingChannelTypeEnum.SEARCH
+        campaign.campaign_budget = budget.resource_name
+        
+        return [budget_op, campaign_op]
     
     def _handle_google_ads_exception(self, ex: GoogleAdsException):
         """Handle and log Google Ads API exceptions"""
@@ -235,6 +880,32 @@ class GoogleAdsClient:
             customers = self.list_accessible_customers()
             return len(customers) > 0
         except Exception as e:
-            logger.error(f"Credential validation failed: {e}")
+            logger.error("Credential validation failed: %s", e)
             return False
 
+
+_default_client: Optional[GoogleAdsClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client(config_path: Optional[str] = None) -> GoogleAdsClient:
+    """
+    Return the process-wide shared GoogleAdsClient, creating it on first use
+    
+    Constructing a client is heavy — YAML parse, OAuth validation, TLS and
+    gRPC channel setup — so per-request instantiation in web handlers wastes
+    most of the request budget. Treat the client as a long-lived object and
+    share this singleton instead; it is thread-safe for searches.
+    
+    Args:
+        config_path: Optional config path, honored only on first creation
+    
+    Returns:
+        The shared GoogleAdsClient instance
+    """
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = GoogleAdsClient(config_path)
+    return _default_client
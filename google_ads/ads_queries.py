@@ -2,6 +2,7 @@
 Google Ads Query Templates
 Pre-built GAQL queries for common reporting and diagnostics
 """
+from functools import lru_cache
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 
@@ -9,12 +10,19 @@ from datetime import datetime, timedelta
 class GoogleAdsQueries:
     """
     Collection of useful Google Ads Query Language (GAQL) queries
+
+    All builders are memoized: repeated calls with the same arguments return
+    the exact same string object, so per-CID report loops skip the query
+    reconstruction and send byte-identical GAQL every time.
     """
     
     @staticmethod
+    @lru_cache(maxsize=64)
     def get_campaigns_overview(
         date_range: str = "LAST_30_DAYS",
-        status_filter: Optional[str] = None
+        status_filter: Optional[str] = None,
+        limit: Optional[int] = None,
+        campaign_id: Optional[str] = None
     ) -> str:
         """
         Get overview of all campaigns with performance metrics
@@ -22,6 +30,8 @@ class GoogleAdsQueries:
         Args:
             date_range: Date range for metrics (LAST_7_DAYS, LAST_30_DAYS, etc.)
             status_filter: Optional status filter (ENABLED, PAUSED, REMOVED)
+            limit: Optional server-side row cap (recommended for BI pulls)
+            campaign_id: Optional campaign ID to filter by
         
         Returns:
             GAQL query string
@@ -47,14 +57,22 @@ class GoogleAdsQueries:
         if status_filter:
             query += f" AND campaign.status = {status_filter}"
         
+        if campaign_id:
+            query += f" AND campaign.id = {campaign_id}"
+        
         query += " ORDER BY metrics.impressions DESC"
         
+        if limit:
+            query += f" LIMIT {limit}"
+        
         return query
     
     @staticmethod
+    @lru_cache(maxsize=64)
     def get_ad_groups_performance(
         campaign_id: Optional[str] = None,
-        date_range: str = "LAST_30_DAYS"
+        date_range: str = "LAST_30_DAYS",
+        limit: Optional[int] = None
     ) -> str:
         """
         Get ad groups with performance metrics
@@ -88,13 +106,18 @@ class GoogleAdsQueries:
         
         query += " ORDER BY metrics.cost_micros DESC"
         
+        if limit:
+            query += f" LIMIT {limit}"
+        
         return query
     
     @staticmethod
+    @lru_cache(maxsize=64)
     def get_keywords_performance(
         campaign_id: Optional[str] = None,
         date_range: str = "LAST_30_DAYS",
-        min_impressions: int = 0
+        min_impressions: int = 0,
+        limit: Optional[int] = None
     ) -> str:
         """
         Get keywords with performance metrics
@@ -133,12 +156,131 @@ class GoogleAdsQueries:
         
         query += " ORDER BY metrics.impressions DESC"
         
+        if limit:
+            query += f" LIMIT {limit}"
+        
+        return query
+    
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def get_performance_matrix(
+        campaign_id: Optional[str] = None,
+        date_range: str = "LAST_30_DAYS",
+        limit: Optional[int] = None
+    ) -> str:
+        """
+        Get campaigns, ad groups and keywords with metrics in one query
+        
+        keyword_view already joins all three resources, so dashboards that
+        need the campaign overview, ad group performance and keyword report
+        for the same account can make one round trip instead of three and
+        split the rows client-side with split_matrix.
+        
+        Args:
+            campaign_id: Optional campaign ID to filter by
+            date_range: Date range for metrics
+            limit: Optional server-side row cap
+        
+        Returns:
+            GAQL query string
+        """
+        query = f"""
+            SELECT
+                campaign.id,
+                campaign.name,
+                campaign.status,
+                ad_group.id,
+                ad_group.name,
+                ad_group.status,
+                ad_group_criterion.keyword.text,
+                ad_group_criterion.keyword.match_type,
+                metrics.impressions,
+                metrics.clicks,
+                metrics.cost_micros,
+                metrics.conversions,
+                metrics.quality_score
+            FROM keyword_view
+            WHERE segments.date DURING {date_range}
+        """
+        
+        if campaign_id:
+            query += f" AND campaign.id = {campaign_id}"
+        
+        query += " ORDER BY metrics.impressions DESC"
+        
+        if limit:
+            query += f" LIMIT {limit}"
+        
         return query
     
     @staticmethod
+    def split_matrix(rows: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Split flat performance-matrix rows back into the three report shapes
+        
+        Expects the flat dictionaries produced by running
+        get_performance_matrix through GoogleAdsClient.search_selected.
+        Campaign and ad group metrics are summed across their keyword rows;
+        per-row ratios (CTR, quality score) stay keyword-level only.
+        
+        Args:
+            rows: Flat result rows keyed by GAQL field path
+        
+        Returns:
+            Dictionary with 'campaigns', 'ad_groups' and 'keywords' lists
+        """
+        campaigns: Dict[Any, Dict[str, Any]] = {}
+        ad_groups: Dict[Any, Dict[str, Any]] = {}
+        
+        for row in rows:
+            impressions = row.get('metrics.impressions', 0)
+            clicks = row.get('metrics.clicks', 0)
+            cost_micros = row.get('metrics.cost_micros', 0)
+            conversions = row.get('metrics.conversions', 0)
+            
+            campaign_id = row.get('campaign.id')
+            campaign = campaigns.get(campaign_id)
+            if campaign is None:
+                campaign = campaigns[campaign_id] = {
+                    'id': campaign_id,
+                    'name': row.get('campaign.name'),
+                    'status': row.get('campaign.status'),
+                    'impressions': 0, 'clicks': 0,
+                    'cost_micros': 0, 'conversions': 0,
+                }
+            campaign['impressions'] += impressions
+            campaign['clicks'] += clicks
+            campaign['cost_micros'] += cost_micros
+            campaign['conversions'] += conversions
+            
+            ad_group_key = (campaign_id, row.get('ad_group.id'))
+            ad_group = ad_groups.get(ad_group_key)
+            if ad_group is None:
+                ad_group = ad_groups[ad_group_key] = {
+                    'id': row.get('ad_group.id'),
+                    'name': row.get('ad_group.name'),
+                    'status': row.get('ad_group.status'),
+                    'campaign_id': campaign_id,
+                    'impressions': 0, 'clicks': 0,
+                    'cost_micros': 0, 'conversions': 0,
+                }
+            ad_group['impressions'] += impressions
+            ad_group['clicks'] += clicks
+            ad_group['cost_micros'] += cost_micros
+            ad_group['conversions'] += conversions
+        
+        return {
+            'campaigns': list(campaigns.values()),
+            'ad_groups': list(ad_groups.values()),
+            'keywords': rows,
+        }
+    
+    @staticmethod
+    @lru_cache(maxsize=64)
     def get_search_terms_report(
         campaign_id: Optional[str] = None,
-        date_range: str = "LAST_7_DAYS"
+        date_range: str = "LAST_7_DAYS",
+        limit: Optional[int] = None
     ) -> str:
         """
         Get search terms report (actual queries that triggered ads)
@@ -172,13 +314,18 @@ class GoogleAdsQueries:
         
         query += " ORDER BY metrics.impressions DESC"
         
+        if limit:
+            query += f" LIMIT {limit}"
+        
         return query
     
     @staticmethod
+    @lru_cache(maxsize=64)
     def get_ads_performance(
         campaign_id: Optional[str] = None,
         ad_group_id: Optional[str] = None,
-        date_range: str = "LAST_30_DAYS"
+        date_range: str = "LAST_30_DAYS",
+        limit: Optional[int] = None
     ) -> str:
         """
         Get ads with performance metrics
@@ -219,10 +366,15 @@ class GoogleAdsQueries:
         
         query += " ORDER BY metrics.impressions DESC"
         
+        if limit:
+            query += f" LIMIT {limit}"
+        
         return query
     
     @staticmethod
-    def get_campaign_budget_info(campaign_id: Optional[str] = None) -> str:
+    @lru_cache(maxsize=64)
+    def get_campaign_budget_info(campaign_id: Optional[str] = None,
+                                 limit: Optional[int] = None) -> str:
         """
         Get campaign budget information
         
@@ -247,10 +399,15 @@ class GoogleAdsQueries:
         if campaign_id:
             query += f" WHERE campaign.id = {campaign_id}"
         
+        if limit:
+            query += f" LIMIT {limit}"
+        
         return query
     
     @staticmethod
-    def get_negative_keywords(campaign_id: Optional[str] = None) -> str:
+    @lru_cache(maxsize=64)
+    def get_negative_keywords(campaign_id: Optional[str] = None,
+                              limit: Optional[int] = None) -> str:
         """
         Get negative keywords at campaign and ad group level
         
@@ -275,12 +432,17 @@ class GoogleAdsQueries:
         if campaign_id:
             query += f" AND campaign.id = {campaign_id}"
         
+        if limit:
+            query += f" LIMIT {limit}"
+        
         return query
     
     @staticmethod
+    @lru_cache(maxsize=64)
     def get_geographic_performance(
         campaign_id: Optional[str] = None,
-        date_range: str = "LAST_30_DAYS"
+        date_range: str = "LAST_30_DAYS",
+        limit: Optional[int] = None
     ) -> str:
         """
         Get performance by geographic location
@@ -312,12 +474,17 @@ class GoogleAdsQueries:
         
         query += " ORDER BY metrics.impressions DESC"
         
+        if limit:
+            query += f" LIMIT {limit}"
+        
         return query
     
     @staticmethod
+    @lru_cache(maxsize=64)
     def get_device_performance(
         campaign_id: Optional[str] = None,
-        date_range: str = "LAST_30_DAYS"
+        date_range: str = "LAST_30_DAYS",
+        limit: Optional[int] = None
     ) -> str:
         """
         Get performance by device type
@@ -349,9 +516,13 @@ class GoogleAdsQueries:
         
         query += " ORDER BY segments.device, metrics.impressions DESC"
         
+        if limit:
+            query += f" LIMIT {limit}"
+        
         return query
     
     @staticmethod
+    @lru_cache(maxsize=64)
     def get_account_summary(date_range: str = "LAST_30_DAYS") -> str:
         """
         Get high-level account summary
@@ -378,17 +549,20 @@ class GoogleAdsQueries:
         """
     
     @staticmethod
-    def diagnose_low_quality_score(min_impressions: int = 100) -> str:
+    @lru_cache(maxsize=64)
+    def diagnose_low_quality_score(min_impressions: int = 100,
+                                   limit: Optional[int] = None) -> str:
         """
         Find keywords with low quality scores
         
         Args:
             min_impressions: Minimum impressions threshold
+            limit: Optional server-side row cap
         
         Returns:
             GAQL query string
         """
-        return f"""
+        query = f"""
             SELECT
                 campaign.id,
                 campaign.name,
@@ -406,16 +580,25 @@ class GoogleAdsQueries:
                 AND metrics.quality_score < 5
             ORDER BY metrics.impressions DESC
         """
+        
+        if limit:
+            query += f" LIMIT {limit}"
+        
+        return query
     
     @staticmethod
-    def diagnose_high_cost_low_conversion() -> str:
+    @lru_cache(maxsize=64)
+    def diagnose_high_cost_low_conversion(limit: Optional[int] = None) -> str:
         """
         Find campaigns with high cost but low conversions
         
+        Args:
+            limit: Optional server-side row cap
+        
         Returns:
             GAQL query string
         """
-        return """
+        query = """
             SELECT
                 campaign.id,
                 campaign.name,
@@ -429,16 +612,25 @@ class GoogleAdsQueries:
                 AND metrics.conversions < 10
             ORDER BY metrics.cost_micros DESC
         """
+        
+        if limit:
+            query += f" LIMIT {limit}"
+        
+        return query
     
     @staticmethod
-    def find_disapproved_ads() -> str:
+    @lru_cache(maxsize=64)
+    def find_disapproved_ads(limit: Optional[int] = None) -> str:
         """
         Find all disapproved ads that need attention
         
+        Args:
+            limit: Optional server-side row cap
+        
         Returns:
             GAQL query string
         """
-        return """
+        query = """
             SELECT
                 campaign.id,
                 campaign.name,
@@ -450,4 +642,9 @@ class GoogleAdsQueries:
             FROM ad_group_ad
             WHERE ad_group_ad.policy_summary.approval_status = 'DISAPPROVED'
         """
+        
+        if limit:
+            query += f" LIMIT {limit}"
+        
+        return query
 
@@ -2,22 +2,207 @@
 Google Ads MCP Server
 Model Context Protocol server for natural language interaction with Google Ads API
 """
+import functools
 import logging
-from typing import Optional, Dict, Any, List, Callable
+import re
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Optional, Dict, Any, List, Callable, NamedTuple
 import json
 
-from .ads_client import GoogleAdsClient
+from .ads_client import GoogleAdsClient, get_default_client
 from .ads_queries import GoogleAdsQueries
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
 logger = logging.getLogger(__name__)
 
 
+def _tool(fn):
+    """
+    Wrap an MCP tool method with the standard error contract
+    
+    Any exception is logged and converted to the {'success': False, ...}
+    response shape, keeping the tool bodies down to their happy path.
+    """
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return fn(self, *args, **kwargs)
+        except Exception as e:
+            logger.error("Error in %s: %s", fn.__name__, e)
+            return {'success': False, 'error': str(e)}
+    return wrapper
+
+
+# Resource prefixes used by the canned GoogleAdsQueries builders; a custom
+# query referencing anything outside this set is almost certainly a typo
+# and gets rejected before it costs an API round-trip
+_GAQL_FIELD_PREFIXES = frozenset({
+    'customer', 'campaign', 'campaign_budget', 'campaign_criterion',
+    'ad_group', 'ad_group_ad', 'ad_group_criterion',
+    'metrics', 'segments',
+    'search_term_view', 'keyword_view', 'geographic_view',
+})
+
+# Resources whose unbounded scans commonly return tens of thousands of rows
+_GAQL_WIDE_RESOURCES = frozenset({
+    'search_term_view', 'keyword_view', 'geographic_view',
+})
+
+_GAQL_SHAPE_RE = re.compile(
+    r'^SELECT\s+(?P<fields>.+?)\s+FROM\s+(?P<resource>\w+)(?P<rest>.*)$',
+    re.I | re.S
+)
+
+_GAQL_LIMIT_RE = re.compile(r'\bLIMIT\s+\d+', re.I)
+
+
+class _ParsedGAQL(NamedTuple):
+    """Normalized shape of a custom GAQL query (error is None when valid)"""
+    normalized: str
+    fields: tuple
+    resource: str
+    error: Optional[str]
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_gaql(query: str) -> _ParsedGAQL:
+    """
+    Normalize and validate a custom GAQL query, memoized per query text.
+
+    Agentic callers tend to re-issue the same or structurally identical
+    queries, so the parse/validate work is paid once per distinct text.
+    The normalized form (whitespace collapsed) is what gets sent to the
+    API, so differently formatted copies of the same query also share the
+    client's result cache.
+    """
+    normalized = ' '.join(query.split())
+    match = _GAQL_SHAPE_RE.match(normalized)
+    if not match:
+        return _ParsedGAQL(
+            normalized, (), '',
+            'Invalid GAQL: expected SELECT <fields> FROM <resource>')
+
+    fields = tuple(f.strip() for f in match.group('fields').split(','))
+    resource = match.group('resource').lower()
+
+    for field in fields:
+        prefix = field.split('.', 1)[0].lower()
+        if prefix not in _GAQL_FIELD_PREFIXES:
+            return _ParsedGAQL(
+                normalized, fields, resource,
+                f"Unknown field '{field}' in SELECT clause")
+
+    if resource in _GAQL_WIDE_RESOURCES and not _GAQL_LIMIT_RE.search(match.group('rest')):
+        return _ParsedGAQL(
+            normalized, fields, resource,
+            f"Query on wide resource '{resource}' must include a LIMIT clause")
+
+    return _ParsedGAQL(normalized, fields, resource, None)
+
+
+# Tool metadata, built once at import: the NLQ fallback returns this on
+# every unmatched request, so sharing one tuple avoids reallocating the
+# whole list of dicts per call
+_AVAILABLE_TOOLS = (
+    {
+        'name': 'list_accounts',
+        'description': 'List all accessible Google Ads accounts',
+        'parameters': {}
+    },
+    {
+        'name': 'get_account_info',
+        'description': 'Get detailed information about a specific account',
+        'parameters': {'customer_id': 'string (optional)'}
+    },
+    {
+        'name': 'get_account_summary',
+        'description': 'Get high-level performance summary for the account',
+        'parameters': {'date_range': 'string (default: LAST_30_DAYS)'}
+    },
+    {
+        'name': 'get_campaigns',
+        'description': 'Get all campaigns with performance metrics',
+        'parameters': {
+            'date_range': 'string (default: LAST_30_DAYS)',
+            'status_filter': 'string (optional: ENABLED, PAUSED, REMOVED)'
+        }
+    },
+    {
+        'name': 'get_campaigns_multi',
+        'description': 'Get campaigns with metrics across several accounts at once',
+        'parameters': {
+            'customer_ids': 'list of strings (default: all accessible accounts)',
+            'date_range': 'string (default: LAST_30_DAYS)'
+        }
+    },
+    {
+        'name': 'get_campaign_performance',
+        'description': 'Get detailed performance for a specific campaign',
+        'parameters': {
+            'campaign_id': 'string (required)',
+            'date_range': 'string (default: LAST_30_DAYS)'
+        }
+    },
+    {
+        'name': 'get_keywords',
+        'description': 'Get keyword performance data',
+        'parameters': {
+            'campaign_id': 'string (optional)',
+            'date_range': 'string (default: LAST_30_DAYS)',
+            'min_impressions': 'int (default: 0)'
+        }
+    },
+    {
+        'name': 'get_search_terms',
+        'description': 'Get search terms report (actual searches)',
+        'parameters': {
+            'campaign_id': 'string (optional)',
+            'date_range': 'string (default: LAST_7_DAYS)'
+        }
+    },
+    {
+        'name': 'diagnose_low_quality_scores',
+        'description': 'Find keywords with quality scores below 5',
+        'parameters': {'min_impressions': 'int (default: 100)'}
+    },
+    {
+        'name': 'diagnose_high_cost_campaigns',
+        'description': 'Find campaigns with high spend but low conversions',
+        'parameters': {}
+    },
+    {
+        'name': 'run_diagnostics',
+        'description': 'Run all account diagnostics concurrently',
+        'parameters': {'min_impressions': 'int (default: 100)'}
+    },
+    {
+        'name': 'run_custom_query',
+        'description': 'Execute a custom GAQL query',
+        'parameters': {
+            'query': 'string (required)',
+            'customer_id': 'string (optional)'
+        }
+    }
+)
+
+
 class GoogleAdsMCPServer:
     """
     MCP Server for Google Ads API
     Provides natural language interface to Google Ads data
     """
     
+    # Fixed attribute layout: slot access is an array index instead of a
+    # per-lookup __dict__ probe in the hot tool-dispatch paths
+    __slots__ = ('client', 'queries', 'customer_id', 'tools', '_nlq_cache')
+    
     def __init__(self, config_path: Optional[str] = None):
         """
         Initialize MCP server
@@ -25,303 +210,284 @@ class GoogleAdsMCPServer:
         Args:
             config_path: Path to google-ads.yaml config file
         """
-        self.client = GoogleAdsClient(config_path)
+        # Share the process-wide client so every server instance (the web
+        # routes build one per request) reuses a single gRPC channel instead
+        # of paying TLS + HTTP/2 setup each time
+        self.client = get_default_client(config_path)
         self.queries = GoogleAdsQueries()
         self.customer_id = self.client.get_customer_id()
         
-        # Register available tools
-        self.tools = self._register_tools()
+        # Register available tools (read-only view; the table never changes
+        # after init)
+        self.tools = MappingProxyType(self._register_tools())
+        
+        # Session-level cache for natural language requests (query -> result)
+        self._nlq_cache: Dict[str, Dict[str, Any]] = {}
+        
+        # The GAQL builders in GoogleAdsQueries are lru_cached; pre-build the
+        # common combinations so the first real request is already hot
+        self.warm_query_cache()
         
         logger.info("Google Ads MCP Server initialized")
     
+    def warm_query_cache(self):
+        """Pre-populate the memoized GAQL builders with common parameter combos"""
+        for date_range in ("LAST_7_DAYS", "LAST_30_DAYS"):
+            for status_filter in (None, "ENABLED", "PAUSED"):
+                self.queries.get_campaigns_overview(date_range, status_filter)
+            self.queries.get_ad_groups_performance(None, date_range)
+            self.queries.get_keywords_performance(None, date_range, 0)
+            self.queries.get_search_terms_report(None, date_range)
+        self.queries.get_account_summary("LAST_30_DAYS")
+        self.queries.diagnose_low_quality_score()
+        self.queries.diagnose_high_cost_low_conversion()
+        self.queries.find_disapproved_ads()
+    
+    # Tool names shared at class level; only the bound-method dict is built
+    # per instance (methods need self), from this single tuple
+    _TOOL_NAMES = (
+        # Account Management
+        'list_accounts', 'get_account_info', 'get_account_summary',
+        # Campaign Reporting
+        'get_campaigns', 'get_campaigns_multi', 'get_campaign_performance',
+        'get_campaign_budget',
+        # Ad Group Reporting
+        'get_ad_groups',
+        # Keyword Reporting
+        'get_keywords', 'get_search_terms', 'get_negative_keywords',
+        # Ad Reporting
+        'get_ads',
+        # Performance Analysis
+        'get_geographic_performance', 'get_device_performance',
+        # Diagnostics
+        'diagnose_low_quality_scores', 'diagnose_high_cost_campaigns',
+        'find_disapproved_ads', 'run_diagnostics',
+        # Custom Query
+        'run_custom_query',
+    )
+    
     def _register_tools(self) -> Dict[str, Callable]:
         """Register all available MCP tools"""
-        return {
-            # Account Management
-            'list_accounts': self.list_accounts,
-            'get_account_info': self.get_account_info,
-            'get_account_summary': self.get_account_summary,
-            
-            # Campaign Reporting
-            'get_campaigns': self.get_campaigns,
-            'get_campaign_performance': self.get_campaign_performance,
-            'get_campaign_budget': self.get_campaign_budget,
-            
-            # Ad Group Reporting
-            'get_ad_groups': self.get_ad_groups,
-            
-            # Keyword Reporting
-            'get_keywords': self.get_keywords,
-            'get_search_terms': self.get_search_terms,
-            'get_negative_keywords': self.get_negative_keywords,
-            
-            # Ad Reporting
-            'get_ads': self.get_ads,
-            
-            # Performance Analysis
-            'get_geographic_performance': self.get_geographic_performance,
-            'get_device_performance': self.get_device_performance,
-            
-            # Diagnostics
-            'diagnose_low_quality_scores': self.diagnose_low_quality_scores,
-            'diagnose_high_cost_campaigns': self.diagnose_high_cost_campaigns,
-            'find_disapproved_ads': self.find_disapproved_ads,
-            
-            # Custom Query
-            'run_custom_query': self.run_custom_query,
-        }
+        return {name: getattr(self, name) for name in self._TOOL_NAMES}
     
     def get_available_tools(self) -> List[Dict[str, Any]]:
         """Get list of available tools with descriptions"""
-        return [
-            {
-                'name': 'list_accounts',
-                'description': 'List all accessible Google Ads accounts',
-                'parameters': {}
-            },
-            {
-                'name': 'get_account_info',
-                'description': 'Get detailed information about a specific account',
-                'parameters': {'customer_id': 'string (optional)'}
-            },
-            {
-                'name': 'get_account_summary',
-                'description': 'Get high-level performance summary for the account',
-                'parameters': {'date_range': 'string (default: LAST_30_DAYS)'}
-            },
-            {
-                'name': 'get_campaigns',
-                'description': 'Get all campaigns with performance metrics',
-                'parameters': {
-                    'date_range': 'string (default: LAST_30_DAYS)',
-                    'status_filter': 'string (optional: ENABLED, PAUSED, REMOVED)'
-                }
-            },
-            {
-                'name': 'get_campaign_performance',
-                'description': 'Get detailed performance for a specific campaign',
-                'parameters': {
-                    'campaign_id': 'string (required)',
-                    'date_range': 'string (default: LAST_30_DAYS)'
-                }
-            },
-            {
-                'name': 'get_keywords',
-                'description': 'Get keyword performance data',
-                'parameters': {
-                    'campaign_id': 'string (optional)',
-                    'date_range': 'string (default: LAST_30_DAYS)',
-                    'min_impressions': 'int (default: 0)'
-                }
-            },
-            {
-                'name': 'get_search_terms',
-                'description': 'Get search terms report (actual searches)',
-                'parameters': {
-                    'campaign_id': 'string (optional)',
-                    'date_range': 'string (default: LAST_7_DAYS)'
-                }
-            },
-            {
-                'name': 'diagnose_low_quality_scores',
-                'description': 'Find keywords with quality scores below 5',
-                'parameters': {'min_impressions': 'int (default: 100)'}
-            },
-            {
-                'name': 'diagnose_high_cost_campaigns',
-                'description': 'Find campaigns with high spend but low conversions',
-                'parameters': {}
-            },
-            {
-                'name': 'run_custom_query',
-                'description': 'Execute a custom GAQL query',
-                'parameters': {
-                    'query': 'string (required)',
-                    'customer_id': 'string (optional)'
-                }
-            }
-        ]
+        return list(_AVAILABLE_TOOLS)
     
     # Account Management Tools
     
+    @_tool
     def list_accounts(self) -> Dict[str, Any]:
         """List all accessible accounts"""
-        try:
-            customers = self.client.list_accessible_customers()
-            return {
-                'success': True,
-                'count': len(customers),
-                'accounts': customers
-            }
-        except Exception as e:
-            logger.error(f"Error listing accounts: {e}")
-            return {'success': False, 'error': str(e)}
+        customers = self.client.list_accessible_customers()
+        return {
+            'success': True,
+            'count': len(customers),
+            'accounts': customers
+        }
     
+    @_tool
     def get_account_info(self, customer_id: Optional[str] = None) -> Dict[str, Any]:
         """Get account information"""
-        try:
-            cid = customer_id or self.customer_id
-            if not cid:
-                return {'success': False, 'error': 'No customer ID provided'}
-            
-            info = self.client.get_customer_info(cid)
-            return {
-                'success': True,
-                'account': info
-            }
-        except Exception as e:
-            logger.error(f"Error getting account info: {e}")
-            return {'success': False, 'error': str(e)}
+        cid = customer_id or self.customer_id
+        if not cid:
+            return {'success': False, 'error': 'No customer ID provided'}
+        
+        info = self.client.get_customer_info(cid)
+        return {
+            'success': True,
+            'account': info
+        }
     
+    @_tool
     def get_account_summary(self, date_range: str = "LAST_30_DAYS") -> Dict[str, Any]:
         """Get account summary with performance metrics"""
-        try:
-            query = self.queries.get_account_summary(date_range)
-            results = self.client.search(self.customer_id, query)
-            return {
-                'success': True,
-                'summary': results[0] if results else {},
-                'date_range': date_range
-            }
-        except Exception as e:
-            logger.error(f"Error getting account summary: {e}")
-            return {'success': False, 'error': str(e)}
+        query = self.queries.get_account_summary(date_range)
+        results = self.client.search(self.customer_id, query)
+        return {
+            'success': True,
+            'summary': results[0] if results else {},
+            'date_range': date_range
+        }
     
     # Campaign Tools
     
+    @_tool
     def get_campaigns(
         self,
         date_range: str = "LAST_30_DAYS",
-        status_filter: Optional[str] = None
+        status_filter: Optional[str] = None,
+        max_rows: Optional[int] = None
     ) -> Dict[str, Any]:
         """Get all campaigns with metrics"""
-        try:
-            query = self.queries.get_campaigns_overview(date_range, status_filter)
-            results = self.client.search(self.customer_id, query)
-            return {
-                'success': True,
-                'count': len(results),
-                'campaigns': results,
-                'date_range': date_range
-            }
-        except Exception as e:
-            logger.error(f"Error getting campaigns: {e}")
-            return {'success': False, 'error': str(e)}
+        query = self.queries.get_campaigns_overview(
+            date_range, status_filter, limit=max_rows)
+        results = self.client.search(self.customer_id, query)
+        return {
+            'success': True,
+            'count': len(results),
+            'campaigns': results,
+            'date_range': date_range
+        }
     
+    @_tool
+    def get_campaigns_multi(
+        self,
+        customer_ids: Optional[List[str]] = None,
+        date_range: str = "LAST_30_DAYS"
+    ) -> Dict[str, Any]:
+        """Get campaigns with metrics across several accounts at once"""
+        # The typical agency workflow (list_accounts + per-account
+        # get_campaigns) degenerates into N sequential round-trips; one
+        # shared query fanned out through search_many runs them in
+        # parallel under the client's rate limiter
+        if customer_ids is None:
+            customer_ids = [c['id'] for c in self.client.list_accessible_customers()]
+
+        query = self.queries.get_campaigns_overview(date_range)
+        results, failed = self.client.search_many(customer_ids, query)
+        return {
+            'success': True,
+            'count': sum(len(rows) for rows in results.values()),
+            'accounts': results,
+            'failed_accounts': failed,
+            'date_range': date_range
+        }
+
+    @_tool
     def get_campaign_performance(
         self,
         campaign_id: str,
         date_range: str = "LAST_30_DAYS"
     ) -> Dict[str, Any]:
         """Get detailed campaign performance"""
-        try:
-            query = self.queries.get_campaigns_overview(date_range)
-            results = self.client.search(self.customer_id, query)
-            
-            # Filter for specific campaign
-            campaign_data = [r for r in results if str(r.get('campaign', {}).get('id')) == str(campaign_id)]
-            
-            return {
-                'success': True,
-                'campaign': campaign_data[0] if campaign_data else None,
-                'date_range': date_range
-            }
-        except Exception as e:
-            logger.error(f"Error getting campaign performance: {e}")
-            return {'success': False, 'error': str(e)}
+        # Filter server-side instead of downloading every campaign
+        # and picking one out in Python; int() keeps the interpolated
+        # value numeric (no GAQL injection through the tool parameter)
+        query = self.queries.get_campaigns_overview(
+            date_range, campaign_id=str(int(campaign_id)))
+        results = self.client.search(self.customer_id, query)
+        
+        return {
+            'success': True,
+            'campaign': results[0] if results else None,
+            'date_range': date_range
+        }
     
+    @_tool
     def get_campaign_budget(self, campaign_id: Optional[str] = None) -> Dict[str, Any]:
         """Get campaign budget information"""
-        try:
-            query = self.queries.get_campaign_budget_info(campaign_id)
-            results = self.client.search(self.customer_id, query)
-            return {
-                'success': True,
-                'count': len(results),
-                'budgets': results
-            }
-        except Exception as e:
-            logger.error(f"Error getting budget info: {e}")
-            return {'success': False, 'error': str(e)}
+        query = self.queries.get_campaign_budget_info(campaign_id)
+        results = self.client.search(self.customer_id, query)
+        return {
+            'success': True,
+            'count': len(results),
+            'budgets': results
+        }
     
     # Ad Group Tools
     
+    @_tool
     def get_ad_groups(
         self,
         campaign_id: Optional[str] = None,
         date_range: str = "LAST_30_DAYS"
     ) -> Dict[str, Any]:
         """Get ad groups with performance"""
-        try:
-            query = self.queries.get_ad_groups_performance(campaign_id, date_range)
-            results = self.client.search(self.customer_id, query)
-            return {
-                'success': True,
-                'count': len(results),
-                'ad_groups': results,
-                'date_range': date_range
-            }
-        except Exception as e:
-            logger.error(f"Error getting ad groups: {e}")
-            return {'success': False, 'error': str(e)}
+        query = self.queries.get_ad_groups_performance(campaign_id, date_range)
+        results = self.client.search(self.customer_id, query)
+        return {
+            'success': True,
+            'count': len(results),
+            'ad_groups': results,
+            'date_range': date_range
+        }
     
     # Keyword Tools
     
+    @staticmethod
+    def _metrics_columns(rows: List[Dict], text_field: str) -> Dict[str, Any]:
+        """
+        Columnar (structure-of-arrays) view of a metrics result set.
+
+        Large reports (search terms commonly exceed 10k rows) are much
+        cheaper to sort/aggregate as contiguous int64 arrays than by
+        traversing nested dicts per row. Falls back to plain lists when
+        NumPy is not installed.
+        """
+        texts = [row.get(text_field, '') for row in rows]
+        metrics = [row.get('metrics') or {} for row in rows]
+        impressions = [m.get('impressions', 0) for m in metrics]
+        clicks = [m.get('clicks', 0) for m in metrics]
+        cost_micros = [m.get('cost_micros', 0) for m in metrics]
+
+        if NUMPY_AVAILABLE:
+            return {
+                text_field: np.array(texts, dtype=object),
+                'impressions': np.array(impressions, dtype=np.int64),
+                'clicks': np.array(clicks, dtype=np.int64),
+                'cost_micros': np.array(cost_micros, dtype=np.int64),
+            }
+        return {
+            text_field: texts,
+            'impressions': impressions,
+            'clicks': clicks,
+            'cost_micros': cost_micros,
+        }
+
+    @_tool
     def get_keywords(
         self,
         campaign_id: Optional[str] = None,
         date_range: str = "LAST_30_DAYS",
-        min_impressions: int = 0
+        min_impressions: int = 0,
+        max_rows: Optional[int] = None
     ) -> Dict[str, Any]:
         """Get keyword performance"""
-        try:
-            query = self.queries.get_keywords_performance(campaign_id, date_range, min_impressions)
-            results = self.client.search(self.customer_id, query)
-            return {
-                'success': True,
-                'count': len(results),
-                'keywords': results,
-                'date_range': date_range
-            }
-        except Exception as e:
-            logger.error(f"Error getting keywords: {e}")
-            return {'success': False, 'error': str(e)}
+        query = self.queries.get_keywords_performance(
+            campaign_id, date_range, min_impressions, limit=max_rows)
+        results = self.client.search(self.customer_id, query)
+        return {
+            'success': True,
+            'count': len(results),
+            'keywords': results,
+            'columns': self._metrics_columns(results, 'keyword'),
+            'date_range': date_range
+        }
     
+    @_tool
     def get_search_terms(
         self,
         campaign_id: Optional[str] = None,
-        date_range: str = "LAST_7_DAYS"
+        date_range: str = "LAST_7_DAYS",
+        max_rows: Optional[int] = None
     ) -> Dict[str, Any]:
         """Get search terms report"""
-        try:
-            query = self.queries.get_search_terms_report(campaign_id, date_range)
-            results = self.client.search(self.customer_id, query)
-            return {
-                'success': True,
-                'count': len(results),
-                'search_terms': results,
-                'date_range': date_range
-            }
-        except Exception as e:
-            logger.error(f"Error getting search terms: {e}")
-            return {'success': False, 'error': str(e)}
+        query = self.queries.get_search_terms_report(
+            campaign_id, date_range, limit=max_rows)
+        results = self.client.search(self.customer_id, query)
+        return {
+            'success': True,
+            'count': len(results),
+            'search_terms': results,
+            'columns': self._metrics_columns(results, 'search_term'),
+            'date_range': date_range
+        }
     
+    @_tool
     def get_negative_keywords(self, campaign_id: Optional[str] = None) -> Dict[str, Any]:
         """Get negative keywords"""
-        try:
-            query = self.queries.get_negative_keywords(campaign_id)
-            results = self.client.search(self.customer_id, query)
-            return {
-                'success': True,
-                'count': len(results),
-                'negative_keywords': results
-            }
-        except Exception as e:
-            logger.error(f"Error getting negative keywords: {e}")
-            return {'success': False, 'error': str(e)}
+        query = self.queries.get_negative_keywords(campaign_id)
+        results = self.client.search(self.customer_id, query)
+        return {
+            'success': True,
+            'count': len(results),
+            'negative_keywords': results
+        }
     
     # Ad Tools
     
+    @_tool
     def get_ads(
         self,
         campaign_id: Optional[str] = None,
@@ -329,125 +495,149 @@ class GoogleAdsMCPServer:
         date_range: str = "LAST_30_DAYS"
     ) -> Dict[str, Any]:
         """Get ads with performance"""
-        try:
-            query = self.queries.get_ads_performance(campaign_id, ad_group_id, date_range)
-            results = self.client.search(self.customer_id, query)
-            return {
-                'success': True,
-                'count': len(results),
-                'ads': results,
-                'date_range': date_range
-            }
-        except Exception as e:
-            logger.error(f"Error getting ads: {e}")
-            return {'success': False, 'error': str(e)}
+        query = self.queries.get_ads_performance(campaign_id, ad_group_id, date_range)
+        results = self.client.search(self.customer_id, query)
+        return {
+            'success': True,
+            'count': len(results),
+            'ads': results,
+            'date_range': date_range
+        }
     
     # Performance Analysis Tools
     
+    @_tool
     def get_geographic_performance(
         self,
         campaign_id: Optional[str] = None,
         date_range: str = "LAST_30_DAYS"
     ) -> Dict[str, Any]:
         """Get performance by geography"""
-        try:
-            query = self.queries.get_geographic_performance(campaign_id, date_range)
-            results = self.client.search(self.customer_id, query)
-            return {
-                'success': True,
-                'count': len(results),
-                'geographic_data': results,
-                'date_range': date_range
-            }
-        except Exception as e:
-            logger.error(f"Error getting geographic performance: {e}")
-            return {'success': False, 'error': str(e)}
+        query = self.queries.get_geographic_performance(campaign_id, date_range)
+        results = self.client.search(self.customer_id, query)
+        return {
+            'success': True,
+            'count': len(results),
+            'geographic_data': results,
+            'date_range': date_range
+        }
     
+    @_tool
     def get_device_performance(
         self,
         campaign_id: Optional[str] = None,
         date_range: str = "LAST_30_DAYS"
     ) -> Dict[str, Any]:
         """Get performance by device"""
-        try:
-            query = self.queries.get_device_performance(campaign_id, date_range)
-            results = self.client.search(self.customer_id, query)
-            return {
-                'success': True,
-                'count': len(results),
-                'device_data': results,
-                'date_range': date_range
-            }
-        except Exception as e:
-            logger.error(f"Error getting device performance: {e}")
-            return {'success': False, 'error': str(e)}
+        query = self.queries.get_device_performance(campaign_id, date_range)
+        results = self.client.search(self.customer_id, query)
+        return {
+            'success': True,
+            'count': len(results),
+            'device_data': results,
+            'date_range': date_range
+        }
     
     # Diagnostic Tools
     
-    def diagnose_low_quality_scores(self, min_impressions: int = 100) -> Dict[str, Any]:
+    @_tool
+    def diagnose_low_quality_scores(self, min_impressions: int = 100,
+                                    max_rows: Optional[int] = None) -> Dict[str, Any]:
         """Find keywords with low quality scores"""
-        try:
-            query = self.queries.diagnose_low_quality_score(min_impressions)
-            results = self.client.search(self.customer_id, query)
-            return {
-                'success': True,
-                'count': len(results),
-                'low_quality_keywords': results,
-                'recommendation': 'Review ad relevance, landing pages, and expected CTR'
-            }
-        except Exception as e:
-            logger.error(f"Error diagnosing quality scores: {e}")
-            return {'success': False, 'error': str(e)}
+        query = self.queries.diagnose_low_quality_score(
+            min_impressions, limit=max_rows)
+        results = self.client.search(self.customer_id, query)
+        return {
+            'success': True,
+            'count': len(results),
+            'low_quality_keywords': results,
+            'recommendation': 'Review ad relevance, landing pages, and expected CTR'
+        }
     
+    @_tool
     def diagnose_high_cost_campaigns(self) -> Dict[str, Any]:
         """Find campaigns with high cost but low conversions"""
-        try:
-            query = self.queries.diagnose_high_cost_low_conversion()
-            results = self.client.search(self.customer_id, query)
-            return {
-                'success': True,
-                'count': len(results),
-                'campaigns': results,
-                'recommendation': 'Review targeting, ad copy, and landing page conversion rate'
-            }
-        except Exception as e:
-            logger.error(f"Error diagnosing high cost campaigns: {e}")
-            return {'success': False, 'error': str(e)}
+        query = self.queries.diagnose_high_cost_low_conversion()
+        results = self.client.search(self.customer_id, query)
+        return {
+            'success': True,
+            'count': len(results),
+            'campaigns': results,
+            'recommendation': 'Review targeting, ad copy, and landing page conversion rate'
+        }
     
+    @_tool
     def find_disapproved_ads(self) -> Dict[str, Any]:
         """Find all disapproved ads"""
-        try:
-            query = self.queries.find_disapproved_ads()
-            results = self.client.search(self.customer_id, query)
-            return {
-                'success': True,
-                'count': len(results),
-                'disapproved_ads': results,
-                'recommendation': 'Review policy violations and update ad copy'
+        query = self.queries.find_disapproved_ads()
+        results = self.client.search(self.customer_id, query)
+        return {
+            'success': True,
+            'count': len(results),
+            'disapproved_ads': results,
+            'recommendation': 'Review policy violations and update ad copy'
+        }
+    
+    @_tool
+    def run_diagnostics(self, min_impressions: int = 100) -> Dict[str, Any]:
+        """
+        Run all three diagnostics in one call, overlapping their round trips
+        
+        Each diagnostic is an independent 1-2 s query, so a thread pool cuts
+        the full health check to roughly the slowest single query.
+        
+        Args:
+            min_impressions: Minimum impressions for the quality-score check
+        
+        Returns:
+            Dictionary with the three diagnostic results
+        """
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            low_quality = executor.submit(
+                self.diagnose_low_quality_scores, min_impressions)
+            high_cost = executor.submit(self.diagnose_high_cost_campaigns)
+            disapproved = executor.submit(self.find_disapproved_ads)
+            
+            results = {
+                'low_quality_scores': low_quality.result(),
+                'high_cost_campaigns': high_cost.result(),
+                'disapproved_ads': disapproved.result(),
             }
-        except Exception as e:
-            logger.error(f"Error finding disapproved ads: {e}")
-            return {'success': False, 'error': str(e)}
+        
+        results['success'] = all(part.get('success') for part in results.values())
+        return results
     
     # Custom Query
     
+    @_tool
     def run_custom_query(
         self,
         query: str,
-        customer_id: Optional[str] = None
+        customer_id: Optional[str] = None,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
-        """Execute a custom GAQL query"""
-        try:
-            cid = customer_id or self.customer_id
-            results = self.client.search(cid, query)
-            return {
-                'success': True,
-                'count': len(results),
-                'results': results
-            }
-        except Exception as e:
-            logger.error(f"Error executing custom query: {e}")
-            return {'success': False, 'error': str(e)}
+        """
+        Execute a custom GAQL query
+        
+        Args:
+            query: GAQL query string
+            customer_id: Optional customer ID (defaults to the login account)
+            use_cache: Set to False to bypass the client's TTL result cache
+                and force a fresh fetch
+        """
+        parsed = _parse_gaql(query)
+        if parsed.error:
+            # Malformed queries are caught (and memoized) locally instead
+            # of paying a round-trip for a guaranteed API error
+            return {'success': False, 'error': parsed.error}
+
+        cid = customer_id or self.customer_id
+        results = self.client.search(cid, parsed.normalized, cache=use_cache)
+        return {
+            'success': True,
+            'count': len(results),
+            'results': results
+        }
     
     def process_natural_language_request(self, request: str) -> Dict[str, Any]:
         """
@@ -464,43 +654,46 @@ class GoogleAdsMCPServer:
         """
         request_lower = request.lower()
         
-        # Account queries
-        if any(word in request_lower for word in ['accounts', 'list accounts']):
-            return self.list_accounts()
-        
-        if 'account summary' in request_lower or 'overview' in request_lower:
-            return self.get_account_summary()
-        
-        # Campaign queries
-        if 'campaigns' in request_lower and 'performance' not in request_lower:
-            return self.get_campaigns()
+        # Repeated identical requests within a session are served from cache
+        # (call clear_nlq_cache() after mutating account data)
+        cached = self._nlq_cache.get(request_lower)
+        if cached is not None:
+            return cached
         
-        # Keyword queries
-        if 'keywords' in request_lower:
-            if 'low quality' in request_lower or 'quality score' in request_lower:
-                return self.diagnose_low_quality_scores()
-            elif 'negative' in request_lower:
-                return self.get_negative_keywords()
-            else:
-                return self.get_keywords()
-        
-        # Search terms
-        if 'search terms' in request_lower or 'search queries' in request_lower:
-            return self.get_search_terms()
-        
-        # Diagnostics
-        if 'high cost' in request_lower or 'expensive' in request_lower:
-            return self.diagnose_high_cost_campaigns()
-        
-        if 'disapproved' in request_lower or 'rejected' in request_lower:
-            return self.find_disapproved_ads()
-        
-        # Performance by dimension
-        if 'geographic' in request_lower or 'location' in request_lower:
-            return self.get_geographic_performance()
-        
-        if 'device' in request_lower:
-            return self.get_device_performance()
+        result = self._route_natural_language_request(request_lower)
+        if result.get('success'):
+            self._nlq_cache[request_lower] = result
+        return result
+    
+    def clear_nlq_cache(self):
+        """Clear the session cache of natural language request results"""
+        self._nlq_cache.clear()
+    
+    # Intent routing table, compiled once at class load: each rule is a
+    # precompiled pattern paired with the tool method to call. Rules are
+    # checked in order, mirroring the precedence of the old if-ladder
+    # (lookaheads encode the combined conditions like "keywords + negative")
+    _INTENT_RULES = (
+        (re.compile(r'(?=.*all accounts)(?=.*campaigns)', re.S), 'get_campaigns_multi'),
+        (re.compile(r'accounts'), 'list_accounts'),
+        (re.compile(r'account summary|overview'), 'get_account_summary'),
+        (re.compile(r'^(?!.*performance).*campaigns', re.S), 'get_campaigns'),
+        (re.compile(r'(?=.*keywords)(?=.*(?:low quality|quality score))', re.S),
+         'diagnose_low_quality_scores'),
+        (re.compile(r'(?=.*keywords)(?=.*negative)', re.S), 'get_negative_keywords'),
+        (re.compile(r'keywords'), 'get_keywords'),
+        (re.compile(r'search terms|search queries'), 'get_search_terms'),
+        (re.compile(r'high cost|expensive'), 'diagnose_high_cost_campaigns'),
+        (re.compile(r'disapproved|rejected'), 'find_disapproved_ads'),
+        (re.compile(r'geographic|location'), 'get_geographic_performance'),
+        (re.compile(r'device'), 'get_device_performance'),
+    )
+    
+    def _route_natural_language_request(self, request_lower: str) -> Dict[str, Any]:
+        """Map a lowercased natural language request to the matching tool"""
+        for pattern, tool_name in self._INTENT_RULES:
+            if pattern.search(request_lower):
+                return getattr(self, tool_name)()
         
         # Default
         return {
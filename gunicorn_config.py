@@ -1,18 +1,27 @@
 """
 Gunicorn configuration for production deployment
 """
+import multiprocessing
 import os
 
 # Server socket
 bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
 
-# Worker processes
-workers = 2
-worker_class = "sync"
+# Worker processes: the workload is I/O-bound (AI providers and the Google
+# Ads API take 1-2 s per call), so concurrency comes from threads per worker
+# rather than processes; a sync worker would block its whole process for the
+# duration of every upstream round trip
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.environ.get('WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('THREADS', '8'))
 worker_connections = 1000
-timeout = 120
+timeout = 60
+graceful_timeout = 30
 keepalive = 5
 
+# Heartbeat files on tmpfs so worker liveness checks never stall on disk
+worker_tmp_dir = "/dev/shm"
+
 # Request handling
 max_requests = 1000
 max_requests_jitter = 100
@@ -33,3 +42,22 @@ preload_app = True
 # Application
 wsgi_app = "web_app:app"
 
+
+def post_fork(server, worker):
+    """Warm the shared Google Ads client right after the worker forks.
+
+    preload_app imports the app in the master, but gRPC channels must not be
+    shared across fork — each worker builds its own here, so the first real
+    request doesn't pay YAML parse + OAuth + TLS/HTTP2 setup. All threads in
+    the worker then multiplex over that single channel.
+    """
+    try:
+        from google_ads import get_default_client
+        client = get_default_client()
+        client.ga_service  # touching the stub forces channel creation
+        worker.log.info("Google Ads client warmed up")
+    except Exception as e:
+        # Missing google-ads.yaml or the optional dependency is fine — the
+        # web app works without the Ads integration
+        worker.log.info("Google Ads warmup skipped: %s", e)
+
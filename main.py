@@ -3,34 +3,189 @@
 AI Marketing - Приложение для генерации рекламных материалов
 на основе методологии FAB и AI
 """
+import atexit
 import click
+import functools
+import hashlib
 import logging
+import os
+import queue
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.table import Table
+from rich.table import Column, Table
 from rich.panel import Panel
 from rich import print as rprint
 
 from config import settings
-from parsers import WebsiteParser
-from ai import AIGenerator
-from exporters import ExcelExporter
-
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('ai_marketing.log'),
-        logging.StreamHandler()
-    ]
+
+# Тяжелые модули (httpx/lxml, AI SDK, openpyxl) импортируются
+# внутри команд, которые их используют — как уже сделано для google_ads.
+# Иначе даже --help и config-info платят за весь их граф импортов
+
+# Настройка логирования: запись в файл и терминал уходит в фоновый поток
+# через QueueHandler/QueueListener, чтобы команды никогда не блокировались
+# на дисковом вводе-выводе — в очередь кладется запись, и выполнение
+# продолжается сразу
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_file_handler = logging.FileHandler('ai_marketing.log')
+_file_handler.setFormatter(_log_formatter)
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(_log_formatter)
+
+_log_queue = queue.Queue(-1)
+_log_listener = QueueListener(
+    _log_queue, _file_handler, _stream_handler, respect_handler_level=True
 )
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(_log_queue)])
 logger = logging.getLogger(__name__)
 
 console = Console()
 
 
+# Общие хелперы форматирования метрик для таблиц google_ads: один разбор
+# формата в одном месте, умножение на обратную величину вместо деления
+_MICROS_INV = 1e-6
+
+
+def _money(metrics, key='cost_micros'):
+    """'$12.34' из суммы в микровалюте"""
+    return f"${metrics.get(key, 0) * _MICROS_INV:.2f}"
+
+
+def _pct(metrics, key='ctr'):
+    """'1.23%' из доли"""
+    return f"{metrics.get(key, 0) * 100:.2f}%"
+
+
+# Шаблоны колонок таблиц google_ads: объекты Column со стилями создаются
+# один раз при импорте, команда получает таблицу с их копиями (copy()
+# дает колонку с пустым списком ячеек)
+_CAMPAIGN_COLS = (
+    Column("ID", style="cyan"),
+    Column("Название", style="yellow"),
+    Column("Статус", style="green"),
+    Column("Показы", style="blue"),
+    Column("Клики", style="magenta"),
+    Column("Стоимость", style="red"),
+)
+
+_KEYWORD_COLS = (
+    Column("Ключевое слово", style="cyan"),
+    Column("Тип", style="yellow"),
+    Column("Показы", style="blue"),
+    Column("Клики", style="magenta"),
+    Column("CTR", style="green"),
+    Column("Стоимость", style="red"),
+)
+
+_SEARCH_TERM_COLS = (
+    Column("Запрос", style="cyan"),
+    Column("Показы", style="blue"),
+    Column("Клики", style="magenta"),
+    Column("CTR", style="green"),
+    Column("Стоимость", style="red"),
+)
+
+_LOW_QUALITY_COLS = (
+    Column("Кампания", style="yellow"),
+    Column("Ключевое слово", style="cyan"),
+    Column("Показатель качества", style="red"),
+    Column("Показы", style="blue"),
+    Column("CTR", style="green"),
+)
+
+_HIGH_COST_COLS = (
+    Column("Кампания", style="yellow"),
+    Column("Статус", style="cyan"),
+    Column("Стоимость", style="red"),
+    Column("Конверсии", style="green"),
+    Column("Цена конверсии", style="magenta"),
+)
+
+
+def _table_from(template, title):
+    """Таблица с копиями колонок из прекомпилированного шаблона"""
+    return Table(*(column.copy() for column in template), title=title)
+
+
+# Чекпоинты analyze: промежуточные результаты AI сохраняются на диск,
+# чтобы упавший на экспорте запуск можно было продолжить с --resume,
+# не оплачивая LLM вызовы заново
+_CHECKPOINT_ROOT = Path('.ai_marketing') / 'checkpoints'
+
+
+def _checkpoint_key(url: str, website_data: dict) -> str:
+    """Ключ чекпоинта: URL + хэш контента (изменился сайт — новый ключ)"""
+    payload = "\x00".join((
+        url,
+        website_data.get('title', ''),
+        website_data.get('main_content', ''),
+    ))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _checkpoint_save(key: str, step: str, data: dict):
+    """Атомарно сохраняет результат шага (tempfile + os.replace)"""
+    try:
+        directory = _CHECKPOINT_ROOT / key
+        directory.mkdir(parents=True, exist_ok=True)
+        try:
+            import orjson
+            payload = orjson.dumps(data)
+        except ImportError:
+            import json
+            payload = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        tmp_path = directory / f'.{step}.tmp'
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, directory / f'{step}.json')
+    except OSError as e:
+        logger.warning("Не удалось сохранить чекпоинт %s: %s", step, e)
+
+
+def _checkpoint_load(key: str, step: str):
+    """Возвращает сохраненный результат шага или None"""
+    path = _CHECKPOINT_ROOT / key / f'{step}.json'
+    try:
+        payload = path.read_bytes()
+    except OSError:
+        return None
+    try:
+        try:
+            import orjson
+            return orjson.loads(payload)
+        except ImportError:
+            import json
+            return json.loads(payload)
+    except ValueError:
+        return None
+
+
+def _checkpoint_clear(key: str):
+    """Удаляет чекпоинты после успешного завершения"""
+    shutil.rmtree(_CHECKPOINT_ROOT / key, ignore_errors=True)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_ai(provider=None, model=None):
+    """Один AIGenerator на процесс для каждой пары (провайдер, модель)"""
+    from ai import AIGenerator
+    return AIGenerator(provider=provider, model=model)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_mcp():
+    """Один GoogleAdsMCPServer на процесс (и одно gRPC соединение)"""
+    from google_ads import GoogleAdsMCPServer
+    return GoogleAdsMCPServer()
+
+
 @click.group()
 @click.version_option(version='1.0.0')
 def cli():
@@ -50,7 +205,10 @@ def cli():
               default=None, help='AI провайдер (ollama - бесплатно!)')
 @click.option('--model', default=None, help='AI модель')
 @click.option('--keywords-only', is_flag=True, help='Генерировать только ключевые слова')
-def analyze(url, output, ai_provider, model, keywords_only):
+@click.option('--no-cache', is_flag=True, help='Не использовать кэш ответов AI')
+@click.option('--resume', is_flag=True,
+              help='Продолжить с чекпоинта предыдущего упавшего запуска')
+def analyze(url, output, ai_provider, model, keywords_only, no_cache, resume):
     """
     Анализирует сайт и генерирует полный набор рекламных материалов.
     
@@ -63,66 +221,100 @@ def analyze(url, output, ai_provider, model, keywords_only):
         "[bold blue]AI Marketing - Анализ сайта[/bold blue]",
         border_style="blue"
     ))
-    
+
+    if no_cache:
+        # Тот же рубильник, что и для A/B замеров: отключает точный
+        # и семантический кэши ответов на время этого запуска
+        os.environ['DISABLE_AI_CACHE'] = '1'
+
+    from parsers import WebsiteParser
+    from exporters import ExcelExporter
+
     try:
-        with Progress(
+        # refresh_per_second=2: спиннер крутится все 10-60 секунд LLM вызова,
+        # и дефолтные 10 Гц впустую жгут CPU на ожидании; transient=True
+        # убирает строки прогресса после завершения — остаются только ✓
+        with ThreadPoolExecutor(max_workers=3) as pool, Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
-            console=console
+            console=console,
+            refresh_per_second=2,
+            transient=True
         ) as progress:
-            
-            # Шаг 1: Парсинг сайта
+
+            # Шаг 1: Парсинг сайта. Инициализация AI клиента и экспортера
+            # не зависит от результата парсинга — запускаем их параллельно,
+            # чтобы сетевое ожидание перекрывалось, а не суммировалось
             task1 = progress.add_task("[cyan]Парсинг контента сайта...", total=None)
-            parser = WebsiteParser()
-            website_data = parser.parse_url(url)
+            parse_future = pool.submit(WebsiteParser().parse_url, url)
+            ai_gen_future = pool.submit(_get_ai, ai_provider, model)
+            exporter_future = pool.submit(ExcelExporter, settings.output_dir)
+            website_data = parse_future.result()
             progress.update(task1, completed=True)
             console.print("✓ Контент сайта успешно спарсен", style="green")
-            
-            # Шаг 2: FAB анализ
-            task2 = progress.add_task("[cyan]Анализ по методологии FAB...", total=None)
-            ai_gen = AIGenerator(provider=ai_provider, model=model)
-            fab_analysis = ai_gen.analyze_with_fab(website_data)
-            progress.update(task2, completed=True)
-            console.print("✓ FAB анализ завершен", style="green")
-            
-            # Отображаем результаты FAB анализа
-            _display_fab_analysis(fab_analysis)
-            
-            # Шаг 3: Генерация ключевых слов
-            task3 = progress.add_task("[cyan]Генерация ключевых слов...", total=None)
-            keywords_data = ai_gen.generate_keywords(fab_analysis)
-            progress.update(task3, completed=True)
-            console.print("✓ Ключевые слова сгенерированы", style="green")
-            
+
+            ai_gen = ai_gen_future.result()
+            checkpoint_key = _checkpoint_key(url, website_data)
+
             if keywords_only:
+                # Шаг 2: FAB анализ
+                task2 = progress.add_task("[cyan]Анализ по методологии FAB...", total=None)
+                fab_analysis = _checkpoint_load(checkpoint_key, 'fab') if resume else None
+                if fab_analysis is None:
+                    fab_analysis = ai_gen.analyze_with_fab(website_data)
+                    _checkpoint_save(checkpoint_key, 'fab', fab_analysis)
+                progress.update(task2, completed=True)
+                console.print("✓ FAB анализ завершен", style="green")
+
+                # Шаг 3: Генерация ключевых слов — LLM вызов уходит в фон,
+                # а таблица FAB анализа рисуется, пока он выполняется
+                task3 = progress.add_task("[cyan]Генерация ключевых слов...", total=None)
+                keywords_data = _checkpoint_load(checkpoint_key, 'keywords') if resume else None
+                if keywords_data is None:
+                    keywords_future = pool.submit(ai_gen.generate_keywords, fab_analysis)
+                    _display_fab_analysis(fab_analysis)
+                    keywords_data = keywords_future.result()
+                    _checkpoint_save(checkpoint_key, 'keywords', keywords_data)
+                else:
+                    _display_fab_analysis(fab_analysis)
+                progress.update(task3, completed=True)
+                console.print("✓ Ключевые слова сгенерированы", style="green")
+
                 # Экспорт только ключевых слов
-                exporter = ExcelExporter(settings.output_dir)
+                exporter = exporter_future.result()
                 filepath = exporter.export_keywords(keywords_data, output)
+                _checkpoint_clear(checkpoint_key)
                 console.print(f"\n[bold green]✓ Файл сохранен:[/bold green] {filepath}")
                 return
-            
-            # Извлекаем список ключевых слов для объявлений
-            keywords_list = []
-            if isinstance(keywords_data, dict) and 'keywords' in keywords_data:
-                keywords_list = [kw.get('keyword', kw) if isinstance(kw, dict) else kw 
-                               for kw in keywords_data['keywords']]
-            
-            # Шаг 4: Генерация объявлений Google Ads
-            task4 = progress.add_task("[cyan]Генерация объявлений Google Ads...", total=None)
-            ads_data = ai_gen.generate_google_ads(fab_analysis, keywords_list[:20])
-            progress.update(task4, completed=True)
-            console.print("✓ Объявления сгенерированы", style="green")
-            
-            # Отображаем примеры объявлений
+
+            # Шаги 2-4: Объединенная генерация — один запрос к AI вместо
+            # трех последовательных (FAB -> ключевые слова -> объявления),
+            # то есть один сетевой round-trip вместо трех. При неполном
+            # ответе generate_full_pipeline сам откатывается на три шага
+            task2 = progress.add_task(
+                "[cyan]AI анализ (FAB + ключевые слова + объявления)...", total=None)
+            pipeline = _checkpoint_load(checkpoint_key, 'pipeline') if resume else None
+            if pipeline is None:
+                pipeline = ai_gen.generate_full_pipeline(website_data)
+                _checkpoint_save(checkpoint_key, 'pipeline', pipeline)
+            fab_analysis = pipeline['fab_analysis']
+            keywords_data = pipeline['keywords']
+            ads_data = pipeline['ads']
+            progress.update(task2, completed=True)
+            console.print("✓ FAB анализ, ключевые слова и объявления готовы", style="green")
+
+            # Отображаем результаты FAB анализа и примеры объявлений
+            _display_fab_analysis(fab_analysis)
             _display_ads_preview(ads_data)
-            
+
             # Шаг 5: Экспорт данных
             task5 = progress.add_task("[cyan]Экспорт данных в Excel...", total=None)
-            exporter = ExcelExporter(settings.output_dir)
+            exporter = exporter_future.result()
             filepath = exporter.export_complete_report(
                 website_data, fab_analysis, keywords_data, ads_data, output
             )
             progress.update(task5, completed=True)
+            _checkpoint_clear(checkpoint_key)
             console.print("✓ Данные экспортированы", style="green")
         
         console.print(f"\n[bold green]✓ Анализ завершен успешно![/bold green]")
@@ -145,8 +337,10 @@ def parse(url, output):
     URL - адрес сайта для парсинга
     """
     console.print("[cyan]Парсинг сайта...[/cyan]")
-    
+
     try:
+        from parsers import WebsiteParser
+
         parser = WebsiteParser()
         website_data = parser.parse_url(url)
         
@@ -166,10 +360,20 @@ def parse(url, output):
         
         # Сохранение если требуется
         if output:
-            import json
             output_path = settings.output_dir / output
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(website_data, f, ensure_ascii=False, indent=2)
+            try:
+                # orjson пишет байты одним C-вызовом без промежуточной
+                # Python-строки; при его отсутствии iterencode отдает
+                # JSON кусками, не собирая весь документ в памяти
+                import orjson
+                with open(output_path, 'wb') as f:
+                    f.write(orjson.dumps(website_data, option=orjson.OPT_INDENT_2))
+            except ImportError:
+                import json
+                encoder = json.JSONEncoder(ensure_ascii=False, indent=2)
+                with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                    for chunk in encoder.iterencode(website_data):
+                        f.write(chunk)
             console.print(f"[bold]Данные сохранены:[/bold] {output_path}")
         
     except Exception as e:
@@ -178,6 +382,23 @@ def parse(url, output):
         raise click.Abort()
 
 
+@cli.command('cache-clear')
+def cache_clear():
+    """Очищает персистентный кэш ответов AI."""
+    removed = 0
+    for name in ('cache.db', 'exact_cache.db'):
+        path = settings.output_dir / name
+        if path.exists():
+            path.unlink()
+            console.print(f"✓ Удален {path}", style="green")
+            removed += 1
+
+    if removed:
+        console.print(f"\n[bold green]✓ Кэш очищен[/bold green]")
+    else:
+        console.print("[dim]Кэш пуст — удалять нечего[/dim]")
+
+
 @cli.command()
 def config_info():
     """Показывает текущую конфигурацию."""
@@ -281,10 +502,8 @@ def google_ads():
 def google_ads_list_accounts():
     """Показать все доступные аккаунты Google Ads."""
     try:
-        from google_ads import GoogleAdsMCPServer
-        
         console.print("[cyan]Получение списка аккаунтов...[/cyan]")
-        mcp = GoogleAdsMCPServer()
+        mcp = _get_mcp()
         result = mcp.list_accounts()
         
         if result['success']:
@@ -311,10 +530,8 @@ def google_ads_list_accounts():
 def google_ads_account_summary(date_range):
     """Показать сводку по аккаунту."""
     try:
-        from google_ads import GoogleAdsMCPServer
-        
         console.print(f"[cyan]Получение сводки за {date_range}...[/cyan]")
-        mcp = GoogleAdsMCPServer()
+        mcp = _get_mcp()
         result = mcp.get_account_summary(date_range)
         
         if result['success'] and result['summary']:
@@ -328,8 +545,8 @@ def google_ads_account_summary(date_range):
                 metrics = summary['metrics']
                 table.add_row("Показы", f"{metrics.get('impressions', 0):,}")
                 table.add_row("Клики", f"{metrics.get('clicks', 0):,}")
-                table.add_row("CTR", f"{metrics.get('ctr', 0):.2%}" if 'ctr' in metrics else "N/A")
-                table.add_row("Стоимость", f"${metrics.get('cost_micros', 0) / 1_000_000:.2f}")
+                table.add_row("CTR", _pct(metrics) if 'ctr' in metrics else "N/A")
+                table.add_row("Стоимость", _money(metrics))
                 table.add_row("Конверсии", f"{metrics.get('conversions', 0):.1f}")
             
             console.print(table)
@@ -349,43 +566,42 @@ def google_ads_account_summary(date_range):
 def google_ads_campaigns(campaign_id, date_range, status):
     """Показать кампании и их производительность."""
     try:
-        from google_ads import GoogleAdsMCPServer
-        
         console.print(f"[cyan]Получение данных кампаний...[/cyan]")
-        mcp = GoogleAdsMCPServer()
+        mcp = _get_mcp()
         
         if campaign_id:
             result = mcp.get_campaign_performance(campaign_id, date_range)
         else:
-            result = mcp.get_campaigns(date_range, status)
+            # Запрашиваем не больше, чем показываем: LIMIT уходит в GAQL,
+            # и большой аккаунт не материализуется в памяти целиком
+            result = mcp.get_campaigns(date_range, status, max_rows=20)
         
         if result['success']:
             campaigns = [result['campaign']] if campaign_id else result.get('campaigns', [])
             
-            table = Table(title=f"Кампании ({date_range})")
-            table.add_column("ID", style="cyan")
-            table.add_column("Название", style="yellow")
-            table.add_column("Статус", style="green")
-            table.add_column("Показы", style="blue")
-            table.add_column("Клики", style="magenta")
-            table.add_column("Стоимость", style="red")
-            
-            for campaign in campaigns[:20]:  # Показываем первые 20
-                camp_data = campaign.get('campaign', {})
-                metrics = campaign.get('metrics', {})
-                
-                table.add_row(
+            table = _table_from(_CAMPAIGN_COLS, f"Кампании ({date_range})")            
+            # Ячейки собираются одним проходом (format(n, ',d') — числовое
+            # форматирование на уровне C), затем строки отдаются таблице
+            rows = [
+                (
                     str(camp_data.get('id', 'N/A')),
                     camp_data.get('name', 'N/A')[:30],
                     camp_data.get('status', 'N/A'),
-                    f"{metrics.get('impressions', 0):,}",
-                    f"{metrics.get('clicks', 0):,}",
-                    f"${metrics.get('cost_micros', 0) / 1_000_000:.2f}"
+                    format(metrics.get('impressions', 0), ',d'),
+                    format(metrics.get('clicks', 0), ',d'),
+                    _money(metrics),
                 )
-            
+                for camp_data, metrics in (
+                    (c.get('campaign', {}), c.get('metrics', {}))
+                    for c in campaigns[:20]  # Показываем первые 20
+                )
+            ]
+            for row in rows:
+                table.add_row(*row)
+
             console.print(table)
             if not campaign_id:
-                console.print(f"\n[green]✓ Найдено кампаний: {result['count']}[/green]")
+                console.print(f"\n[green]✓ Показано кампаний: {result['count']}[/green]")
         else:
             console.print(f"[red]✗ Ошибка: {result['error']}[/red]")
     except ImportError:
@@ -402,38 +618,33 @@ def google_ads_campaigns(campaign_id, date_range, status):
 def google_ads_keywords(campaign_id, date_range, min_impressions):
     """Показать производительность ключевых слов."""
     try:
-        from google_ads import GoogleAdsMCPServer
-        
         console.print(f"[cyan]Получение данных по ключевым словам...[/cyan]")
-        mcp = GoogleAdsMCPServer()
-        result = mcp.get_keywords(campaign_id, date_range, min_impressions)
+        mcp = _get_mcp()
+        result = mcp.get_keywords(campaign_id, date_range, min_impressions,
+                                  max_rows=30)
         
         if result['success']:
             keywords = result.get('keywords', [])
             
-            table = Table(title=f"Ключевые слова ({date_range})")
-            table.add_column("Ключевое слово", style="cyan")
-            table.add_column("Тип", style="yellow")
-            table.add_column("Показы", style="blue")
-            table.add_column("Клики", style="magenta")
-            table.add_column("CTR", style="green")
-            table.add_column("Стоимость", style="red")
-            
-            for kw in keywords[:30]:  # Первые 30
-                metrics = kw.get('metrics', {})
-                ctr = metrics.get('ctr', 0) * 100 if 'ctr' in metrics else 0
-                
-                table.add_row(
+            table = _table_from(_KEYWORD_COLS, f"Ключевые слова ({date_range})")            
+            rows = [
+                (
                     kw.get('keyword', 'N/A')[:40],
                     kw.get('match_type', 'N/A'),
-                    f"{metrics.get('impressions', 0):,}",
-                    f"{metrics.get('clicks', 0):,}",
-                    f"{ctr:.2f}%",
-                    f"${metrics.get('cost_micros', 0) / 1_000_000:.2f}"
+                    format(metrics.get('impressions', 0), ',d'),
+                    format(metrics.get('clicks', 0), ',d'),
+                    _pct(metrics),
+                    _money(metrics),
+                )
+                for metrics, kw in (
+                    (kw.get('metrics', {}), kw) for kw in keywords[:30]  # Первые 30
                 )
+            ]
+            for row in rows:
+                table.add_row(*row)
             
             console.print(table)
-            console.print(f"\n[green]✓ Найдено ключевых слов: {result['count']}[/green]")
+            console.print(f"\n[green]✓ Показано ключевых слов: {result['count']}[/green]")
         else:
             console.print(f"[red]✗ Ошибка: {result['error']}[/red]")
     except ImportError:
@@ -449,36 +660,31 @@ def google_ads_keywords(campaign_id, date_range, min_impressions):
 def google_ads_search_terms(campaign_id, date_range):
     """Показать отчет по поисковым запросам."""
     try:
-        from google_ads import GoogleAdsMCPServer
-        
         console.print(f"[cyan]Получение поисковых запросов...[/cyan]")
-        mcp = GoogleAdsMCPServer()
-        result = mcp.get_search_terms(campaign_id, date_range)
+        mcp = _get_mcp()
+        result = mcp.get_search_terms(campaign_id, date_range, max_rows=30)
         
         if result['success']:
             terms = result.get('search_terms', [])
             
-            table = Table(title=f"Поисковые запросы ({date_range})")
-            table.add_column("Запрос", style="cyan")
-            table.add_column("Показы", style="blue")
-            table.add_column("Клики", style="magenta")
-            table.add_column("CTR", style="green")
-            table.add_column("Стоимость", style="red")
-            
-            for term in terms[:30]:
-                metrics = term.get('metrics', {})
-                ctr = metrics.get('ctr', 0) * 100 if 'ctr' in metrics else 0
-                
-                table.add_row(
+            table = _table_from(_SEARCH_TERM_COLS, f"Поисковые запросы ({date_range})")            
+            rows = [
+                (
                     term.get('search_term', 'N/A')[:50],
-                    f"{metrics.get('impressions', 0):,}",
-                    f"{metrics.get('clicks', 0):,}",
-                    f"{ctr:.2f}%",
-                    f"${metrics.get('cost_micros', 0) / 1_000_000:.2f}"
+                    format(metrics.get('impressions', 0), ',d'),
+                    format(metrics.get('clicks', 0), ',d'),
+                    _pct(metrics),
+                    _money(metrics),
                 )
+                for metrics, term in (
+                    (term.get('metrics', {}), term) for term in terms[:30]
+                )
+            ]
+            for row in rows:
+                table.add_row(*row)
             
             console.print(table)
-            console.print(f"\n[green]✓ Найдено запросов: {result['count']}[/green]")
+            console.print(f"\n[green]✓ Показано запросов: {result['count']}[/green]")
         else:
             console.print(f"[red]✗ Ошибка: {result['error']}[/red]")
     except ImportError:
@@ -493,34 +699,31 @@ def google_ads_search_terms(campaign_id, date_range):
 def google_ads_diagnose_quality(min_impressions):
     """Диагностика: найти ключевые слова с низким показателем качества."""
     try:
-        from google_ads import GoogleAdsMCPServer
-        
         console.print(f"[cyan]Поиск ключевых слов с низким показателем качества...[/cyan]")
-        mcp = GoogleAdsMCPServer()
-        result = mcp.diagnose_low_quality_scores(min_impressions)
+        mcp = _get_mcp()
+        result = mcp.diagnose_low_quality_scores(min_impressions, max_rows=20)
         
         if result['success']:
             keywords = result.get('low_quality_keywords', [])
             
             if keywords:
-                table = Table(title="⚠️  Ключевые слова с низким показателем качества (< 5)")
-                table.add_column("Кампания", style="yellow")
-                table.add_column("Ключевое слово", style="cyan")
-                table.add_column("Показатель качества", style="red")
-                table.add_column("Показы", style="blue")
-                table.add_column("CTR", style="green")
-                
-                for kw in keywords[:20]:
-                    metrics = kw.get('metrics', {})
-                    ctr = metrics.get('ctr', 0) * 100 if 'ctr' in metrics else 0
-                    
-                    table.add_row(
+                table = _table_from(
+                    _LOW_QUALITY_COLS,
+                    "⚠️  Ключевые слова с низким показателем качества (< 5)")                
+                rows = [
+                    (
                         kw.get('campaign_name', 'N/A')[:30],
                         kw.get('keyword', 'N/A')[:40],
                         str(kw.get('quality_score', 'N/A')),
-                        f"{metrics.get('impressions', 0):,}",
-                        f"{ctr:.2f}%"
+                        format(metrics.get('impressions', 0), ',d'),
+                        _pct(metrics),
                     )
+                    for metrics, kw in (
+                        (kw.get('metrics', {}), kw) for kw in keywords[:20]
+                    )
+                ]
+                for row in rows:
+                    table.add_row(*row)
                 
                 console.print(table)
                 console.print(f"\n[yellow]Рекомендация:[/yellow] {result.get('recommendation', '')}")
@@ -541,33 +744,31 @@ def google_ads_diagnose_quality(min_impressions):
 def google_ads_diagnose_cost():
     """Диагностика: найти кампании с высокой стоимостью но низкими конверсиями."""
     try:
-        from google_ads import GoogleAdsMCPServer
-        
         console.print(f"[cyan]Поиск дорогих кампаний с низкими конверсиями...[/cyan]")
-        mcp = GoogleAdsMCPServer()
+        mcp = _get_mcp()
         result = mcp.diagnose_high_cost_campaigns()
         
         if result['success']:
             campaigns = result.get('campaigns', [])
             
             if campaigns:
-                table = Table(title="⚠️  Кампании с высокой стоимостью и низкими конверсиями")
-                table.add_column("Кампания", style="yellow")
-                table.add_column("Статус", style="cyan")
-                table.add_column("Стоимость", style="red")
-                table.add_column("Конверсии", style="green")
-                table.add_column("Цена конверсии", style="magenta")
-                
-                for camp in campaigns:
-                    metrics = camp.get('metrics', {})
-                    
-                    table.add_row(
+                table = _table_from(
+                    _HIGH_COST_COLS,
+                    "⚠️  Кампании с высокой стоимостью и низкими конверсиями")                
+                rows = [
+                    (
                         camp.get('name', 'N/A')[:40],
                         camp.get('status', 'N/A'),
-                        f"${metrics.get('cost_micros', 0) / 1_000_000:.2f}",
+                        _money(metrics),
                         f"{metrics.get('conversions', 0):.1f}",
-                        f"${metrics.get('cost_per_conversion', 0) / 1_000_000:.2f}" if metrics.get('cost_per_conversion') else "N/A"
+                        _money(metrics, 'cost_per_conversion') if metrics.get('cost_per_conversion') else "N/A",
                     )
+                    for metrics, camp in (
+                        (camp.get('metrics', {}), camp) for camp in campaigns
+                    )
+                ]
+                for row in rows:
+                    table.add_row(*row)
                 
                 console.print(table)
                 console.print(f"\n[yellow]Рекомендация:[/yellow] {result.get('recommendation', '')}")
@@ -589,11 +790,9 @@ def google_ads_diagnose_cost():
 def google_ads_custom_query(gaql_query):
     """Выполнить произвольный GAQL запрос."""
     try:
-        from google_ads import GoogleAdsMCPServer
         import json
-        
         console.print(f"[cyan]Выполнение запроса...[/cyan]")
-        mcp = GoogleAdsMCPServer()
+        mcp = _get_mcp()
         result = mcp.run_custom_query(gaql_query)
         
         if result['success']:
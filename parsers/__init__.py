@@ -1,7 +1,7 @@
 """
 Модуль парсеров
 """
-from .website_parser import WebsiteParser
+from .website_parser import WebsiteParser, get_parser
 
-__all__ = ['WebsiteParser']
+__all__ = ['WebsiteParser', 'get_parser']
 
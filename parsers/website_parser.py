@@ -1,26 +1,151 @@
 """
 Модуль для парсинга контента веб-сайтов
 """
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import httpx
+import lxml.html
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
+import time
 import trafilatura
-from urllib.parse import urlparse, urljoin
+from urllib.parse import urlparse, urljoin, urlsplit
 import logging
 
-logging.basicConfig(level=logging.INFO)
+# Конфигурацию логирования задаёт точка входа (main.py / web_app.py),
+# библиотечный модуль только пишет в свой логгер
 logger = logging.getLogger(__name__)
 
+# Статусы, при которых имеет смысл повторить запрос с паузой
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_HEADING_TAGS = frozenset({'h1', 'h2', 'h3', 'h4', 'h5', 'h6'})
+
+# Сколько URL держим в кэше условных запросов (ETag/Last-Modified)
+_RESULT_CACHE_MAX = 256
+
+# Предел размера тела ответа: патологически большая страница не должна
+# съесть память воркера
+_MAX_BODY_BYTES = 5 * 1024 * 1024
+
+# Теги, которые нужны _extract_page_data; lxml фильтрует их на уровне C
+_PAGE_DATA_TAGS = ('title', 'meta', 'a', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+# Общий HTTP клиент на модуль: пул keep-alive соединений переживает
+# экземпляры парсера, а HTTP/2 мультиплексирует параллельные запросы
+# parse_multiple_pages по одному TCP+TLS соединению на хост
+_http_client = None
+_async_http_client = None
+
+_CLIENT_KWARGS = dict(
+    headers={
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+        # HTML сжимается на 70-85%: явно просим gzip/br, чтобы сервер
+        # не отдавал несжатое тело (br декодируется при наличии brotli)
+        'Accept-Encoding': 'gzip, deflate, br',
+        'Accept': 'text/html,application/xhtml+xml',
+    },
+    follow_redirects=True,
+    limits=httpx.Limits(max_keepalive_connections=20),
+)
+
+
+def _get_http_client() -> httpx.Client:
+    global _http_client
+    if _http_client is None:
+        try:
+            _http_client = httpx.Client(http2=True, **_CLIENT_KWARGS)
+        except ImportError:
+            # Пакет h2 не установлен — работаем по HTTP/1.1
+            _http_client = httpx.Client(**_CLIENT_KWARGS)
+    return _http_client
+
+
+def _get_async_http_client() -> httpx.AsyncClient:
+    global _async_http_client
+    if _async_http_client is None:
+        try:
+            _async_http_client = httpx.AsyncClient(http2=True, **_CLIENT_KWARGS)
+        except ImportError:
+            _async_http_client = httpx.AsyncClient(**_CLIENT_KWARGS)
+    return _async_http_client
+
+
+_default_parser = None
+
+
+def get_parser() -> 'WebsiteParser':
+    """Возвращает общий на процесс экземпляр парсера (кэш 304 переживает запросы)"""
+    global _default_parser
+    if _default_parser is None:
+        _default_parser = WebsiteParser()
+    return _default_parser
+
 
 class WebsiteParser:
     """Класс для парсинга контента сайта"""
-    
+
     def __init__(self, timeout: int = 30):
         self.timeout = timeout
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-    
+        self.session = _get_http_client()
+        # url -> (etag, last_modified, результат): при 304 отдаём кэш
+        # без передачи тела и повторного разбора
+        self._result_cache: Dict[str, tuple] = {}
+
+    def _fetch(self, url: str, attempts: int = 3,
+               headers: Optional[Dict[str, str]] = None) -> 'tuple[httpx.Response, str]':
+        """
+        Загружает страницу с повторами при временных ошибках сервера
+
+        Тело читается потоково с верхней границей _MAX_BODY_BYTES.
+        Возвращает (ответ, декодированный HTML); при 304 HTML пустой.
+        """
+        for attempt in range(attempts):
+            with self.session.stream('GET', url, timeout=self.timeout, headers=headers) as response:
+                if response.status_code in _RETRY_STATUSES and attempt < attempts - 1:
+                    time.sleep(0.3 * (2 ** attempt))
+                    continue
+                if response.status_code == 304:
+                    return response, ''
+                response.raise_for_status()
+                body = bytearray()
+                for chunk in response.iter_bytes():
+                    body += chunk
+                    if len(body) > _MAX_BODY_BYTES:
+                        raise ValueError(f"Страница превышает {_MAX_BODY_BYTES} байт: {url}")
+                return response, self._decode_body(body, response)
+
+    @staticmethod
+    def _decode_body(body: bytearray, response: httpx.Response) -> str:
+        """Декодирует тело по charset из Content-Type, по умолчанию UTF-8"""
+        return bytes(body).decode(response.charset_encoding or 'utf-8', errors='replace')
+
+    def _conditional_headers(self, url: str) -> Optional[Dict[str, str]]:
+        """Заголовки If-None-Match/If-Modified-Since по прошлому ответу"""
+        cached = self._result_cache.get(url)
+        if not cached:
+            return None
+        etag, last_modified, _ = cached
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers or None
+
+    def _cache_result(self, url: str, response: httpx.Response, result: Dict[str, any]) -> None:
+        """Запоминает результат вместе с валидаторами ответа"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        if len(self._result_cache) >= _RESULT_CACHE_MAX and url not in self._result_cache:
+            self._result_cache.pop(next(iter(self._result_cache)))
+        self._result_cache[url] = (etag, last_modified, result)
+
+    def _cached_result(self, url: str) -> Optional[Dict[str, any]]:
+        cached = self._result_cache.get(url)
+        return cached[2] if cached else None
+
     def parse_url(self, url: str) -> Dict[str, any]:
         """
         Парсит URL и извлекает ключевую информацию
@@ -32,122 +157,195 @@ class WebsiteParser:
             Словарь с извлеченными данными
         """
         try:
-            logger.info(f"Парсинг URL: {url}")
-            
-            # Получаем HTML
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
-            response.raise_for_status()
-            html = response.text
-            
-            # Используем trafilatura для извлечения основного контента
-            extracted_text = trafilatura.extract(
-                html,
-                include_comments=False,
-                include_tables=True,
-                favor_precision=True
-            )
-            
-            # Используем BeautifulSoup для дополнительной информации
-            soup = BeautifulSoup(html, 'lxml')
-            
-            # Извлекаем мета-данные
-            title = self._extract_title(soup)
-            description = self._extract_meta_description(soup)
-            keywords = self._extract_meta_keywords(soup)
-            headings = self._extract_headings(soup)
-            
-            # Извлекаем ссылки
-            links = self._extract_links(soup, url)
-            
-            result = {
-                'url': url,
-                'title': title,
-                'description': description,
-                'keywords': keywords,
-                'headings': headings,
-                'main_content': extracted_text or '',
-                'links': links,
-                'domain': urlparse(url).netloc
-            }
-            
-            logger.info(f"Успешно спарсен: {url}")
+            logger.info("Парсинг URL: %s", url)
+
+            # Получаем HTML (условный запрос, если страница уже была в кэше)
+            response, html = self._fetch(url, headers=self._conditional_headers(url))
+            if response.status_code == 304:
+                logger.info("Контент не изменился (304), результат из кэша: %s", url)
+                return self._cached_result(url)
+            result = self._parse_html(html, url)
+            self._cache_result(url, response, result)
+
+            logger.info("Успешно спарсен: %s", url)
             return result
-            
+
         except Exception as e:
-            logger.error(f"Ошибка при парсинге {url}: {e}")
+            logger.error("Ошибка при парсинге %s: %s", url, e)
             raise
-    
-    def _extract_title(self, soup: BeautifulSoup) -> str:
-        """Извлекает заголовок страницы"""
-        title_tag = soup.find('title')
-        if title_tag:
-            return title_tag.get_text().strip()
-        
-        # Альтернатива: Open Graph title
-        og_title = soup.find('meta', property='og:title')
-        if og_title and og_title.get('content'):
-            return og_title['content'].strip()
-        
-        return ''
-    
-    def _extract_meta_description(self, soup: BeautifulSoup) -> str:
-        """Извлекает мета-описание"""
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        if meta_desc and meta_desc.get('content'):
-            return meta_desc['content'].strip()
-        
-        # Альтернатива: Open Graph description
-        og_desc = soup.find('meta', property='og:description')
-        if og_desc and og_desc.get('content'):
-            return og_desc['content'].strip()
-        
-        return ''
-    
-    def _extract_meta_keywords(self, soup: BeautifulSoup) -> List[str]:
-        """Извлекает мета-ключевые слова"""
-        meta_keywords = soup.find('meta', attrs={'name': 'keywords'})
-        if meta_keywords and meta_keywords.get('content'):
-            keywords = meta_keywords['content'].split(',')
-            return [k.strip() for k in keywords if k.strip()]
-        return []
-    
-    def _extract_headings(self, soup: BeautifulSoup) -> Dict[str, List[str]]:
-        """Извлекает заголовки H1-H6"""
-        headings = {}
-        for i in range(1, 7):
-            tag = f'h{i}'
-            tags = soup.find_all(tag)
-            headings[tag] = [h.get_text().strip() for h in tags if h.get_text().strip()]
-        return headings
-    
-    def _extract_links(self, soup: BeautifulSoup, base_url: str) -> List[str]:
-        """Извлекает все ссылки со страницы"""
+
+    def _parse_html(self, html: str, url: str) -> Dict[str, any]:
+        """Извлекает данные из уже загруженного HTML (без сетевых вызовов)"""
+        # Строим дерево один раз и делим его между экстрактором мета-данных
+        # и trafilatura — иначе libxml2 разбирает тот же HTML дважды
+        tree = lxml.html.fromstring(html)
+
+        # Мета-данные, заголовки и ссылки за один обход дерева
+        # (до trafilatura: extract может модифицировать переданное дерево)
+        extracted = self._extract_page_data(tree, url)
+
+        # Используем trafilatura для извлечения основного контента
+        extracted_text = trafilatura.extract(
+            tree,
+            include_comments=False,
+            include_tables=True,
+            favor_precision=True
+        )
+
+        return {
+            'url': url,
+            'title': extracted['title'],
+            'description': extracted['description'],
+            'keywords': extracted['keywords'],
+            'headings': extracted['headings'],
+            'main_content': extracted_text or '',
+            'links': extracted['links'],
+            'domain': urlparse(url).netloc
+        }
+
+    def _extract_page_data(self, tree, base_url: str) -> Dict[str, any]:
+        """
+        Извлекает мета-данные, заголовки и ссылки за один обход дерева
+
+        Обход через tree.iter() с фильтром тегов выполняется внутри libxml2:
+        Python видит только нужные элементы вместо каждого узла документа.
+        """
+        title = ''
+        og_title = ''
+        description = ''
+        og_description = ''
+        keywords = []
+        headings = {f'h{i}': [] for i in range(1, 7)}
+        seen_links = set()
         links = []
-        for a_tag in soup.find_all('a', href=True):
-            href = a_tag['href']
-            # Преобразуем относительные URL в абсолютные
-            full_url = urljoin(base_url, href)
-            if full_url.startswith('http'):
-                links.append(full_url)
-        return list(set(links))  # Убираем дубликаты
-    
-    def parse_multiple_pages(self, urls: List[str]) -> List[Dict[str, any]]:
+
+        # urljoin разбирает base_url заново на каждый вызов; для ссылок
+        # от корня сайта хватает готового префикса scheme://netloc
+        base = urlsplit(base_url)
+        base_root = f'{base.scheme}://{base.netloc}'
+
+        for tag in tree.iter(*_PAGE_DATA_TAGS):
+            name = tag.tag
+            if name in _HEADING_TAGS:
+                text = tag.text_content().strip()
+                if text:
+                    headings[name].append(text)
+            elif name == 'a':
+                href = tag.get('href')
+                if href:
+                    # Преобразуем относительные URL в абсолютные
+                    if href.startswith('/') and not href.startswith('//'):
+                        full_url = base_root + href
+                    else:
+                        full_url = urljoin(base_url, href)
+                    if full_url.startswith(('http://', 'https://')) and full_url not in seen_links:
+                        seen_links.add(full_url)
+                        links.append(full_url)
+            elif name == 'title':
+                if not title:
+                    title = tag.text_content().strip()
+            elif name == 'meta':
+                content = tag.get('content')
+                if not content:
+                    continue
+                meta_name = tag.get('name')
+                meta_property = tag.get('property')
+                if meta_name == 'description' and not description:
+                    description = content.strip()
+                elif meta_name == 'keywords' and not keywords:
+                    keywords = [k.strip() for k in content.split(',') if k.strip()]
+                elif meta_property == 'og:title' and not og_title:
+                    og_title = content.strip()
+                elif meta_property == 'og:description' and not og_description:
+                    og_description = content.strip()
+
+        return {
+            'title': title or og_title,
+            'description': description or og_description,
+            'keywords': keywords,
+            'headings': headings,
+            'links': links,
+        }
+
+
+    def parse_multiple_pages(self, urls: List[str], concurrency: int = 8) -> List[Dict[str, any]]:
         """
-        Парсит несколько страниц
+        Парсит несколько страниц параллельно
+        
+        Загрузка страниц ограничена сетью, поэтому параллельные запросы
+        сокращают общее время с суммы задержек до максимальной из них.
         
         Args:
             urls: Список URL для парсинга
+            concurrency: Максимум одновременных запросов
             
         Returns:
-            Список словарей с данными
+            Список словарей с данными (в порядке исходных URL, без упавших)
+        """
+        def safe_parse(url: str) -> Optional[Dict[str, any]]:
+            try:
+                return self.parse_url(url)
+            except Exception as e:
+                logger.error("Ошибка при парсинге %s: %s", url, e)
+                return None
+
+        max_workers = max(1, min(concurrency, len(urls))) if urls else 1
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(safe_parse, urls))
+
+        return [result for result in results if result is not None]
+
+    async def _afetch(self, client: httpx.AsyncClient, url: str, attempts: int = 3,
+                      headers: Optional[Dict[str, str]] = None) -> 'tuple[httpx.Response, str]':
+        """Асинхронный аналог _fetch: загрузка с повторами при временных ошибках"""
+        for attempt in range(attempts):
+            async with client.stream('GET', url, timeout=self.timeout, headers=headers) as response:
+                if response.status_code in _RETRY_STATUSES and attempt < attempts - 1:
+                    await asyncio.sleep(0.3 * (2 ** attempt))
+                    continue
+                if response.status_code == 304:
+                    return response, ''
+                response.raise_for_status()
+                body = bytearray()
+                async for chunk in response.aiter_bytes():
+                    body += chunk
+                    if len(body) > _MAX_BODY_BYTES:
+                        raise ValueError(f"Страница превышает {_MAX_BODY_BYTES} байт: {url}")
+                return response, self._decode_body(body, response)
+
+    async def parse_many_async(self, urls: List[str]) -> List[Dict[str, any]]:
+        """
+        Парсит страницы асинхронно — для больших пачек URL
+
+        В отличие от parse_multiple_pages не держит поток на каждый запрос:
+        сотни загрузок мультиплексируются в одном событийном цикле, а разбор
+        HTML (trafilatura + lxml) уходит в пул потоков, чтобы не
+        блокировать цикл.
+
+        Args:
+            urls: Список URL для парсинга
+
+        Returns:
+            Список словарей с данными (в порядке исходных URL, без упавших)
         """
-        results = []
-        for url in urls:
+        client = _get_async_http_client()
+        loop = asyncio.get_running_loop()
+
+        async def safe_parse(url: str) -> Optional[Dict[str, any]]:
             try:
-                result = self.parse_url(url)
-                results.append(result)
+                logger.info("Парсинг URL: %s", url)
+                response, html = await self._afetch(client, url, headers=self._conditional_headers(url))
+                if response.status_code == 304:
+                    logger.info("Контент не изменился (304), результат из кэша: %s", url)
+                    return self._cached_result(url)
+                result = await loop.run_in_executor(None, self._parse_html, html, url)
+                self._cache_result(url, response, result)
+                logger.info("Успешно спарсен: %s", url)
+                return result
             except Exception as e:
-                logger.error(f"Ошибка при парсинге {url}: {e}")
-                continue
-        return results
+                logger.error("Ошибка при парсинге %s: %s", url, e)
+                return None
+
+        results = await asyncio.gather(*(safe_parse(url) for url in urls))
+        return [result for result in results if result is not None]
 
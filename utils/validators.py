@@ -1,8 +1,12 @@
 """
 Валидаторы для Google Ads и других форматов
 """
+import re
 from typing import List, Tuple
 
+# Компилируется один раз: проверка URL без разбора в SplitResult на каждый вызов
+_URL_RE = re.compile(r'\A(?:https?|ftp)://[^\s/$.?#].\S*\Z', re.IGNORECASE)
+
 
 class GoogleAdsValidator:
     """Валидатор для объявлений Google Ads"""
@@ -11,6 +15,10 @@ class GoogleAdsValidator:
     HEADLINE_MAX_LENGTH = 30
     DESCRIPTION_MAX_LENGTH = 90
     PATH_MAX_LENGTH = 15
+
+    # Таблица собирается один раз: translate удаляет дефисы и подчёркивания
+    # за один проход в C вместо двух replace с копией строки каждый
+    _PATH_DELETE_TABLE = str.maketrans('', '', '-_')
     
     @classmethod
     def validate_headline(cls, headline: str) -> Tuple[bool, str]:
@@ -59,7 +67,7 @@ class GoogleAdsValidator:
             return False, f"Путь слишком длинный: {len(path)} символов (макс. {cls.PATH_MAX_LENGTH})"
         
         # Проверка на специальные символы
-        if not path.replace('-', '').replace('_', '').isalnum():
+        if not path.translate(cls._PATH_DELETE_TABLE).isalnum():
             return False, "Путь может содержать только буквы, цифры, дефисы и подчеркивания"
         
         return True, "OK"
@@ -95,19 +103,51 @@ class GoogleAdsValidator:
         
         return errors
     
+    @classmethod
+    def validate_ads_batch(cls, headlines: List[str], descriptions: List[str],
+                           paths1: List[str] = None, paths2: List[str] = None) -> List[List[str]]:
+        """
+        Валидирует пачку объявлений за один вызов
+
+        Валидные объявления (обычный случай) проходят только по проверкам
+        длины, без сборки сообщений и вложенных вызовов.
+
+        Returns:
+            Список списков ошибок — по одному на объявление
+        """
+        if paths1 is None:
+            paths1 = [''] * len(headlines)
+        if paths2 is None:
+            paths2 = [''] * len(headlines)
+
+        headline_max = cls.HEADLINE_MAX_LENGTH
+        description_max = cls.DESCRIPTION_MAX_LENGTH
+        results = []
+        for headline, description, path1, path2 in zip(headlines, descriptions, paths1, paths2):
+            if (headline and len(headline) <= headline_max
+                    and description and len(description) <= description_max
+                    and not path1 and not path2):
+                results.append([])
+            else:
+                results.append(cls.validate_ad(headline, description, path1, path2))
+        return results
+
+    @staticmethod
+    def _truncate(text: str, max_length: int) -> str:
+        """Обрезает текст до max_length с многоточием; короткий возвращает как есть"""
+        if len(text) <= max_length:
+            return text
+        return text[:max_length - 3] + "..."
+
     @classmethod
     def truncate_headline(cls, headline: str) -> str:
         """Обрезает заголовок до максимальной длины"""
-        if len(headline) <= cls.HEADLINE_MAX_LENGTH:
-            return headline
-        return headline[:cls.HEADLINE_MAX_LENGTH-3] + "..."
-    
+        return cls._truncate(headline, cls.HEADLINE_MAX_LENGTH)
+
     @classmethod
     def truncate_description(cls, description: str) -> str:
         """Обрезает описание до максимальной длины"""
-        if len(description) <= cls.DESCRIPTION_MAX_LENGTH:
-            return description
-        return description[:cls.DESCRIPTION_MAX_LENGTH-3] + "..."
+        return cls._truncate(description, cls.DESCRIPTION_MAX_LENGTH)
 
 
 def validate_url(url: str) -> bool:
@@ -120,11 +160,8 @@ def validate_url(url: str) -> bool:
     Returns:
         True если URL валиден
     """
-    from urllib.parse import urlparse
-    
     try:
-        result = urlparse(url)
-        return all([result.scheme, result.netloc])
-    except:
+        return bool(_URL_RE.match(url))
+    except TypeError:
         return False
 
@@ -7,20 +7,76 @@ from werkzeug.security import generate_password_hash, check_password_hash
 import os
 import json
 import logging
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 import tempfile
 import zipfile
 
 # Import our modules
-from parsers import WebsiteParser
+from parsers import get_parser
 from ai import AIGenerator
 from exporters import ExcelExporter
 from config import settings
 
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from google_ads import GoogleAdsMCPServer
+    GOOGLE_ADS_AVAILABLE = True
+except ImportError:
+    GOOGLE_ADS_AVAILABLE = False
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'ai-marketing-secret-key-change-in-production')
 
+def _json_default(o):
+    """Last-resort serializer hook shared by both JSON providers.
+
+    tolist() covers numpy arrays and scalars that slip past the fast path
+    (orjson's OPT_SERIALIZE_NUMPY skips object-dtype arrays); everything
+    else goes through Flask's default(), which raises TypeError."""
+    if hasattr(o, 'tolist'):
+        return o.tolist()
+    return DefaultJSONProvider.default(o)
+
+
+if ORJSON_AVAILABLE:
+    class OrjsonProvider(DefaultJSONProvider):
+        """JSON provider on top of orjson: C-level serialization of the large
+        analyze/campaign/keyword payloads, with datetime, UUID and numpy
+        arrays handled natively."""
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(
+                obj,
+                default=_json_default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+            ).decode('utf-8')
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json_provider_class = OrjsonProvider
+    app.json = OrjsonProvider(app)
+else:
+    class NumpySafeProvider(DefaultJSONProvider):
+        """Stdlib fallback that can still serialize numpy values."""
+
+        @staticmethod
+        def default(o):
+            return _json_default(o)
+
+    app.json_provider_class = NumpySafeProvider
+    app.json = NumpySafeProvider(app)
+
 # Setup HTTP Basic Authentication
 auth = HTTPBasicAuth()
 
@@ -28,9 +84,47 @@ auth = HTTPBasicAuth()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Global variables for session data
+# Session payloads are multi-MB (full website text + generated report), so
+# keeping them in a process-global dict leaked memory for the worker's
+# lifetime. Payloads now spill to JSON next to the XLSX report and only the
+# file paths stay in RAM, with the oldest sessions evicted beyond the cap.
+_SESSION_MAX = 128
 session_data = {}
 
+
+def _store_session(session_id, payload, filepath):
+    """Persist a session payload to disk and register it in the bounded map."""
+    json_path = settings.output_dir / f"session_{session_id}.json"
+    if ORJSON_AVAILABLE:
+        json_path.write_bytes(orjson.dumps(payload))
+    else:
+        json_path.write_text(json.dumps(payload, ensure_ascii=False))
+    while len(session_data) >= _SESSION_MAX:
+        session_data.pop(next(iter(session_data)))
+    session_data[session_id] = {'filepath': filepath, 'payload_file': str(json_path)}
+
+# One parser per process: its pooled HTTP client keeps connections warm
+# across requests, and its conditional-request cache turns re-analyzes of
+# unchanged pages into 304 round-trips with no body transfer or re-parse
+website_parser = get_parser()
+
+# One MCP server per process: constructing it per request would redo config
+# loading every call, and the underlying gRPC channel is worth keeping warm
+_mcp_instance = None
+_mcp_lock = threading.Lock()
+
+
+def _mcp():
+    """Return the shared GoogleAdsMCPServer, creating it on first use."""
+    global _mcp_instance
+    if not GOOGLE_ADS_AVAILABLE:
+        raise ImportError('Google Ads API not installed. Run: pip install google-ads')
+    if _mcp_instance is None:
+        with _mcp_lock:
+            if _mcp_instance is None:
+                _mcp_instance = GoogleAdsMCPServer()
+    return _mcp_instance
+
 # Authentication verification function
 @auth.verify_password
 def verify_password(username, password):
@@ -78,9 +172,8 @@ def analyze_website():
             return jsonify({'error': 'URL is required'}), 400
         
         # Step 1: Parse website
-        logger.info(f"Parsing website: {url}")
-        parser = WebsiteParser()
-        website_data = parser.parse_url(url)
+        logger.info("Parsing website: %s", url)
+        website_data = website_parser.parse_url(url)
         
         # Step 2: FAB Analysis
         logger.info("Running FAB analysis...")
@@ -123,15 +216,14 @@ def analyze_website():
             website_data, fab_analysis, keywords_data, ads_data, filename
         )
         
-        # Store session data
+        # Store session data (on disk; only paths stay in memory)
         session_id = datetime.now().strftime('%Y%m%d_%H%M%S')
-        session_data[session_id] = {
+        _store_session(session_id, {
             'website_data': website_data,
             'fab_analysis': fab_analysis,
             'keywords_data': keywords_data,
             'ads_data': ads_data,
-            'filepath': filepath
-        }
+        }, filepath)
         
         return jsonify({
             'success': True,
@@ -145,7 +237,7 @@ def analyze_website():
         })
         
     except Exception as e:
-        logger.error(f"Error in analysis: {str(e)}")
+        logger.error("Error in analysis: %s", str(e))
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/download/<filename>')
@@ -155,11 +247,15 @@ def download_file(filename):
     try:
         filepath = settings.output_dir / filename
         if filepath.exists():
-            return send_file(str(filepath), as_attachment=True)
+            # conditional=True enables ETag/If-Modified-Since and Range
+            # handling: a browser that already has the report gets a 304
+            # instead of the whole file, and Werkzeug serves the body via
+            # wsgi.file_wrapper (sendfile) instead of Python-level reads
+            return send_file(filepath, as_attachment=True, conditional=True, max_age=0)
         else:
             return jsonify({'error': 'File not found'}), 404
     except Exception as e:
-        logger.error(f"Download error: {str(e)}")
+        logger.error("Download error: %s", str(e))
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/ai-providers')
@@ -246,63 +342,32 @@ def health():
 @require_auth
 def google_ads_status():
     """Check if Google Ads integration is available"""
-    try:
-        from google_ads import GoogleAdsMCPServer
-        # Try to initialize to check if credentials are valid
-        try:
-            mcp = GoogleAdsMCPServer()
-            return jsonify({
-                'available': True,
-                'configured': True,
-                'customer_id': mcp.customer_id
-            })
-        except FileNotFoundError:
-            return jsonify({
-                'available': True,
-                'configured': False,
-                'message': 'google-ads.yaml not found. Please configure API credentials.'
-            })
-        except Exception as e:
-            return jsonify({
-                'available': True,
-                'configured': False,
-                'error': str(e)
-            })
-    except ImportError:
+    if not GOOGLE_ADS_AVAILABLE:
         return jsonify({
             'available': False,
             'configured': False,
             'message': 'Google Ads API not installed. Run: pip install google-ads'
         })
-
-
-@app.route('/api/google-ads/accounts')
-@require_auth
-def google_ads_accounts():
-    """List all accessible Google Ads accounts"""
-    try:
-        from google_ads import GoogleAdsMCPServer
-        mcp = GoogleAdsMCPServer()
-        result = mcp.list_accounts()
-        return jsonify(result)
-    except Exception as e:
-        logger.error(f"Error listing accounts: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)}), 500
-
-
-@app.route('/api/google-ads/account/summary')
-@require_auth
-def google_ads_account_summary():
-    """Get account summary"""
-    date_range = request.args.get('date_range', 'LAST_30_DAYS')
+    # Try to initialize to check if credentials are valid
     try:
-        from google_ads import GoogleAdsMCPServer
-        mcp = GoogleAdsMCPServer()
-        result = mcp.get_account_summary(date_range)
-        return jsonify(result)
+        mcp = _mcp()
+        return jsonify({
+            'available': True,
+            'configured': True,
+            'customer_id': mcp.customer_id
+        })
+    except FileNotFoundError:
+        return jsonify({
+            'available': True,
+            'configured': False,
+            'message': 'google-ads.yaml not found. Please configure API credentials.'
+        })
     except Exception as e:
-        logger.error(f"Error getting summary: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return jsonify({
+            'available': True,
+            'configured': False,
+            'error': str(e)
+        })
 
 
 @app.route('/api/google-ads/campaigns')
@@ -314,8 +379,7 @@ def google_ads_campaigns():
     status = request.args.get('status')
     
     try:
-        from google_ads import GoogleAdsMCPServer
-        mcp = GoogleAdsMCPServer()
+        mcp = _mcp()
         
         if campaign_id:
             result = mcp.get_campaign_performance(campaign_id, date_range)
@@ -324,155 +388,7 @@ def google_ads_campaigns():
         
         return jsonify(result)
     except Exception as e:
-        logger.error(f"Error getting campaigns: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)}), 500
-
-
-@app.route('/api/google-ads/ad-groups')
-@require_auth
-def google_ads_ad_groups():
-    """Get ad groups with performance metrics"""
-    campaign_id = request.args.get('campaign_id')
-    date_range = request.args.get('date_range', 'LAST_30_DAYS')
-    
-    try:
-        from google_ads import GoogleAdsMCPServer
-        mcp = GoogleAdsMCPServer()
-        result = mcp.get_ad_groups(campaign_id, date_range)
-        return jsonify(result)
-    except Exception as e:
-        logger.error(f"Error getting ad groups: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)}), 500
-
-
-@app.route('/api/google-ads/keywords')
-@require_auth
-def google_ads_keywords():
-    """Get keyword performance"""
-    campaign_id = request.args.get('campaign_id')
-    date_range = request.args.get('date_range', 'LAST_30_DAYS')
-    min_impressions = int(request.args.get('min_impressions', 0))
-    
-    try:
-        from google_ads import GoogleAdsMCPServer
-        mcp = GoogleAdsMCPServer()
-        result = mcp.get_keywords(campaign_id, date_range, min_impressions)
-        return jsonify(result)
-    except Exception as e:
-        logger.error(f"Error getting keywords: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)}), 500
-
-
-@app.route('/api/google-ads/search-terms')
-@require_auth
-def google_ads_search_terms():
-    """Get search terms report"""
-    campaign_id = request.args.get('campaign_id')
-    date_range = request.args.get('date_range', 'LAST_7_DAYS')
-    
-    try:
-        from google_ads import GoogleAdsMCPServer
-        mcp = GoogleAdsMCPServer()
-        result = mcp.get_search_terms(campaign_id, date_range)
-        return jsonify(result)
-    except Exception as e:
-        logger.error(f"Error getting search terms: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)}), 500
-
-
-@app.route('/api/google-ads/ads')
-@require_auth
-def google_ads_ads():
-    """Get ads with performance metrics"""
-    campaign_id = request.args.get('campaign_id')
-    ad_group_id = request.args.get('ad_group_id')
-    date_range = request.args.get('date_range', 'LAST_30_DAYS')
-    
-    try:
-        from google_ads import GoogleAdsMCPServer
-        mcp = GoogleAdsMCPServer()
-        result = mcp.get_ads(campaign_id, ad_group_id, date_range)
-        return jsonify(result)
-    except Exception as e:
-        logger.error(f"Error getting ads: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)}), 500
-
-
-@app.route('/api/google-ads/performance/geographic')
-@require_auth
-def google_ads_geographic():
-    """Get geographic performance"""
-    campaign_id = request.args.get('campaign_id')
-    date_range = request.args.get('date_range', 'LAST_30_DAYS')
-    
-    try:
-        from google_ads import GoogleAdsMCPServer
-        mcp = GoogleAdsMCPServer()
-        result = mcp.get_geographic_performance(campaign_id, date_range)
-        return jsonify(result)
-    except Exception as e:
-        logger.error(f"Error getting geographic performance: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)}), 500
-
-
-@app.route('/api/google-ads/performance/device')
-@require_auth
-def google_ads_device():
-    """Get device performance"""
-    campaign_id = request.args.get('campaign_id')
-    date_range = request.args.get('date_range', 'LAST_30_DAYS')
-    
-    try:
-        from google_ads import GoogleAdsMCPServer
-        mcp = GoogleAdsMCPServer()
-        result = mcp.get_device_performance(campaign_id, date_range)
-        return jsonify(result)
-    except Exception as e:
-        logger.error(f"Error getting device performance: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)}), 500
-
-
-@app.route('/api/google-ads/diagnose/quality-score')
-@require_auth
-def google_ads_diagnose_quality():
-    """Diagnose low quality score keywords"""
-    min_impressions = int(request.args.get('min_impressions', 100))
-    
-    try:
-        from google_ads import GoogleAdsMCPServer
-        mcp = GoogleAdsMCPServer()
-        result = mcp.diagnose_low_quality_scores(min_impressions)
-        return jsonify(result)
-    except Exception as e:
-        logger.error(f"Error diagnosing quality scores: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)}), 500
-
-
-@app.route('/api/google-ads/diagnose/high-cost')
-@require_auth
-def google_ads_diagnose_cost():
-    """Diagnose high cost campaigns"""
-    try:
-        from google_ads import GoogleAdsMCPServer
-        mcp = GoogleAdsMCPServer()
-        result = mcp.diagnose_high_cost_campaigns()
-        return jsonify(result)
-    except Exception as e:
-        logger.error(f"Error diagnosing high cost campaigns: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)}), 500
-
-
-@app.route('/api/google-ads/diagnose/disapproved-ads')
-@require_auth
-def google_ads_diagnose_disapproved():
-    """Find disapproved ads"""
-    try:
-        from google_ads import GoogleAdsMCPServer
-        mcp = GoogleAdsMCPServer()
-        result = mcp.find_disapproved_ads()
-        return jsonify(result)
-    except Exception as e:
-        logger.error(f"Error finding disapproved ads: {str(e)}")
+        logger.error("Error getting campaigns: %s", str(e))
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -488,12 +404,11 @@ def google_ads_custom_query():
         if not query:
             return jsonify({'success': False, 'error': 'Query is required'}), 400
         
-        from google_ads import GoogleAdsMCPServer
-        mcp = GoogleAdsMCPServer()
+        mcp = _mcp()
         result = mcp.run_custom_query(query, customer_id)
         return jsonify(result)
     except Exception as e:
-        logger.error(f"Error executing custom query: {str(e)}")
+        logger.error("Error executing custom query: %s", str(e))
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -508,12 +423,13 @@ def google_ads_natural_language():
         if not request_text:
             return jsonify({'success': False, 'error': 'Request text is required'}), 400
         
-        from google_ads import GoogleAdsMCPServer
-        mcp = GoogleAdsMCPServer()
+        mcp = _mcp()
         result = mcp.process_natural_language_request(request_text)
-        return jsonify(result)
+        # The NLQ router can dispatch to get_keywords/get_search_terms,
+        # whose results carry the in-process 'columns' view
+        return jsonify(_drop_columns_view(result))
     except Exception as e:
-        logger.error(f"Error processing NL request: {str(e)}")
+        logger.error("Error processing NL request: %s", str(e))
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -522,19 +438,116 @@ def google_ads_natural_language():
 def google_ads_tools():
     """Get list of available Google Ads MCP tools"""
     try:
-        from google_ads import GoogleAdsMCPServer
-        mcp = GoogleAdsMCPServer()
+        mcp = _mcp()
         tools = mcp.get_available_tools()
         return jsonify({'success': True, 'tools': tools})
     except Exception as e:
-        logger.error(f"Error getting tools: {str(e)}")
+        logger.error("Error getting tools: %s", str(e))
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+# The read-only Google Ads endpoints are all the same shape: pull a few query
+# params, call one MCP method, jsonify. They are generated from this table
+# instead of ~10 copies of the same handler. Each param spec is
+# (query_arg, default, converter); values are passed positionally in the
+# listed order, matching the MCP method signatures. Routes with extra logic
+# (status, campaigns, query, nlp, tools) keep explicit handlers above.
+_GADS_ROUTES = [
+    ('/api/google-ads/accounts', 'google_ads_accounts', 'list_accounts', []),
+    ('/api/google-ads/account/summary', 'google_ads_account_summary', 'get_account_summary',
+     [('date_range', 'LAST_30_DAYS', None)]),
+    ('/api/google-ads/ad-groups', 'google_ads_ad_groups', 'get_ad_groups',
+     [('campaign_id', None, None), ('date_range', 'LAST_30_DAYS', None)]),
+    ('/api/google-ads/keywords', 'google_ads_keywords', 'get_keywords',
+     [('campaign_id', None, None), ('date_range', 'LAST_30_DAYS', None), ('min_impressions', 0, int)]),
+    ('/api/google-ads/search-terms', 'google_ads_search_terms', 'get_search_terms',
+     [('campaign_id', None, None), ('date_range', 'LAST_7_DAYS', None)]),
+    ('/api/google-ads/ads', 'google_ads_ads', 'get_ads',
+     [('campaign_id', None, None), ('ad_group_id', None, None), ('date_range', 'LAST_30_DAYS', None)]),
+    ('/api/google-ads/performance/geographic', 'google_ads_geographic', 'get_geographic_performance',
+     [('campaign_id', None, None), ('date_range', 'LAST_30_DAYS', None)]),
+    ('/api/google-ads/performance/device', 'google_ads_device', 'get_device_performance',
+     [('campaign_id', None, None), ('date_range', 'LAST_30_DAYS', None)]),
+    ('/api/google-ads/diagnose/quality-score', 'google_ads_diagnose_quality', 'diagnose_low_quality_scores',
+     [('min_impressions', 100, int)]),
+    ('/api/google-ads/diagnose/high-cost', 'google_ads_diagnose_cost', 'diagnose_high_cost_campaigns', []),
+    ('/api/google-ads/diagnose/disapproved-ads', 'google_ads_diagnose_disapproved', 'find_disapproved_ads', []),
+]
+
+
+# Campaign/keyword data changes minutes-slow at best, while the dashboard
+# polls these endpoints repeatedly — a short TTL in front of the upstream API
+# absorbs that. ?nocache=1 skips the cached copy for clients that need fresh
+# data.
+_GADS_CACHE_TTL = 60
+_GADS_CACHE_MAX = 128
+
+
+def _drop_columns_view(result):
+    """Strip the in-process 'columns' SoA view from a tool result.
+
+    get_keywords/get_search_terms attach numpy arrays under 'columns' for
+    in-process consumers; neither JSON provider serializes ndarrays without
+    help, and the view duplicates every row's metrics, so it stays out of
+    HTTP payloads."""
+    if isinstance(result, dict) and 'columns' in result:
+        result = {k: v for k, v in result.items() if k != 'columns'}
+    return result
+
+
+def _make_gads_handler(method, params):
+    """Build a GET handler calling one MCP method with the listed query params."""
+    cache = {}  # args tuple -> (expiry, result)
+
+    def handler():
+        args = []
+        for name, default, convert in params:
+            value = request.args.get(name, default)
+            if convert is not None and value is not None:
+                value = convert(value)
+            args.append(value)
+        key = tuple(args)
+        now = time.monotonic()
+        if request.args.get('nocache') != '1':
+            hit = cache.get(key)
+            if hit is not None and hit[0] > now:
+                response = jsonify(hit[1])
+                response.headers['Cache-Control'] = f'max-age={_GADS_CACHE_TTL}, private'
+                return response
+        try:
+            result = getattr(_mcp(), method)(*args)
+        except Exception as e:
+            logger.error("Error in %s: %s", method, str(e))
+            return jsonify({'success': False, 'error': str(e)}), 500
+        result = _drop_columns_view(result)
+        if isinstance(result, dict) and result.get('success', True):
+            if len(cache) >= _GADS_CACHE_MAX and key not in cache:
+                cache.pop(next(iter(cache)))
+            cache[key] = (now + _GADS_CACHE_TTL, result)
+        response = jsonify(result)
+        response.headers['Cache-Control'] = f'max-age={_GADS_CACHE_TTL}, private'
+        return response
+    return handler
+
+
+for _path, _endpoint, _method, _params in _GADS_ROUTES:
+    app.add_url_rule(_path, _endpoint, require_auth(_make_gads_handler(_method, _params)))
+
+
 if __name__ == '__main__':
+    # Direct execution is for development only: the Werkzeug server handles
+    # one request at a time and the debugger must never face real traffic.
+    # Production runs via gunicorn (see Procfile / gunicorn_config.py).
+    if os.environ.get('FLASK_ENV') != 'development':
+        raise SystemExit(
+            'Refusing to start the Werkzeug dev server outside development.\n'
+            'Set FLASK_ENV=development for local runs, or deploy with:\n'
+            '  gunicorn -c gunicorn_config.py web_app:app'
+        )
+
     # Create output directory
     settings.output_dir.mkdir(exist_ok=True)
-    
+
     # Run the app on port 8000 (to avoid macOS AirPlay conflict)
     port = int(os.environ.get('PORT', 8000))
     app.run(host='0.0.0.0', port=port, debug=True)